@@ -6,18 +6,24 @@ of regional creative industry participants across 5 countries
 """
 
 import os
+import sys
 import json
 import requests
 import time
 from datetime import datetime
 from typing import Dict, List, Optional
-from bs4 import BeautifulSoup
 from urllib.parse import urljoin, urlparse
 from google.oauth2 import service_account
 from googleapiclient.discovery import build
 from openai import OpenAI
 from dotenv import load_dotenv
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from shared.utils.fetch_cache import get_fetch_cache
+from shared.utils.html_extract import HtmlDocument
+from shared.utils.metrics import time_upstream, print_upstream_summary
+from shared.utils.search_cache import DEFAULT_CACHE_DIR as SEARCH_CACHE_DIR, get_search_cache
+
 # Load environment variables from .env file
 load_dotenv()
 
@@ -31,6 +37,129 @@ GOOGLE_API_KEY = os.environ.get('GOOGLE_API_KEY', '')
 SEARCH_ENGINE_ID = os.environ.get('GOOGLE_SEARCH_ENGINE_ID', '')
 OPENAI_API_KEY = os.environ.get('OPENAI_API_KEY', '')
 
+# Search query templates for discover_digital_presence, in default order.
+# 'targets' are the platforms a template is meant to find; the planner only
+# runs templates that target a platform still missing
+PLANNED_PLATFORMS = ['website', 'facebook', 'instagram', 'tripadvisor']
+QUERY_TEMPLATES = [
+    # General searches
+    {'id': 'name_country', 'query': '{name} {country}', 'targets': PLANNED_PLATFORMS},
+    {'id': 'name_sector_country', 'query': '{name} {sector} {country}', 'targets': PLANNED_PLATFORMS},
+    {'id': 'name', 'query': '{name}', 'targets': PLANNED_PLATFORMS},
+    # Targeted social media searches
+    {'id': 'name_facebook', 'query': '{name} facebook', 'targets': ['facebook']},
+    {'id': 'name_instagram', 'query': '{name} instagram', 'targets': ['instagram']},
+    {'id': 'name_tripadvisor', 'query': '{name} tripadvisor', 'targets': ['tripadvisor']},
+    # Platform-specific searches for better discovery
+    {'id': 'site_facebook', 'query': 'site:facebook.com {name}', 'targets': ['facebook']},
+    {'id': 'site_instagram', 'query': 'site:instagram.com {name}', 'targets': ['instagram']},
+    {'id': 'site_tripadvisor', 'query': 'site:tripadvisor.com {name}', 'targets': ['tripadvisor']},
+]
+# Website search stops at an official candidate this confident (entity name in domain)
+WEBSITE_CONFIDENCE_TO_STOP = 0.85
+# Per-template yield statistics the planner orders queries by, kept with the search cache
+QUERY_YIELD_STATS_FILE = os.path.join(SEARCH_CACHE_DIR, 'query_yield_stats.json')
+
+# The 10 criteria scored for each category, in Regional Checklist Detail column order
+CATEGORY_CRITERIA = {
+    'Social Media': [
+        'Has business account on primary platform (Facebook/Instagram)',
+        'Has business account on second platform',
+        'Has business account on third platform',
+        'Posts monthly in last 6 months',
+        'Posts 2x monthly in last 6 months',
+        'Posts weekly in last 6 months',
+        'Clear, in-focus photos/videos',
+        'Shows products/services consistently',
+        'Uses platform business features (catalog, hours, etc.)',
+        'Contact info clearly visible in bio/about'
+    ],
+    'Website': [
+        'Website exists and loads',
+        'Mobile-friendly/responsive',
+        'No major usability issues',
+        'Services/products clearly described',
+        'Contact information clearly visible',
+        'Working contact forms',
+        'Content updated within last 6 months',
+        'Modern, professional design',
+        'Multiple pages (not just homepage)',
+        'Links to social media accounts'
+    ],
+    'Visual Content': [
+        'Has original photos (not just stock)',
+        'Photos show actual products/services/location',
+        'Multiple types of visual content',
+        'Professional quality (good lighting, composition)',
+        'Shows variety (different angles, settings)',
+        'Includes people/customers (authentic)',
+        'Behind-the-scenes or process content',
+        'User-generated content or collaborations',
+        'Consistent visual style/branding',
+        'Videos or dynamic content'
+    ],
+    'Discoverability': [
+        'Appears in Google search for business name',
+        'Has Google My Business / Maps listing',
+        'Listed on TripAdvisor or similar',
+        'Appears on first page of search results',
+        'GMB has photos',
+        'Listed on multiple directories',
+        'Has customer reviews',
+        '5+ reviews on any platform',
+        'Responds to reviews',
+        'Has backlinks from other sites'
+    ],
+    'Digital Sales': [
+        'Has WhatsApp business button/number',
+        'Contact form for inquiries',
+        'Prices visible online',
+        'Online booking system',
+        'Accepts mobile money/online payments',
+        'Listed on OTA (Airbnb, Booking.com, etc.)',
+        'Clear call-to-action for booking',
+        'Digital catalog/menu of services',
+        'Testimonials or social proof',
+        'FAQ or detailed service info'
+    ],
+    'Platform Integration': [
+        'On Google My Business',
+        'On TripAdvisor',
+        'On national tourism website',
+        'On Airbnb/Booking.com (if applicable)',
+        'On GetYourGuide or similar',
+        'Featured in tourism campaigns',
+        'Partner with hotels/DMCs',
+        'Cross-listed on multiple platforms',
+        'Profile >75% complete on platforms',
+        'Active on tourism directories'
+    ]
+}
+
+# Structured output for scoring every category in one call. The category
+# score is the sum of its criteria, so the model isn't asked for it
+CATEGORY_RESULT_SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'criteria_scores': {'type': 'array', 'items': {'type': 'integer', 'enum': [0, 1]}},
+        'reasoning': {'type': 'string'},
+        'confidence': {'type': 'string', 'enum': ['high', 'medium', 'low']},
+        'evidence_gaps': {'type': 'string'}
+    },
+    'required': ['criteria_scores', 'reasoning', 'confidence', 'evidence_gaps'],
+    'additionalProperties': False
+}
+ALL_CATEGORIES_SCHEMA = {
+    'name': 'category_assessment',
+    'strict': True,
+    'schema': {
+        'type': 'object',
+        'properties': {category: CATEGORY_RESULT_SCHEMA for category in CATEGORY_CRITERIA},
+        'required': list(CATEGORY_CRITERIA),
+        'additionalProperties': False
+    }
+}
+
 # Initialize OpenAI
 client = OpenAI(api_key=OPENAI_API_KEY) if OPENAI_API_KEY else None
 
@@ -38,10 +167,42 @@ client = OpenAI(api_key=OPENAI_API_KEY) if OPENAI_API_KEY else None
 class RegionalCompetitorAnalyzer:
     """Advanced analyzer combining search, scraping, and AI for comprehensive assessment"""
     
-    def __init__(self, verbose=True):
+    def __init__(self, verbose=True, search_cache=None, multi_category_scoring=True):
         self.verbose = verbose
+        # Score all six categories in one LLM call (per-category calls are the fallback)
+        self.multi_category_scoring = multi_category_scoring
         self.sheets_service = self._get_sheets_service()
-        
+        self.search_cache = search_cache or get_search_cache()
+        # How the last google_search was answered: 'cached', 'fetched', 'error'
+        # (request sent but failed), 'offline_miss' or 'not_configured'
+        self.last_search_status = None
+        self.query_yield_stats = self._load_query_yield_stats()
+        self.query_counts = {'run': 0, 'skipped': 0}
+        
+    def _load_query_yield_stats(self) -> Dict:
+        if not os.path.exists(QUERY_YIELD_STATS_FILE):
+            return {}
+        try:
+            with open(QUERY_YIELD_STATS_FILE, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            self._log(f"Ignoring unreadable query yield stats: {e}", "warn")
+            return {}
+    
+    def print_query_plan_summary(self):
+        """Searches saved by the planner this run, and the yield of each template so far"""
+        total = self.query_counts['run'] + self.query_counts['skipped']
+        print(f"\n🧭 Search planner: {self.query_counts['run']}/{total} queries run, "
+              f"{self.query_counts['skipped']} skipped")
+        print(f"   {'template':<20} {'runs':>5} {'new urls':>9}  platforms found")
+        for template in QUERY_TEMPLATES:
+            stats = self.query_yield_stats.get(template['id'])
+            if not stats:
+                continue
+            found = ', '.join(f"{p} {n / stats['runs']:.0%}" for p, n in sorted(stats['found'].items()))
+            print(f"   {template['id']:<20} {stats['runs']:>5} {stats['new_urls'] / stats['runs']:>9.1f}  "
+                  f"{found or '-'}")
+    
     def _get_sheets_service(self):
         """Initialize Google Sheets API service"""
         with open(CREDS_FILE, 'r') as f:
@@ -60,8 +221,19 @@ class RegionalCompetitorAnalyzer:
             print(f"{prefix} {message}")
     
     def google_search(self, query: str, num_results: int = 10) -> List[Dict]:
-        """Search using Google Custom Search API"""
+        """Search using Google Custom Search API, via the on-disk search cache"""
+        cached = self.search_cache.get(query, num_results)
+        if cached is not None:
+            self.last_search_status = 'cached'
+            self._log(f"Found {len(cached)} search results for '{query}' (cached)")
+            return cached
+        if self.search_cache.offline:
+            self.last_search_status = 'offline_miss'
+            self._log(f"Not in search cache (offline mode): '{query}'", "warn")
+            return []
+        
         if not GOOGLE_API_KEY or not SEARCH_ENGINE_ID:
+            self.last_search_status = 'not_configured'
             self._log("Google API credentials not configured", "error")
             return []
         
@@ -74,12 +246,16 @@ class RegionalCompetitorAnalyzer:
         }
         
         try:
-            response = requests.get(url, params=params, timeout=10)
+            with time_upstream('search', 'customsearch'):
+                response = requests.get(url, params=params, timeout=10)
             response.raise_for_status()
             items = response.json().get('items', [])
+            self.search_cache.put(query, num_results, items)
+            self.last_search_status = 'fetched'
             self._log(f"Found {len(items)} search results for '{query}'")
             return items
         except Exception as e:
+            self.last_search_status = 'error'
             self._log(f"Search error: {e}", "error")
             return []
     
@@ -415,41 +591,94 @@ class RegionalCompetitorAnalyzer:
         
         return False
     
+    def _expected_yield(self, template: Dict, missing: List[str]) -> float:
+        """Platforms a query template is expected to find among those still missing"""
+        stats = self.query_yield_stats.get(template['id'], {})
+        runs = stats.get('runs', 0)
+        found = stats.get('found', {})
+        # Laplace-smoothed find rate, so untried templates start at 0.5 per platform
+        return sum((found.get(platform, 0) + 1) / (runs + 2)
+                   for platform in template['targets'] if platform in missing)
+    
+    def _record_query_yield(self, template_id: str, new_urls: int, found: List[str]):
+        stats = self.query_yield_stats.setdefault(template_id, {'runs': 0, 'new_urls': 0, 'found': {}})
+        stats['runs'] += 1
+        stats['new_urls'] += new_urls
+        for platform in found:
+            stats['found'][platform] = stats['found'].get(platform, 0) + 1
+    
+    def save_query_yield_stats(self):
+        """Write per-template yield statistics so later runs plan with them"""
+        if self.search_cache.offline:
+            return  # Replays make no API calls, so there is nothing new to learn
+        os.makedirs(os.path.dirname(QUERY_YIELD_STATS_FILE), exist_ok=True)
+        with open(QUERY_YIELD_STATS_FILE, 'w', encoding='utf-8') as f:
+            json.dump(self.query_yield_stats, f, indent=2, sort_keys=True)
+    
+    def _classify_result(self, name: str, result: Dict, position: int,
+                         discovered: Dict, website_candidates: List[Dict]):
+        """Validate one search result and record it as a candidate or platform URL"""
+        url = result['link']
+        title = result.get('title', '')
+        snippet = result.get('snippet', '')
+        platform = self.classify_url(url)
+        
+        if platform == 'website' and not discovered['website']:
+            # Use flexible name matching
+            is_match = self._check_name_match(name, f"{title} {snippet}", url)
+            
+            # Quick validation without scraping (URL-based only)
+            validation = self.is_likely_official_website(url, name, scraped_data=None)
+            
+            # Store candidate with its validation score
+            website_candidates.append({
+                'url': url,
+                'validation': validation,
+                'result_position': position,
+                'name_match': is_match,
+                'title': title
+            })
+            
+            self._log(f"  Candidate: {url}", "info")
+            self._log(f"  Official confidence: {validation['confidence']:.2%}", "info")
+            for signal in validation['signals'][:3]:  # Show top 3 signals
+                self._log(f"    {signal}", "info")
+            
+        elif platform in discovered and not discovered[platform]:
+            # Validate social media URLs before accepting
+            if platform in ['facebook', 'instagram', 'youtube', 'linkedin']:
+                validation = self.is_likely_official_social_media(url, name, platform)
+                self._log(f"  {platform.title()} candidate: {url}", "info")
+                self._log(f"  Official confidence: {validation['confidence']:.2%}", "info")
+                for signal in validation['signals']:
+                    self._log(f"    {signal}", "info")
+                
+                if validation['is_official']:
+                    discovered[platform] = url
+                else:
+                    self._log(f"  Rejected {platform} URL (not official page/profile)", "warn")
+            else:
+                # TripAdvisor is always accepted (it's inherently third-party)
+                discovered[platform] = url
+        # A platform already found keeps the first URL accepted for it
+    
+    def _missing_platforms(self, discovered: Dict, website_candidates: List[Dict]) -> List[str]:
+        """Planned platforms not yet found with enough confidence to stop searching"""
+        missing = [p for p in PLANNED_PLATFORMS if p != 'website' and not discovered[p]]
+        if not any(c['validation']['is_official'] and
+                   c['validation']['confidence'] >= WEBSITE_CONFIDENCE_TO_STOP for c in website_candidates):
+            missing.insert(0, 'website')
+        return missing
+    
     def discover_digital_presence(self, name: str, country: str, sector: str) -> Dict:
-        """Discover all digital touchpoints for a competitor"""
+        """
+        Discover all digital touchpoints for a competitor. Queries are planned
+        one at a time: the template with the highest expected yield for the
+        platforms still missing runs next, and searching stops once every
+        planned platform has been found with enough confidence.
+        """
         self._log(f"Discovering digital presence: {name} ({country}, {sector})")
         
-        # Enhanced search strategy with targeted platform searches
-        queries = [
-            # General searches
-            f"{name} {country}",
-            f"{name} {sector} {country}",
-            f"{name}",
-            # Targeted social media searches
-            f"{name} facebook",
-            f"{name} instagram",
-            f"{name} tripadvisor",
-            # Platform-specific searches for better discovery
-            f"site:facebook.com {name}",
-            f"site:instagram.com {name}",
-            f"site:tripadvisor.com {name}"
-        ]
-        
-        all_results = []
-        for query in queries:
-            results = self.google_search(query, num_results=10)
-            all_results.extend(results)
-            time.sleep(0.5)  # Rate limiting
-        
-        # Deduplicate by URL
-        seen_urls = set()
-        unique_results = []
-        for result in all_results:
-            url = result['link']
-            if url not in seen_urls:
-                seen_urls.add(url)
-                unique_results.append(result)
-        
         # Classify results
         discovered = {
             'website': None,
@@ -458,59 +687,60 @@ class RegionalCompetitorAnalyzer:
             'tripadvisor': None,
             'youtube': None,
             'linkedin': None,
-            'search_results': unique_results
+            'search_results': []
         }
-        
-        # Process results with flexible matching
+        unique_results = discovered['search_results']
+        seen_urls = set()
         website_candidates = []  # Store candidates with validation scores
         
-        for i, result in enumerate(unique_results):
-            url = result['link']
-            title = result.get('title', '')
-            snippet = result.get('snippet', '')
-            platform = self.classify_url(url)
+        queries = {t['id']: t['query'].format(name=name, country=country, sector=sector)
+                   for t in QUERY_TEMPLATES}
+        remaining = list(QUERY_TEMPLATES)
+        queries_run = []
+        missing = self._missing_platforms(discovered, website_candidates)
+        while missing:
+            useful = [t for t in remaining if self._expected_yield(t, missing) > 0]
+            if not useful:
+                break  # No template left targets a missing platform
+            # Queries already in the search cache go first, in template order,
+            # so a rerun replays the same searches whatever the stats now say
+            cached = [t for t in useful if self.search_cache.is_fresh(queries[t['id']], 10)]
+            if cached:
+                template = cached[0]
+            elif self.search_cache.offline:
+                break  # Anything else would be an offline miss
+            else:
+                # Highest expected yield first; ties keep the template order
+                template = max(useful, key=lambda t: self._expected_yield(t, missing))
+            remaining.remove(template)
             
-            if platform == 'website' and not discovered['website']:
-                # Use flexible name matching
-                is_match = self._check_name_match(name, f"{title} {snippet}", url)
-                
-                # Quick validation without scraping (URL-based only)
-                validation = self.is_likely_official_website(url, name, scraped_data=None)
-                
-                # Store candidate with its validation score
-                website_candidates.append({
-                    'url': url,
-                    'validation': validation,
-                    'result_position': i,
-                    'name_match': is_match,
-                    'title': title
-                })
-                
-                self._log(f"  Candidate: {url}", "info")
-                self._log(f"  Official confidence: {validation['confidence']:.2%}", "info")
-                for signal in validation['signals'][:3]:  # Show top 3 signals
-                    self._log(f"    {signal}", "info")
-                
-            elif platform in discovered and not discovered[platform]:
-                # Validate social media URLs before accepting
-                if platform in ['facebook', 'instagram', 'youtube', 'linkedin']:
-                    validation = self.is_likely_official_social_media(url, name, platform)
-                    self._log(f"  {platform.title()} candidate: {url}", "info")
-                    self._log(f"  Official confidence: {validation['confidence']:.2%}", "info")
-                    for signal in validation['signals']:
-                        self._log(f"    {signal}", "info")
-                    
-                    if validation['is_official']:
-                        discovered[platform] = url
-                    else:
-                        self._log(f"  Rejected {platform} URL (not official page/profile)", "warn")
-                else:
-                    # TripAdvisor is always accepted (it's inherently third-party)
-                    discovered[platform] = url
-            elif platform in discovered and discovered[platform]:
-                # Already found this platform, but might be a better match
-                # Keep the first one found
-                pass
+            query = queries[template['id']]
+            results = self.google_search(query, num_results=10)
+            queries_run.append(template['id'])
+            
+            new_urls = 0
+            for result in results:
+                url = result['link']
+                if url in seen_urls:
+                    continue
+                seen_urls.add(url)
+                unique_results.append(result)
+                new_urls += 1
+                self._classify_result(name, result, len(unique_results) - 1, discovered, website_candidates)
+            
+            still_missing = self._missing_platforms(discovered, website_candidates)
+            if self.last_search_status == 'fetched':
+                # Only real API calls count: failures and replays from the
+                # cache would skew the rates or count a search twice
+                self._record_query_yield(template['id'], new_urls, [p for p in missing if p not in still_missing])
+            missing = still_missing
+            if self.last_search_status in ('fetched', 'error'):
+                time.sleep(0.5)  # Rate limiting, only after a real API request
+        
+        self.query_counts['run'] += len(queries_run)
+        self.query_counts['skipped'] += len(QUERY_TEMPLATES) - len(queries_run)
+        self._log(f"Ran {len(queries_run)}/{len(QUERY_TEMPLATES)} search queries"
+                  f"{' (stopped early, all platforms found)' if not missing else ''}")
         
         # Select best website candidate based on validation
         if website_candidates:
@@ -537,6 +767,7 @@ class RegionalCompetitorAnalyzer:
         
         # Add validation metadata for transparency
         discovered['_validation_metadata'] = {
+            'queries_run': queries_run,
             'website_candidates_checked': len(website_candidates),
             'best_website_confidence': website_candidates[0]['validation']['confidence'] if website_candidates else 0.0
         }
@@ -548,19 +779,23 @@ class RegionalCompetitorAnalyzer:
         self._log(f"Scraping website: {url}")
         
         try:
-            response = requests.get(url, headers={'User-Agent': USER_AGENT}, timeout=15)
+            # Served from the on-disk fetch cache when fetched recently (or offline)
+            with time_upstream('scrape', 'requests'):
+                response = get_fetch_cache().get(url, headers={'User-Agent': USER_AGENT}, timeout=15)
             
             if response.status_code != 200:
                 return {'error': f'HTTP {response.status_code}', 'text': '', 'meta': {}}
             
             html = response.text
-            soup = BeautifulSoup(html, 'html.parser')
+            # Parsed once; the lookups below are answered from its element index
+            doc = HtmlDocument(html)
+            title = doc.find('title')
             
             # Extract comprehensive data
             data = {
                 'url': url,
-                'text': soup.get_text()[:5000],  # First 5000 chars
-                'title': soup.title.string if soup.title else '',
+                'text': doc.soup.get_text()[:5000],  # First 5000 chars
+                'title': title.string if title else '',
                 'meta_description': '',
                 'headings': [],
                 'links': [],
@@ -576,17 +811,17 @@ class RegionalCompetitorAnalyzer:
             }
             
             # Meta description
-            meta_desc = soup.find('meta', attrs={'name': 'description'})
-            if meta_desc:
-                data['meta_description'] = meta_desc.get('content', '')
+            meta_desc = doc.meta_content(name='description')
+            if meta_desc is not None:
+                data['meta_description'] = meta_desc
             
             # Headings (first 10)
             for i in range(1, 7):
-                headings = soup.find_all(f'h{i}')
+                headings = doc.find_all(f'h{i}')
                 data['headings'].extend([h.get_text().strip() for h in headings[:10]])
             
             # Links (analyze first 20)
-            links = soup.find_all('a', href=True)[:20]
+            links = [a for a in doc.find_all('a') if a.has_attr('href')][:20]
             data['links'] = [
                 {
                     'href': link.get('href'),
@@ -596,7 +831,7 @@ class RegionalCompetitorAnalyzer:
             ]
             
             # Images (first 15)
-            images = soup.find_all('img')[:15]
+            images = doc.find_all('img', limit=15)
             data['images'] = [
                 {
                     'src': img.get('src'),
@@ -606,7 +841,7 @@ class RegionalCompetitorAnalyzer:
             ]
             
             # Forms
-            forms = soup.find_all('form')
+            forms = doc.find_all('form')
             data['forms'] = [
                 {
                     'action': form.get('action'),
@@ -616,12 +851,11 @@ class RegionalCompetitorAnalyzer:
             ]
             
             # Mobile-friendly check
-            viewport = soup.find('meta', attrs={'name': 'viewport'})
-            data['has_viewport'] = bool(viewport)
+            data['has_viewport'] = doc.meta_content(name='viewport') is not None
             
             # Schema markup check
-            schema = soup.find_all(['script'], {'type': 'application/ld+json'})
-            data['has_schema'] = len(schema) > 0
+            data['has_schema'] = any(script.get('type') == 'application/ld+json'
+                                     for script in doc.find_all('script'))
             
             # Contact info extraction
             import re
@@ -642,91 +876,8 @@ class RegionalCompetitorAnalyzer:
             self._log(f"Scraping error: {e}", "error")
             return {'error': str(e), 'text': '', 'meta': {}}
     
-    def ai_analyze_category(self, category: str, evidence: Dict, sector: str, country: str) -> Dict:
-        """Use OpenAI to analyze and score a specific category based on evidence"""
-        
-        if not client:
-            self._log("OpenAI not configured, skipping AI analysis", "warn")
-            return {'score': 0, 'reasoning': 'AI not configured', 'confidence': 'none'}
-        
-        # Category-specific criteria (the 10 criteria for each)
-        category_criteria = {
-            'Social Media': [
-                'Has business account on primary platform (Facebook/Instagram)',
-                'Has business account on second platform',
-                'Has business account on third platform',
-                'Posts monthly in last 6 months',
-                'Posts 2x monthly in last 6 months',
-                'Posts weekly in last 6 months',
-                'Clear, in-focus photos/videos',
-                'Shows products/services consistently',
-                'Uses platform business features (catalog, hours, etc.)',
-                'Contact info clearly visible in bio/about'
-            ],
-            'Website': [
-                'Website exists and loads',
-                'Mobile-friendly/responsive',
-                'No major usability issues',
-                'Services/products clearly described',
-                'Contact information clearly visible',
-                'Working contact forms',
-                'Content updated within last 6 months',
-                'Modern, professional design',
-                'Multiple pages (not just homepage)',
-                'Links to social media accounts'
-            ],
-            'Visual Content': [
-                'Has original photos (not just stock)',
-                'Photos show actual products/services/location',
-                'Multiple types of visual content',
-                'Professional quality (good lighting, composition)',
-                'Shows variety (different angles, settings)',
-                'Includes people/customers (authentic)',
-                'Behind-the-scenes or process content',
-                'User-generated content or collaborations',
-                'Consistent visual style/branding',
-                'Videos or dynamic content'
-            ],
-            'Discoverability': [
-                'Appears in Google search for business name',
-                'Has Google My Business / Maps listing',
-                'Listed on TripAdvisor or similar',
-                'Appears on first page of search results',
-                'GMB has photos',
-                'Listed on multiple directories',
-                'Has customer reviews',
-                '5+ reviews on any platform',
-                'Responds to reviews',
-                'Has backlinks from other sites'
-            ],
-            'Digital Sales': [
-                'Has WhatsApp business button/number',
-                'Contact form for inquiries',
-                'Prices visible online',
-                'Online booking system',
-                'Accepts mobile money/online payments',
-                'Listed on OTA (Airbnb, Booking.com, etc.)',
-                'Clear call-to-action for booking',
-                'Digital catalog/menu of services',
-                'Testimonials or social proof',
-                'FAQ or detailed service info'
-            ],
-            'Platform Integration': [
-                'On Google My Business',
-                'On TripAdvisor',
-                'On national tourism website',
-                'On Airbnb/Booking.com (if applicable)',
-                'On GetYourGuide or similar',
-                'Featured in tourism campaigns',
-                'Partner with hotels/DMCs',
-                'Cross-listed on multiple platforms',
-                'Profile >75% complete on platforms',
-                'Active on tourism directories'
-            ]
-        }
-        
-        criteria = category_criteria.get(category, [])
-        
+    def _format_evidence(self, evidence: Dict) -> str:
+        """Evidence section of the scoring prompts"""
         # Build evidence summary
         evidence_summary = {
             'website_found': bool(evidence.get('website_data')),
@@ -753,15 +904,7 @@ class RegionalCompetitorAnalyzer:
                 'text_sample': wd.get('text', '')[:500]
             }
         
-        # Create AI prompt
-        prompt = f"""You are analyzing the digital presence of a {sector} business in {country} for the category: {category}.
-
-**Category Criteria (score 0-10 based on these):**
-{chr(10).join([f"{i+1}. {c}" for i, c in enumerate(criteria)])}
-
-**Evidence Found:**
-
-Search Visibility:
+        return f"""Search Visibility:
 - Appears in {evidence_summary['search_visibility']} search results
 - Found on Google search: {'Yes' if evidence_summary['search_visibility'] > 0 else 'No'}
 
@@ -779,7 +922,28 @@ Website Analysis:
 {f"- Contact info visible: {evidence_summary['website_content'].get('has_contact', False)}" if evidence_summary['website_found'] else ''}
 {f"- Number of images: {evidence_summary['website_content'].get('num_images', 0)}" if evidence_summary['website_found'] else ''}
 {f"- Mobile-friendly: {evidence_summary['website_content'].get('mobile_friendly', False)}" if evidence_summary['website_found'] else ''}
-{f"- Content sample: {evidence_summary['website_content'].get('text_sample', '')}" if evidence_summary['website_found'] else ''}
+{f"- Content sample: {evidence_summary['website_content'].get('text_sample', '')}" if evidence_summary['website_found'] else ''}"""
+    
+    def ai_analyze_category(self, category: str, evidence: Dict, sector: str, country: str) -> Dict:
+        """Use OpenAI to analyze and score a specific category based on evidence"""
+        
+        if not client:
+            self._log("OpenAI not configured, skipping AI analysis", "warn")
+            return {'score': 0, 'reasoning': 'AI not configured', 'confidence': 'none'}
+        
+        criteria = CATEGORY_CRITERIA.get(category, [])
+        
+        evidence_text = self._format_evidence(evidence)
+        
+        # Create AI prompt
+        prompt = f"""You are analyzing the digital presence of a {sector} business in {country} for the category: {category}.
+
+**Category Criteria (score 0-10 based on these):**
+{chr(10).join([f"{i+1}. {c}" for i, c in enumerate(criteria)])}
+
+**Evidence Found:**
+
+{evidence_text}
 
 **Task:**
 Based ONLY on the evidence above, evaluate this business for {category}. 
@@ -801,15 +965,16 @@ Respond in JSON format:
 Only return the JSON, nothing else."""
 
         try:
-            response = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": "You are a digital assessment expert. Analyze evidence and score accurately based on objective criteria."},
-                    {"role": "user", "content": prompt}
-                ],
-                response_format={"type": "json_object"},
-                temperature=0.3  # Lower temperature for more consistent scoring
-            )
+            with time_upstream('openai', 'chat.completions'):
+                response = client.chat.completions.create(
+                    model="gpt-4o-mini",
+                    messages=[
+                        {"role": "system", "content": "You are a digital assessment expert. Analyze evidence and score accurately based on objective criteria."},
+                        {"role": "user", "content": prompt}
+                    ],
+                    response_format={"type": "json_object"},
+                    temperature=0.3  # Lower temperature for more consistent scoring
+                )
             
             result = json.loads(response.choices[0].message.content)
             self._log(f"{category}: {result['score']}/10 ({result['confidence']} confidence)", "success")
@@ -825,6 +990,94 @@ Only return the JSON, nothing else."""
                 'evidence_gaps': 'Analysis failed'
             }
     
+    def _validate_category_result(self, result) -> Optional[Dict]:
+        """A category from the multi-category response in ai_analyze_category's shape, or None if malformed"""
+        if not isinstance(result, dict):
+            return None
+        scores = result.get('criteria_scores')
+        if (not isinstance(scores, list) or len(scores) != 10 or
+                any(type(score) is not int or score not in (0, 1) for score in scores)):
+            return None
+        if result.get('confidence') not in ('high', 'medium', 'low') or not isinstance(result.get('reasoning'), str):
+            return None
+        return {
+            'score': sum(scores),
+            'criteria_scores': scores,
+            'reasoning': result['reasoning'],
+            'confidence': result['confidence'],
+            'evidence_gaps': str(result.get('evidence_gaps', ''))
+        }
+    
+    def ai_analyze_all_categories(self, evidence: Dict, sector: str, country: str) -> Dict[str, Dict]:
+        """
+        Score every category in CATEGORY_CRITERIA with one OpenAI call, sending
+        the evidence once. Returns the categories whose response passed
+        validation (all of them when the call works, none when it fails), each
+        in the same shape as ai_analyze_category
+        """
+        if not client:
+            return {}
+        
+        criteria_text = '\n\n'.join(
+            f"{category}:\n" + '\n'.join(f"{i+1}. {c}" for i, c in enumerate(criteria))
+            for category, criteria in CATEGORY_CRITERIA.items()
+        )
+        prompt = f"""You are analyzing the digital presence of a {sector} business in {country} across {len(CATEGORY_CRITERIA)} categories.
+
+**Category Criteria (10 per category):**
+{criteria_text}
+
+**Evidence Found:**
+
+{self._format_evidence(evidence)}
+
+**Task:**
+Based ONLY on the evidence above, evaluate this business for every category.
+
+For each of the 10 criteria in each category:
+1. Determine if evidence suggests it's met (1 point) or not (0 points)
+2. Be conservative - only award points if evidence clearly supports it
+3. If evidence is missing or unclear, score 0 for that criterion
+
+Respond in JSON with one entry per category name:
+{{
+  "<category>": {{
+    "criteria_scores": [<10 individual scores, 0 or 1, in the order listed>],
+    "reasoning": "<2-3 sentence explanation of score>",
+    "confidence": "<high/medium/low>",
+    "evidence_gaps": "<what evidence is missing that would increase score>"
+  }}
+}}"""
+        
+        try:
+            with time_upstream('openai', 'chat.completions'):
+                response = client.chat.completions.create(
+                    model="gpt-4o-mini",
+                    messages=[
+                        {"role": "system", "content": "You are a digital assessment expert. Analyze evidence and score accurately based on objective criteria."},
+                        {"role": "user", "content": prompt}
+                    ],
+                    response_format={"type": "json_schema", "json_schema": ALL_CATEGORIES_SCHEMA},
+                    temperature=0.3  # Lower temperature for more consistent scoring
+                )
+            content = json.loads(response.choices[0].message.content)
+        except Exception as e:
+            self._log(f"Multi-category AI analysis error: {e}", "error")
+            return {}
+        
+        if not isinstance(content, dict):
+            self._log("Multi-category AI analysis returned no categories", "error")
+            return {}
+        results = {}
+        for category in CATEGORY_CRITERIA:
+            result = self._validate_category_result(content.get(category))
+            if result is None:
+                self._log(f"{category}: malformed multi-category response", "warn")
+                continue
+            results[category] = result
+            self._log(f"{category}: {result['score']}/10 ({result['confidence']} confidence)", "success")
+        return results
+    
     def analyze_competitor(self, name: str, country: str, sector: str) -> Dict:
         """Complete analysis of one competitor"""
         
@@ -854,21 +1107,17 @@ Only return the JSON, nothing else."""
             'linkedin': presence.get('linkedin')
         }
         
-        # Step 4: AI analysis for each category
-        categories = [
-            'Social Media',
-            'Website', 
-            'Visual Content',
-            'Discoverability',
-            'Digital Sales',
-            'Platform Integration'
-        ]
-        
+        # Step 4: AI analysis of all categories in one call, falling back to
+        # one call per category for any the combined response got wrong
         analysis_results = {}
-        for category in categories:
-            result = self.ai_analyze_category(category, evidence, sector, country)
-            analysis_results[category] = result
-            time.sleep(0.5)  # Rate limiting
+        if self.multi_category_scoring:
+            analysis_results = self.ai_analyze_all_categories(evidence, sector, country)
+        missing = [category for category in CATEGORY_CRITERIA if category not in analysis_results]
+        if self.multi_category_scoring and missing and client:
+            self._log(f"Falling back to per-category analysis for {len(missing)} categories", "warn")
+        for category in missing:
+            analysis_results[category] = self.ai_analyze_category(category, evidence, sector, country)
+        analysis_results = {category: analysis_results[category] for category in CATEGORY_CRITERIA}
         
         # Step 5: Calculate totals
         total_score = sum(r['score'] for r in analysis_results.values())
@@ -1193,9 +1442,10 @@ def main():
     
     # Check API keys
     missing_keys = []
-    if not GOOGLE_API_KEY:
+    search_offline = get_search_cache().offline  # Replays cached searches, no search keys needed
+    if not GOOGLE_API_KEY and not search_offline:
         missing_keys.append("GOOGLE_API_KEY")
-    if not SEARCH_ENGINE_ID:
+    if not SEARCH_ENGINE_ID and not search_offline:
         missing_keys.append("GOOGLE_SEARCH_ENGINE_ID")
     if not OPENAI_API_KEY:
         missing_keys.append("OPENAI_API_KEY")
@@ -1323,6 +1573,12 @@ def main():
             json.dump(results, f, indent=2)
         
         print(f"\n✅ Complete! Results saved to: {output_file}")
+    
+    analyzer.save_query_yield_stats()
+    analyzer.print_query_plan_summary()
+    print_upstream_summary()
+    get_fetch_cache().print_summary()
+    analyzer.search_cache.print_summary()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Precomputed aggregate views over the CI Assessment rows
+Sector counts, external score statistics and maturity distributions are built
+once per snapshot and updated row-by-row when only a few rows change
+"""
+
+import bisect
+import copy
+import threading
+from collections import Counter
+from typing import Dict, List, Optional
+
+SECTOR_COLUMN = 1
+EXTERNAL_TOTAL_COLUMN = 9
+MATURITY_LEVELS = ['Absent', 'Basic', 'Intermediate', 'Advanced']
+
+
+def safe_float(value):
+    """Safely convert to float"""
+    try:
+        return float(value) if value and str(value).strip() else 0.0
+    except (ValueError, TypeError):
+        return 0.0
+
+
+def get_maturity_level(score):
+    """Determine maturity level based on score"""
+    if score >= 60:
+        return "Advanced"
+    elif score >= 40:
+        return "Intermediate"
+    elif score >= 20:
+        return "Basic"
+    else:
+        return "Absent"
+
+
+class SectorStats:
+    """Running statistics for one sector"""
+
+    def __init__(self):
+        self.count = 0
+        # Positive external scores only, kept sorted so min/max survive removals
+        self.scores: List[float] = []
+        self.maturity = Counter()
+
+    def add(self, score: float):
+        self.count += 1
+        if score > 0:
+            bisect.insort(self.scores, score)
+        self.maturity[get_maturity_level(score)] += 1
+
+    def remove(self, score: float):
+        self.count -= 1
+        if score > 0:
+            i = bisect.bisect_left(self.scores, score)
+            if i < len(self.scores) and self.scores[i] == score:
+                del self.scores[i]
+        level = get_maturity_level(score)
+        self.maturity[level] -= 1
+        if self.maturity[level] <= 0:
+            del self.maturity[level]
+
+    def to_dict(self) -> Dict:
+        scores = self.scores
+        return {
+            'count': self.count,
+            'avg_score': sum(scores) / len(scores) if scores else 0,
+            'min_score': scores[0] if scores else 0,
+            'max_score': scores[-1] if scores else 0,
+            'scored_count': len(scores),
+            'maturity_distribution': {level: self.maturity.get(level, 0) for level in MATURITY_LEVELS}
+        }
+
+
+class SectorAggregates:
+    """Materialised per-sector view of the assessment rows (header row first)"""
+
+    # Above this share of changed rows a full rebuild is cheaper than diffing
+    REBUILD_RATIO = 0.5
+
+    def __init__(self, rows: List[List[str]]):
+        self._build(rows)
+
+    def _build(self, rows: List[List[str]]):
+        self.header = list(rows[0]) if rows else []
+        self.rows = [list(r) for r in rows[1:]]
+        self.sectors: Dict[str, SectorStats] = {}
+        for row in self.rows:
+            self._add_row(row)
+        self._payloads = {}
+
+    def _row_key(self, row: Optional[List[str]]):
+        """(sector, external score) for rows that count towards a sector"""
+        if row is None or len(row) <= SECTOR_COLUMN:
+            return None
+        score = safe_float(row[EXTERNAL_TOTAL_COLUMN]) if len(row) > EXTERNAL_TOTAL_COLUMN else 0
+        return row[SECTOR_COLUMN], score
+
+    def _add_row(self, row):
+        key = self._row_key(row)
+        if key is None:
+            return
+        sector, score = key
+        if sector not in self.sectors:
+            self.sectors[sector] = SectorStats()
+        self.sectors[sector].add(score)
+
+    def _remove_row(self, row):
+        key = self._row_key(row)
+        if key is None:
+            return
+        sector, score = key
+        stats = self.sectors.get(sector)
+        if stats is None:
+            return
+        stats.remove(score)
+        if stats.count <= 0:
+            del self.sectors[sector]
+
+    def update_row(self, index: int, new_row: Optional[List[str]]):
+        """
+        Replace a single data row (0-based, header excluded) and adjust the
+        aggregates incrementally. new_row=None removes the row.
+        """
+        old_row = self.rows[index] if index < len(self.rows) else None
+        if old_row == new_row:
+            return
+        self._remove_row(old_row)
+        self._add_row(new_row)
+
+        if new_row is None:
+            if index < len(self.rows):
+                del self.rows[index]
+        elif index < len(self.rows):
+            self.rows[index] = list(new_row)
+        else:
+            self.rows.append(list(new_row))
+        self._payloads = {}
+
+    def apply_rows(self, rows: List[List[str]]) -> int:
+        """
+        Bring the view in line with a new set of rows, touching only the rows
+        that changed. Returns the number of rows that changed.
+        """
+        new_header = list(rows[0]) if rows else []
+        new_rows = rows[1:]
+        if new_header != self.header:
+            self._build(rows)
+            return len(new_rows)
+
+        length = max(len(self.rows), len(new_rows))
+        changed = [i for i in range(length)
+                   if i >= len(self.rows) or i >= len(new_rows) or self.rows[i] != new_rows[i]]
+        if not changed:
+            return 0
+        if len(changed) > max(1, length * self.REBUILD_RATIO):
+            self._build(rows)
+            return len(changed)
+
+        # Apply edits first, then trailing removals from the end so indexes stay valid
+        for i in changed:
+            if i < len(new_rows):
+                self.update_row(i, new_rows[i])
+        for i in reversed(range(len(new_rows), len(self.rows))):
+            self.update_row(i, None)
+        return len(changed)
+
+    def copy(self) -> 'SectorAggregates':
+        """Independent copy, so updates never touch a view other threads are reading"""
+        return copy.deepcopy(self)
+
+    def sectors_payload(self) -> Dict:
+        """Response body for /api/sectors"""
+        if 'sectors' not in self._payloads:
+            self._payloads['sectors'] = {sector: stats.to_dict() for sector, stats in self.sectors.items()}
+        return self._payloads['sectors']
+
+    def dashboard_payload(self) -> Dict:
+        """Sector summary used by /api/dashboard"""
+        if 'dashboard' not in self._payloads:
+            self._payloads['dashboard'] = {
+                'total': len(self.rows),
+                'sectors': {sector: stats.count for sector, stats in self.sectors.items()}
+            }
+        return self._payloads['dashboard']
+
+
+class AggregateViewCache:
+    """Keeps one SectorAggregates per snapshot version, derived from the previous one"""
+
+    def __init__(self, range_name: str):
+        self.range_name = range_name
+        # (snapshot version, views) swapped as one object so readers never see a mix
+        self._current = (None, None)
+        self._lock = threading.Lock()
+        # Best-effort counters for /api/metrics
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, snapshot) -> SectorAggregates:
+        """Aggregates for this snapshot, built at most once per version"""
+        version, views = self._current
+        if views is not None and version == snapshot.version:
+            self.hits += 1
+            return views
+
+        with self._lock:
+            version, views = self._current
+            if views is not None and version == snapshot.version:
+                self.hits += 1
+                return views
+            self.misses += 1
+            rows = snapshot.rows(self.range_name)
+            if views is None:
+                views = SectorAggregates(rows)
+            else:
+                # Copy-on-write: readers keep using the old view until the swap
+                views = views.copy()
+                views.apply_rows(rows)
+            views.sectors_payload()
+            views.dashboard_payload()
+            self._current = (snapshot.version, views)
+            return views
@@ -4,34 +4,49 @@ Simple authentication server that connects to Google Sheets auth tab
 """
 
 import os
+import sys
 import json
 import http.server
 import socketserver
+import threading
 import urllib.parse
-from datetime import datetime
 from google.oauth2 import service_account
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from shared.utils.metrics import MetricsHandlerMixin, registry as metrics
+
+from user_directory import UserDirectory
+
 # Configuration
 SHEET_ID = '1yxzgYWme1xW9uMX3jSz6t9BFI-tdV14UVmPiDjW_XCM'
 CREDENTIALS_PATH = '/Users/alexjeffries/tourism-commons/tourism-development-d620c-5c9db9e21301.json'
 SCOPES = ['https://www.googleapis.com/auth/spreadsheets']
 
-class AuthHandler(http.server.SimpleHTTPRequestHandler):
-    def __init__(self, *args, **kwargs):
-        # Initialize Google Sheets service
-        try:
-            credentials = service_account.Credentials.from_service_account_file(
-                CREDENTIALS_PATH, scopes=SCOPES
-            )
-            self.sheets_service = build('sheets', 'v4', credentials=credentials)
-            print("✅ Connected to Google Sheets for authentication")
-        except Exception as e:
-            print(f"❌ Error connecting to Google Sheets: {e}")
-            self.sheets_service = None
-        super().__init__(*args, **kwargs)
-
+_service = None
+_service_lock = threading.Lock()
+
+def get_sheets_service():
+    """Build the Sheets service once per process (not once per request)"""
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                try:
+                    credentials = service_account.Credentials.from_service_account_file(
+                        CREDENTIALS_PATH, scopes=SCOPES
+                    )
+                    _service = build('sheets', 'v4', credentials=credentials)
+                    print("✅ Connected to Google Sheets for authentication")
+                except Exception as e:
+                    print(f"❌ Error connecting to Google Sheets: {e}")
+    return _service
+
+user_directory = UserDirectory(SHEET_ID, get_sheets_service)
+metrics.register_cache('user_directory', lambda: (user_directory.hits, user_directory.misses))
+
+class AuthHandler(MetricsHandlerMixin, http.server.SimpleHTTPRequestHandler):
     def do_OPTIONS(self):
         """Handle CORS preflight requests"""
         self.send_response(200)
@@ -40,6 +55,13 @@ class AuthHandler(http.server.SimpleHTTPRequestHandler):
         self.send_header('Access-Control-Allow-Headers', 'Content-Type')
         self.end_headers()
 
+    def do_GET(self):
+        """Handle GET requests"""
+        if urllib.parse.urlsplit(self.path).path == '/api/metrics':
+            self.send_metrics_response()
+        else:
+            super().do_GET()
+
     def do_POST(self):
         """Handle POST requests"""
         if self.path == '/api/auth/login':
@@ -79,80 +101,16 @@ class AuthHandler(http.server.SimpleHTTPRequestHandler):
             self.send_error_response(500, "Internal server error")
 
     def authenticate_user(self, username):
-        """Authenticate user against Google Sheets"""
+        """Look a username up in the in-memory user directory"""
         try:
-            if not self.sheets_service:
-                return None
-
-            # Read auth data from Google Sheets
-            result = self.sheets_service.spreadsheets().values().get(
-                spreadsheetId=SHEET_ID,
-                range='dashboard_auth!A1:Z100'
-            ).execute()
-            
-            rows = result.get('values', [])
-            if not rows:
-                return None
-
-            headers = rows[0]
-            for row in rows[1:]:
-                if len(row) >= 3 and row[1].strip().lower() == username:
-                    # Found user
-                    user_data = {
-                        'id': row[1].strip().lower(),
-                        'username': row[1].strip().lower(),
-                        'name': row[0].strip(),
-                        'role': row[2].strip().lower() if len(row) > 2 else 'user',
-                        'email': f"{row[1].strip().lower()}@itc.int",
-                        'loginCount': int(row[4]) if len(row) > 4 and row[4].strip() else 0
-                    }
-                    return user_data
-            
-            return None
-
+            return user_directory.authenticate(username)
         except Exception as e:
             print(f"Authentication error: {e}")
             return None
 
     def update_user_login(self, username):
-        """Update user login count and timestamp"""
-        try:
-            if not self.sheets_service:
-                return
-
-            # Read current data
-            result = self.sheets_service.spreadsheets().values().get(
-                spreadsheetId=SHEET_ID,
-                range='dashboard_auth!A1:Z100'
-            ).execute()
-            
-            rows = result.get('values', [])
-            if not rows:
-                return
-
-            # Find user row and update
-            for i, row in enumerate(rows[1:], start=2):  # Start from row 2 (skip header)
-                if len(row) >= 2 and row[1].strip().lower() == username:
-                    # Update login count
-                    current_count = int(row[4]) if len(row) > 4 and row[4].strip() else 0
-                    new_count = current_count + 1
-                    
-                    # Update the row
-                    update_range = f'dashboard_auth!E{i}:F{i}'
-                    values = [[str(new_count), datetime.now().isoformat()]]
-                    
-                    self.sheets_service.spreadsheets().values().update(
-                        spreadsheetId=SHEET_ID,
-                        range=update_range,
-                        valueInputOption='RAW',
-                        body={'values': values}
-                    ).execute()
-                    
-                    print(f"✅ Updated login for {username}: count={new_count}")
-                    break
-
-        except Exception as e:
-            print(f"Error updating login: {e}")
+        """Record a login; the sheet is updated by the next write-behind flush"""
+        user_directory.record_login(username)
 
     def send_success_response(self, data):
         """Send success response"""
@@ -173,7 +131,8 @@ class AuthHandler(http.server.SimpleHTTPRequestHandler):
 def run_auth_server(port=5002):
     """Run the authentication server"""
     print(f"🚀 Starting authentication server on port {port}")
-    print("📊 Connected to Google Sheets for user authentication")
+    metrics.server = 'auth'
+    user_directory.start()
     
     with socketserver.TCPServer(("", port), AuthHandler) as httpd:
         print(f"✅ Authentication server running at http://localhost:{port}")
@@ -188,7 +147,11 @@ def run_auth_server(port=5002):
         print("   - hdarboe (admin)")
         print("   - yanyassi (admin)")
         print("\n🌐 Dashboard should now be accessible at http://localhost:3001")
-        httpd.serve_forever()
+        try:
+            httpd.serve_forever()
+        finally:
+            # Write out any logins still buffered
+            user_directory.stop()
 
 if __name__ == "__main__":
     run_auth_server()
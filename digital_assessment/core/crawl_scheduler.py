@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Polite concurrent crawl scheduler
+Runs scrape jobs for different domains side by side while holding each domain
+to its own concurrency limit and a minimum gap between requests, so a sweep
+spends its time fetching rather than sleeping. Completed jobs are appended to
+a journal file, and a rerun with the same journal skips them.
+"""
+
+import asyncio
+import json
+import os
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+# Jobs in flight across all domains
+DEFAULT_CONCURRENCY = 8
+# Requests in flight to any one domain, and the gap between their starts
+DEFAULT_PER_DOMAIN = 1
+DEFAULT_DOMAIN_DELAY_SECONDS = 2.0
+# Progress line at least this often even when jobs finish quickly
+PROGRESS_INTERVAL_SECONDS = 10
+
+
+def domain_key(url: str) -> str:
+    """Host a politeness budget applies to (www. and bare domain share one)"""
+    host = (urllib.parse.urlsplit(url).hostname or '').lower()
+    return host[4:] if host.startswith('www.') else host
+
+
+def job_key(job: Dict) -> str:
+    """Identity of a job in the journal: explicit 'key', else URL and page type"""
+    return job.get('key') or f"{job['url']}|{job.get('page_type', 'tour_page')}"
+
+
+class CrawlScheduler:
+    """
+    Feeds jobs ({'url', 'page_type', ...}) to a fetcher's scrape_page_async
+    (ITOContentScraper or TieredFetcher) under per-domain politeness limits
+    """
+
+    def __init__(self, fetcher, concurrency: int = DEFAULT_CONCURRENCY,
+                 per_domain: int = DEFAULT_PER_DOMAIN,
+                 domain_delay: float = DEFAULT_DOMAIN_DELAY_SECONDS,
+                 journal_path: Optional[str] = None, progress: bool = True):
+        """
+        Args:
+            fetcher: Object with async scrape_page_async(url, page_type)
+            concurrency: Jobs in flight across all domains
+            per_domain: Jobs in flight against a single domain
+            domain_delay: Minimum seconds between request starts on one domain
+            journal_path: JSON-lines file of completed jobs (None disables resume)
+            progress: Print done/total, rate and ETA as jobs complete
+        """
+        self.fetcher = fetcher
+        self.concurrency = max(1, concurrency)
+        self.per_domain = max(1, per_domain)
+        self.domain_delay = max(0.0, domain_delay)
+        self.journal_path = journal_path
+        self.progress = progress
+        self.completed = self._load_journal()
+
+        self._domain_slots: Dict[str, asyncio.Semaphore] = {}
+        self._domain_locks: Dict[str, asyncio.Lock] = {}
+        self._next_start: Dict[str, float] = {}
+        self._global_slots: Optional[asyncio.Semaphore] = None
+        self.counts = {'done': 0, 'ok': 0, 'failed': 0, 'skipped': 0, 'polite_wait_seconds': 0.0}
+
+    def _load_journal(self) -> Dict[str, Dict]:
+        if not self.journal_path or not os.path.exists(self.journal_path):
+            return {}
+        completed = {}
+        with open(self.journal_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # Partly written last line from an interrupted run
+                completed[record['key']] = record
+        return completed
+
+    def _record(self, key: str, job: Dict, result: Dict):
+        """Journal a completed job (a scheduler without a journal keeps no resume state)"""
+        if not self.journal_path:
+            return
+        record = {
+            'key': key,
+            'url': job['url'],
+            'success': bool(result.get('success')),
+            'word_count': result.get('word_count', 0),
+            'completed_at': datetime.now().isoformat(),
+        }
+        self.completed[key] = record
+        with open(self.journal_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record) + '\n')
+
+    def reset(self):
+        """Forget completed jobs and delete the journal"""
+        self.completed = {}
+        if self.journal_path and os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
+
+    def pending(self, jobs: List[Dict]) -> List[Dict]:
+        """Jobs not yet recorded in the journal (all of them without a journal)"""
+        return [job for job in jobs if job_key(job) not in self.completed]
+
+    def _is_cached(self, url: str) -> bool:
+        """Pages the fetch cache will answer don't touch the site, so skip politeness"""
+        cache = getattr(self.fetcher, 'fetch_cache', None)
+        if cache is None:
+            return False
+        return cache.offline or cache.is_fresh(url, 'rendered')
+
+    async def _wait_turn(self, domain: str):
+        """Hold the domain's delay budget: start no sooner than domain_delay after the last start"""
+        lock = self._domain_locks.setdefault(domain, asyncio.Lock())
+        async with lock:
+            loop = asyncio.get_running_loop()
+            wait = self._next_start.get(domain, 0.0) - loop.time()
+            if wait > 0:
+                self.counts['polite_wait_seconds'] += wait
+                await asyncio.sleep(wait)
+            self._next_start[domain] = loop.time() + self.domain_delay
+
+    def _print_progress(self, tally: Dict[str, int], total: int, started: float):
+        done = tally['done']
+        elapsed = time.monotonic() - started
+        rate = done / elapsed if elapsed > 0 else 0.0
+        eta = (total - done) / rate if rate > 0 else 0.0
+        print(f"  📊 [{done}/{total}] {tally['ok']} ok, {tally['failed']} failed | "
+              f"{rate * 60:.1f} pages/min | ETA {int(eta // 60)}m{int(eta % 60):02d}s")
+
+    def _count(self, tally: Dict[str, int], outcome: str):
+        for counts in (tally, self.counts):
+            counts['done'] += 1
+            counts[outcome] += 1
+
+    async def run(self, jobs: List[Dict],
+                  on_result: Optional[Callable[[Dict, Dict], None]] = None) -> List[Optional[Dict]]:
+        """
+        Scrape every job not already in the journal. Concurrent run() calls
+        on one scheduler share its global and per-domain limits.
+
+        Args:
+            jobs: Dicts with 'url', optional 'page_type' and 'key', plus any
+                caller data (passed back to on_result untouched)
+            on_result: Called as on_result(job, result) for each finished job.
+                Calls run one at a time on a worker thread (so blocking Sheets
+                or OpenAI calls are fine and never overlap) while scraping
+                carries on. A job only counts as complete once it returns.
+
+        Returns:
+            One result per job in the order given; None for jobs skipped
+            because the journal already had them (never without a journal)
+        """
+        results: List[Optional[Dict]] = [None] * len(jobs)
+        todo = [(i, job) for i, job in enumerate(jobs) if job_key(job) not in self.completed]
+        skipped = len(jobs) - len(todo)
+        self.counts['skipped'] += skipped
+        if self.progress and skipped:
+            print(f"  ↩️  Resuming: {skipped} job(s) already done, {len(todo)} to go")
+        if not todo:
+            return results
+
+        loop = asyncio.get_running_loop()
+        if self._global_slots is None:
+            self._global_slots = asyncio.Semaphore(self.concurrency)
+        callbacks = ThreadPoolExecutor(max_workers=1, thread_name_prefix='crawl-results')
+        tally = {'done': 0, 'ok': 0, 'failed': 0}
+        started = time.monotonic()
+        last_progress = [started]
+
+        async def _run_job(index: int, job: Dict):
+            url = job['url']
+            page_type = job.get('page_type', 'tour_page')
+            if self._is_cached(url):
+                async with self._global_slots:
+                    result = await self.fetcher.scrape_page_async(url, page_type)
+            else:
+                domain = domain_key(url)
+                slots = self._domain_slots.setdefault(domain, asyncio.Semaphore(self.per_domain))
+                async with slots:
+                    await self._wait_turn(domain)
+                    async with self._global_slots:
+                        result = await self.fetcher.scrape_page_async(url, page_type)
+            results[index] = result
+
+            outcome = 'ok' if result.get('success') else 'failed'
+            processed = True
+            if on_result is not None:
+                try:
+                    await loop.run_in_executor(callbacks, on_result, job, result)
+                except Exception as e:
+                    print(f"    ❌ Processing failed for {url[:70]}: {e}")
+                    outcome = 'failed'
+                    processed = False  # Not journalled, so the next run retries it
+            if processed:
+                self._record(job_key(job), job, result)
+
+            self._count(tally, outcome)
+            now = time.monotonic()
+            if self.progress and (now - last_progress[0] >= PROGRESS_INTERVAL_SECONDS
+                                  or tally['done'] == len(todo)):
+                last_progress[0] = now
+                self._print_progress(tally, len(todo), started)
+
+        try:
+            await asyncio.gather(*(_run_job(i, job) for i, job in todo))
+        finally:
+            callbacks.shutdown(wait=True)
+        return results
+
+    def run_sync(self, jobs: List[Dict],
+                 on_result: Optional[Callable[[Dict, Dict], None]] = None) -> List[Optional[Dict]]:
+        """Synchronous wrapper for run(), on the fetcher's own event loop"""
+        return self.fetcher.run_coroutine(self.run(jobs, on_result))
+
+    def print_summary(self):
+        print(f"\n🧭 Crawl: {self.counts['ok']} ok, {self.counts['failed']} failed, "
+              f"{self.counts['skipped']} resumed from journal; "
+              f"{self.counts['polite_wait_seconds']:.0f}s spent on per-domain delays "
+              f"(limit {self.per_domain}/domain, {self.domain_delay:g}s apart)")
@@ -5,33 +5,65 @@ Provides all data endpoints the dashboard needs
 """
 
 import os
+import sys
 import json
+import argparse
 import http.server
-import socketserver
 import urllib.parse
-from datetime import datetime
-from google.oauth2 import service_account
-from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from shared.utils.metrics import MetricsHandlerMixin, registry as metrics, time_stage
+
+from sheets_snapshot import get_snapshot_cache
+from aggregate_views import AggregateViewCache, safe_float, get_maturity_level
+from participant_table import ParticipantQuery, ParticipantTableCache
+from response_cache import EncodedResponse, ResponseCache, negotiate_encoding, etag_matches
+from user_directory import UserDirectory
+from pooled_server import ThreadPoolHTTPServer, serve_until_shutdown, DEFAULT_WORKERS, KEEPALIVE_TIMEOUT_SECONDS
+
 # Configuration
 SHEET_ID = '1yxzgYWme1xW9uMX3jSz6t9BFI-tdV14UVmPiDjW_XCM'
 CREDENTIALS_PATH = '/Users/alexjeffries/tourism-commons/tourism-development-d620c-5c9db9e21301.json'
 SCOPES = ['https://www.googleapis.com/auth/spreadsheets']
-
-class APIHandler(http.server.SimpleHTTPRequestHandler):
-    def __init__(self, *args, **kwargs):
-        # Initialize Google Sheets service
-        try:
-            credentials = service_account.Credentials.from_service_account_file(
-                CREDENTIALS_PATH, scopes=SCOPES
-            )
-            self.sheets_service = build('sheets', 'v4', credentials=credentials)
-            print("✅ Connected to Google Sheets for API data")
-        except Exception as e:
-            print(f"❌ Error connecting to Google Sheets: {e}")
-            self.sheets_service = None
-        super().__init__(*args, **kwargs)
+CI_ASSESSMENT_RANGE = 'CI Assessment!A1:Z100'
+SNAPSHOT_RANGES = [CI_ASSESSMENT_RANGE]
+SNAPSHOT_TTL_SECONDS = 300
+# With --snapshot the file is only stat()ed, so it can be checked often
+SNAPSHOT_FILE_POLL_SECONDS = 5
+
+# One snapshot (and one set of credentials) shared by every request
+snapshot_cache = get_snapshot_cache(SHEET_ID, CREDENTIALS_PATH, SNAPSHOT_RANGES, SNAPSHOT_TTL_SECONDS)
+aggregate_views = AggregateViewCache(CI_ASSESSMENT_RANGE)
+participant_tables = ParticipantTableCache(CI_ASSESSMENT_RANGE)
+response_cache = ResponseCache()
+user_directory = UserDirectory(SHEET_ID, snapshot_cache.connect, snapshot_cache.service_lock)
+
+metrics.register_cache('responses', lambda: (response_cache.hits, response_cache.misses))
+metrics.register_cache('aggregate_views', lambda: (aggregate_views.hits, aggregate_views.misses))
+metrics.register_cache('participant_tables', lambda: (participant_tables.hits, participant_tables.misses))
+metrics.register_cache('user_directory', lambda: (user_directory.hits, user_directory.misses))
+
+class APIHandler(MetricsHandlerMixin, http.server.SimpleHTTPRequestHandler):
+    # Keep-alive: every response below must carry a Content-Length
+    protocol_version = 'HTTP/1.1'
+    timeout = KEEPALIVE_TIMEOUT_SECONDS
+    # Headers and body are separate writes; without this, Nagle plus delayed
+    # ACKs add ~40 ms to every response on a kept-alive connection
+    disable_nagle_algorithm = True
+    metrics_route_prefixes = ('/api/participant/',)
+
+    @property
+    def sheets_service(self):
+        """Shared Sheets service (built once per process)"""
+        return snapshot_cache.connect()
+
+    def get_snapshot_rows(self, range_name):
+        """Rows for a range from the in-memory snapshot"""
+        snapshot = snapshot_cache.get()
+        if snapshot is None:
+            return None, []
+        return snapshot, snapshot.rows(range_name)
 
     def do_OPTIONS(self):
         """Handle CORS preflight requests"""
@@ -39,6 +71,7 @@ class APIHandler(http.server.SimpleHTTPRequestHandler):
         self.send_header('Access-Control-Allow-Origin', '*')
         self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
         self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        self.send_header('Content-Length', '0')
         self.end_headers()
 
     def do_GET(self):
@@ -57,18 +90,24 @@ class APIHandler(http.server.SimpleHTTPRequestHandler):
 
     def handle_api_request(self):
         """Handle API requests"""
+        # Route on the path alone; query parameters are parsed separately
+        parsed = urllib.parse.urlsplit(self.path)
+        self.api_path = parsed.path
+        self.query_params = urllib.parse.parse_qs(parsed.query)
         try:
-            if self.path == '/api/dashboard':
+            if self.api_path == '/api/metrics':
+                self.send_metrics_response()
+            elif self.api_path == '/api/dashboard':
                 self.handle_dashboard_data()
-            elif self.path == '/api/participants':
+            elif self.api_path == '/api/participants':
                 self.handle_participants()
-            elif self.path == '/api/platform-adoption/overall':
+            elif self.api_path == '/api/platform-adoption/overall':
                 self.handle_platform_adoption()
-            elif self.path == '/api/technical-audit/summary':
+            elif self.api_path == '/api/technical-audit/summary':
                 self.handle_technical_audit()
-            elif self.path == '/api/sectors':
+            elif self.api_path == '/api/sectors':
                 self.handle_sectors()
-            elif self.path.startswith('/api/participant/'):
+            elif self.api_path.startswith('/api/participant/'):
                 self.handle_participant_detail()
             else:
                 self.send_error(404, "API endpoint not found")
@@ -79,75 +118,53 @@ class APIHandler(http.server.SimpleHTTPRequestHandler):
     def handle_dashboard_data(self):
         """Provide dashboard summary data"""
         try:
-            # Get basic stats from CI Assessment
-            result = self.sheets_service.spreadsheets().values().get(
-                spreadsheetId=SHEET_ID,
-                range='CI Assessment!A1:Z100'
-            ).execute()
-            
-            rows = result.get('values', [])
+            # Sector counts come from the precomputed view for this snapshot
+            snapshot, rows = self.get_snapshot_rows(CI_ASSESSMENT_RANGE)
             if not rows:
                 self.send_error(500, "No data found")
                 return
 
-            # Count participants by sector
-            sector_counts = {}
-            total_participants = len(rows) - 1  # Exclude header
-            
-            for row in rows[1:]:
-                if len(row) > 1:
-                    sector = row[1] if len(row) > 1 else 'Unknown'
-                    sector_counts[sector] = sector_counts.get(sector, 0) + 1
-
-            dashboard_data = {
-                'sheetName': 'CI Assessment',
-                'total': total_participants,
-                'sectors': sector_counts,
-                'lastUpdated': datetime.now().isoformat()
-            }
+            def build():
+                summary = aggregate_views.get(snapshot).dashboard_payload()
+                return {
+                    'sheetName': 'CI Assessment',
+                    'total': summary['total'],
+                    'sectors': summary['sectors'],
+                    'lastUpdated': snapshot.loaded_at.isoformat()
+                }, None
             
-            self.send_json_response(dashboard_data)
+            self.send_snapshot_response(snapshot, build)
             
         except Exception as e:
             print(f"Dashboard data error: {e}")
             self.send_error(500, "Failed to fetch dashboard data")
 
     def handle_participants(self):
-        """Provide participants data"""
+        """
+        Provide participants data
+
+        Optional query parameters, evaluated server-side:
+            fields=name,sector,...   only return these fields
+            sector=X / region=X      filter (repeat the parameter for several values)
+            min_score=N              externalTotal >= N
+            sort=field / sort=-field ascending / descending
+            limit=N, offset=N        pagination; X-Total-Count has the unpaged total
+        """
         try:
-            result = self.sheets_service.spreadsheets().values().get(
-                spreadsheetId=SHEET_ID,
-                range='CI Assessment!A1:Z100'
-            ).execute()
-            
-            rows = result.get('values', [])
+            snapshot, rows = self.get_snapshot_rows(CI_ASSESSMENT_RANGE)
             if not rows:
                 self.send_error(500, "No data found")
                 return
 
-            headers = rows[0]
-            participants = []
-            
-            for row in rows[1:]:
-                if len(row) > 0 and row[0]:  # Has name
-                    participant = {
-                        'name': row[0],
-                        'sector': row[1] if len(row) > 1 else 'Unknown',
-                        'region': row[2] if len(row) > 2 else 'Unknown',
-                        'socialMedia': self.safe_float(row[3]) if len(row) > 3 else 0,
-                        'website': self.safe_float(row[4]) if len(row) > 4 else 0,
-                        'visualContent': self.safe_float(row[5]) if len(row) > 5 else 0,
-                        'discoverability': self.safe_float(row[6]) if len(row) > 6 else 0,
-                        'digitalSales': self.safe_float(row[7]) if len(row) > 7 else 0,
-                        'platformIntegration': self.safe_float(row[8]) if len(row) > 8 else 0,
-                        'externalTotal': self.safe_float(row[9]) if len(row) > 9 else 0,
-                        'surveyTotal': self.safe_float(row[10]) if len(row) > 10 else 0,
-                        'combinedScore': self.safe_float(row[11]) if len(row) > 11 else 0,
-                        'maturityLevel': self.get_maturity_level(self.safe_float(row[9]) if len(row) > 9 else 0)
-                    }
-                    participants.append(participant)
-            
-            self.send_json_response(participants)
+            def build():
+                query = ParticipantQuery(self.query_params)
+                participants, total = participant_tables.get(snapshot).query(query)
+                return participants, {'X-Total-Count': str(total)}
+
+            try:
+                self.send_snapshot_response(snapshot, build)
+            except ValueError as e:
+                self.send_error_response(400, str(e))
             
         except Exception as e:
             print(f"Participants data error: {e}")
@@ -192,36 +209,15 @@ class APIHandler(http.server.SimpleHTTPRequestHandler):
     def handle_sectors(self):
         """Provide sectors data"""
         try:
-            result = self.sheets_service.spreadsheets().values().get(
-                spreadsheetId=SHEET_ID,
-                range='CI Assessment!A1:Z100'
-            ).execute()
-            
-            rows = result.get('values', [])
+            snapshot, rows = self.get_snapshot_rows(CI_ASSESSMENT_RANGE)
             if not rows:
                 self.send_error(500, "No data found")
                 return
 
-            # Count by sector
-            sector_stats = {}
-            for row in rows[1:]:
-                if len(row) > 1:
-                    sector = row[1]
-                    if sector not in sector_stats:
-                        sector_stats[sector] = {'count': 0, 'avg_score': 0, 'scores': []}
-                    sector_stats[sector]['count'] += 1
-                    if len(row) > 9:  # Has external score
-                        score = self.safe_float(row[9])
-                        if score > 0:
-                            sector_stats[sector]['scores'].append(score)
-            
-            # Calculate averages
-            for sector, stats in sector_stats.items():
-                if stats['scores']:
-                    stats['avg_score'] = sum(stats['scores']) / len(stats['scores'])
-                del stats['scores']  # Remove raw scores
-            
-            self.send_json_response(sector_stats)
+            # Count, mean/min/max external score and maturity mix per sector
+            self.send_snapshot_response(
+                snapshot, lambda: (aggregate_views.get(snapshot).sectors_payload(), None)
+            )
             
         except Exception as e:
             print(f"Sectors data error: {e}")
@@ -231,7 +227,7 @@ class APIHandler(http.server.SimpleHTTPRequestHandler):
         """Handle participant detail requests"""
         try:
             # Parse the request path to get participant name and type
-            path_parts = self.path.split('/')
+            path_parts = self.api_path.split('/')
             if len(path_parts) < 4:
                 self.send_error(400, "Invalid participant path")
                 return
@@ -304,112 +300,114 @@ class APIHandler(http.server.SimpleHTTPRequestHandler):
             self.send_error_response(500, "Internal server error")
 
     def authenticate_user(self, username):
-        """Authenticate user against Google Sheets"""
+        """Look a username up in the in-memory user directory"""
         try:
-            if not self.sheets_service:
-                return None
-
-            result = self.sheets_service.spreadsheets().values().get(
-                spreadsheetId=SHEET_ID,
-                range='dashboard_auth!A1:Z100'
-            ).execute()
-            
-            rows = result.get('values', [])
-            if not rows:
-                return None
-
-            for row in rows[1:]:
-                if len(row) >= 3 and row[1].strip().lower() == username:
-                    return {
-                        'id': row[1].strip().lower(),
-                        'username': row[1].strip().lower(),
-                        'name': row[0].strip(),
-                        'role': row[2].strip().lower() if len(row) > 2 else 'user',
-                        'email': f"{row[1].strip().lower()}@itc.int",
-                        'loginCount': int(row[4]) if len(row) > 4 and row[4].strip() else 0
-                    }
-            return None
-
+            return user_directory.authenticate(username)
         except Exception as e:
             print(f"Authentication error: {e}")
             return None
 
     def update_user_login(self, username):
-        """Update user login count and timestamp"""
-        try:
-            if not self.sheets_service:
-                return
-
-            result = self.sheets_service.spreadsheets().values().get(
-                spreadsheetId=SHEET_ID,
-                range='dashboard_auth!A1:Z100'
-            ).execute()
-            
-            rows = result.get('values', [])
-            if not rows:
-                return
-
-            for i, row in enumerate(rows[1:], start=2):
-                if len(row) >= 2 and row[1].strip().lower() == username:
-                    current_count = int(row[4]) if len(row) > 4 and row[4].strip() else 0
-                    new_count = current_count + 1
-                    
-                    update_range = f'dashboard_auth!E{i}:F{i}'
-                    values = [[str(new_count), datetime.now().isoformat()]]
-                    
-                    self.sheets_service.spreadsheets().values().update(
-                        spreadsheetId=SHEET_ID,
-                        range=update_range,
-                        valueInputOption='RAW',
-                        body={'values': values}
-                    ).execute()
-                    break
-
-        except Exception as e:
-            print(f"Error updating login: {e}")
+        """Record a login; the sheet is updated by the next write-behind flush"""
+        user_directory.record_login(username)
 
     def safe_float(self, value):
         """Safely convert to float"""
-        try:
-            return float(value) if value and str(value).strip() else 0.0
-        except (ValueError, TypeError):
-            return 0.0
+        return safe_float(value)
 
     def get_maturity_level(self, score):
         """Determine maturity level based on score"""
-        if score >= 60:
-            return "Advanced"
-        elif score >= 40:
-            return "Intermediate"
-        elif score >= 20:
-            return "Basic"
-        else:
-            return "Absent"
+        return get_maturity_level(score)
 
-    def send_json_response(self, data):
+    def send_json_response(self, data, headers=None):
         """Send JSON response"""
+        with time_stage('encode'):
+            response = EncodedResponse(data, headers=headers)
+        self.send_encoded_response(response)
+
+    def send_snapshot_response(self, snapshot, build):
+        """
+        Send a JSON response derived from a snapshot. The encoded body is
+        cached per snapshot version and request, so repeat polls skip building
+        and serialising; build() returns (data, extra headers).
+        """
+        key = self.api_path
+        if self.query_params:
+            key += '?' + urllib.parse.urlencode(sorted(self.query_params.items()), doseq=True)
+
+        response = response_cache.get(snapshot.version, key)
+        if response is None:
+            with time_stage('build'):
+                data, headers = build()
+            with time_stage('encode'):
+                encoded = EncodedResponse(data, ResponseCache.make_etag(snapshot.version, key), headers)
+            response = response_cache.put(snapshot.version, key, encoded)
+        self.send_encoded_response(response)
+
+    def send_encoded_response(self, response):
+        """Send an EncodedResponse, honouring If-None-Match and Accept-Encoding"""
+        encoding = negotiate_encoding(self.headers.get('Accept-Encoding'), len(response.body))
+        etag = response.etag_for(encoding)
+
+        if etag_matches(self.headers.get('If-None-Match'), response.etag):
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', 'no-cache')
+            self.send_header('Vary', 'Accept-Encoding')
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.send_header('Access-Control-Expose-Headers', 'ETag, X-Total-Count')
+            self.end_headers()
+            return
+
+        body = response.encoded(encoding)
         self.send_response(200)
         self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        if encoding != 'identity':
+            self.send_header('Content-Encoding', encoding)
+        self.send_header('ETag', etag)
+        # Clients may keep the body but must revalidate it on every poll
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Vary', 'Accept-Encoding')
+        for header, value in response.headers.items():
+            self.send_header(header, value)
         self.send_header('Access-Control-Allow-Origin', '*')
         self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
         self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        self.send_header('Access-Control-Expose-Headers', 'ETag, X-Total-Count')
         self.end_headers()
-        self.wfile.write(json.dumps(data).encode('utf-8'))
+        self.wfile.write(body)
 
     def send_error_response(self, code, message):
         """Send error response"""
+        body = json.dumps({'error': message}).encode('utf-8')
         self.send_response(code)
         self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
         self.send_header('Access-Control-Allow-Origin', '*')
         self.end_headers()
-        self.wfile.write(json.dumps({'error': message}).encode('utf-8'))
+        self.wfile.write(body)
 
-def run_api_server(port=5003):
+def run_api_server(port=5003, workers=DEFAULT_WORKERS, snapshot_path=None):
     """Run the comprehensive API server"""
-    print(f"🚀 Starting comprehensive API server on port {port}")
-    print("📊 Connected to Google Sheets for all dashboard data")
+    print(f"🚀 Starting comprehensive API server on port {port} ({workers} workers)")
+    metrics.server = 'api'
+    if snapshot_path:
+        # Offline mode: dashboard data comes from an exported snapshot file,
+        # which is hot-swapped whenever a new export replaces it
+        snapshot_cache.snapshot_path = snapshot_path
+        snapshot_cache.ttl_seconds = SNAPSHOT_FILE_POLL_SECONDS
+        print(f"📦 Serving dashboard data from snapshot file {snapshot_path}")
+    else:
+        print("📊 Connected to Google Sheets for all dashboard data")
+    
+    # Load the first snapshot up front and keep it fresh in the background
+    snapshot_cache.start()
+    if not snapshot_path:
+        # Offline, the user directory loads on the first login instead
+        user_directory.start()
     
-    with socketserver.TCPServer(("", port), APIHandler) as httpd:
+    with ThreadPoolHTTPServer(("", port), APIHandler, workers=workers) as httpd:
         print(f"✅ API server running at http://localhost:{port}")
         print("🔐 Available API endpoints:")
         print("   - /api/dashboard - Dashboard summary data")
@@ -418,8 +416,20 @@ def run_api_server(port=5003):
         print("   - /api/platform-adoption/overall - Platform adoption")
         print("   - /api/technical-audit/summary - Technical audit")
         print("   - /api/auth/login - Authentication")
+        print("   - /api/metrics - Latency, upstream and cache metrics (?format=prometheus)")
         print("\n🌐 Dashboard should now work at http://localhost:3001")
-        httpd.serve_forever()
+        serve_until_shutdown(httpd)
+    
+    snapshot_cache.stop()
+    # Write out any logins still buffered
+    user_directory.stop()
 
 if __name__ == "__main__":
-    run_api_server()
+    parser = argparse.ArgumentParser(description='Digital Assessment Dashboard API server')
+    parser.add_argument('--port', type=int, default=5003, help='Port to listen on')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help='Number of request worker threads')
+    parser.add_argument('--snapshot', metavar='PATH',
+                        help='Serve from a snapshot file (see snapshot_store.py) instead of live Sheets')
+    args = parser.parse_args()
+    
+    run_api_server(port=args.port, workers=args.workers, snapshot_path=args.snapshot)
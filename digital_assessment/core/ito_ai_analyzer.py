@@ -2,18 +2,353 @@
 """
 ITO AI Analyzer - Uses Google Cloud Natural Language API + keyword analysis
 to assess creative tourism content in ITO pages
+Sentiment can come from a local engine instead (ITO_SENTIMENT_ENGINE=vader or
+textblob) for bulk re-scoring without API latency or quota.
 """
 
+import bisect
+import json
+import multiprocessing
+import os
 import re
+import sys
+import threading
 from collections import Counter
-from google.cloud import language_v1
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+try:
+    from google.cloud import language_v1
+except ImportError:
+    language_v1 = None
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from shared.utils.sentiment_cache import (DEFAULT_CACHE_DIR as SENTIMENT_CACHE_DIR, SentimentCache,
+                                          get_sentiment_cache)
+
+# Sentiment cache key for results from this API; change it when the request
+# (API version, document type) changes so old scores aren't reused
+GOOGLE_NL_ENGINE = 'google-nl/language_v1/analyze_sentiment'
+NL_API_MAX_CHARS = 10000
+# Sentiment backend used when none is passed: 'google', 'vader' or 'textblob'
+DEFAULT_SENTIMENT_ENGINE = os.environ.get('ITO_SENTIMENT_ENGINE', 'google')
+# Linear fits mapping local engine scores onto the Google scale, written by
+# scripts/calibrate_sentiment_engines.py next to the sentiment cache
+SENTIMENT_CALIBRATION_FILE = os.path.join(SENTIMENT_CACHE_DIR, 'calibration.json')
+# analyze_many: NL API requests in flight, and processes for keyword/packaging analysis
+DEFAULT_SENTIMENT_CONCURRENCY = 8
+DEFAULT_TEXT_WORKERS = os.cpu_count() or 1
+# Smaller batches are analyzed in-process; starting workers would cost more than it saves
+MIN_PAGES_FOR_WORKERS = 8
+
+# Characters either side of a keyword checked against the context filters
+CONTEXT_WINDOW = 50
+
+_WORD_CHAR = re.compile(r'\w')
+
+
+def _trie_pattern(node):
+    """Regex for a character trie; each keyword path ends in a word boundary"""
+    alternatives = [re.escape(ch) + _trie_pattern(child)
+                    for ch, child in sorted(node.items()) if ch]
+    if '' in node:
+        alternatives.append(r'\b')
+    if len(alternatives) == 1:
+        return alternatives[0]
+    return '(?:' + '|'.join(alternatives) + ')'
+
+
+class SectorKeywordMatcher:
+    """
+    Finds every sector keyword in one pass over a text
+    
+    Gives the same counts as searching for each keyword separately with
+    \\bkeyword\\b (case-insensitive) and dropping matches whose surrounding
+    context hits one of the sector's context filters. Keyword start positions
+    come from a single zero-width regex built from a trie of all keywords, and
+    filter hits are found once per text and compared by span.
+    """
+    
+    def __init__(self, sector_keywords, context_filters, window=CONTEXT_WINDOW):
+        self.sector_keywords = sector_keywords
+        self.window = window
+        
+        self._sectors_for = {}
+        for sector, keywords in sector_keywords.items():
+            for keyword in keywords:
+                self._sectors_for.setdefault(keyword, []).append(sector)
+        
+        self._keyword_patterns = {
+            keyword: re.compile(re.escape(keyword) + r'\b', re.IGNORECASE)
+            for keyword in self._sectors_for
+        }
+        # Candidate keywords by (lower-cased) first character
+        self._by_first_char = {}
+        trie = {}
+        for keyword in self._sectors_for:
+            self._by_first_char.setdefault(keyword[:1].lower(), []).append(keyword)
+            node = trie
+            for ch in keyword.lower():
+                node = node.setdefault(ch, {})
+            node[''] = {}
+        self._starts = re.compile(r'\b(?=' + _trie_pattern(trie) + ')', re.IGNORECASE) if trie else None
+        
+        self._filters = {
+            sector: [re.compile(pattern, re.IGNORECASE) for pattern in patterns]
+            for sector, patterns in context_filters.items() if sector in sector_keywords and patterns
+        }
+        # Every position where any of a sector's filters matches, overlaps included
+        self._filter_starts = {
+            sector: re.compile('(?=' + '|'.join(f'(?:{pattern.pattern})' for pattern in patterns) + ')',
+                               re.IGNORECASE)
+            for sector, patterns in self._filters.items()
+        }
+    
+    def _keyword_spans(self, text):
+        """(keyword, start, end) for every word-bounded keyword occurrence"""
+        spans = []
+        last_end = {}
+        for start_match in self._starts.finditer(text):
+            pos = start_match.start()
+            ch = text[pos]
+            # Case-insensitive matching can pair non-ASCII letters with ASCII
+            # keywords (e.g. the Kelvin sign and 'k'), so try every keyword there
+            candidates = self._by_first_char.get(ch.lower(), ()) if ch.isascii() else self._keyword_patterns
+            for keyword in candidates:
+                if pos < last_end.get(keyword, 0):
+                    continue  # finditer never returns overlapping matches of one keyword
+                match = self._keyword_patterns[keyword].match(text, pos)
+                if match:
+                    spans.append((keyword, pos, match.end()))
+                    last_end[keyword] = match.end()
+        return spans
+    
+    def _filter_spans(self, text):
+        """Start-sorted (start, end) spans of every context filter hit, per sector"""
+        spans = {}
+        for sector, starts in self._filter_starts.items():
+            spans[sector] = sector_spans = []
+            for start_match in starts.finditer(text):
+                pos = start_match.start()
+                for pattern in self._filters[sector]:
+                    match = pattern.match(text, pos)
+                    if match:
+                        sector_spans.append(match.span())
+            sector_spans.sort()
+        return spans
+    
+    def _is_filtered(self, text, sector, start, end, filter_spans):
+        """
+        Whether a filter pattern matches text[start:end] (the keyword's context)
+        
+        Relies on the filters being word-bounded phrases, as they all are: a
+        hit in the full text lying inside the window is then a hit in the
+        window text too.
+        """
+        spans = filter_spans[sector]
+        i = bisect.bisect_left(spans, (start, -1))
+        while i < len(spans) and spans[i][0] < end:
+            if spans[i][1] <= end:
+                return True
+            i += 1
+        # A window edge that cuts through a word adds a word boundary the full
+        # text doesn't have, so only a direct search is exact there
+        cut_start = start > 0 and _WORD_CHAR.match(text, start - 1) and _WORD_CHAR.match(text, start)
+        cut_end = end < len(text) and _WORD_CHAR.match(text, end - 1) and _WORD_CHAR.match(text, end)
+        if cut_start or cut_end:
+            context = text[start:end]
+            return any(pattern.search(context) for pattern in self._filters[sector])
+        return False
+    
+    def count(self, text):
+        """
+        Valid mentions of each keyword, per sector
+        
+        Returns:
+            {sector: {keyword: count}} for every sector, keywords in list order
+        """
+        counts = {sector: dict.fromkeys(keywords, 0) for sector, keywords in self.sector_keywords.items()}
+        if self._starts is None:
+            return counts
+        
+        filter_spans = None
+        for keyword, start, end in self._keyword_spans(text):
+            context_start = max(0, start - self.window)
+            context_end = min(len(text), end + self.window)
+            for sector in self._sectors_for[keyword]:
+                if sector in self._filters:
+                    if filter_spans is None:
+                        filter_spans = self._filter_spans(text)
+                    if self._is_filtered(text, sector, context_start, context_end, filter_spans):
+                        continue
+                counts[sector][keyword] += 1
+        return counts
+
+
+_SENTENCE_SPLIT = re.compile(r'(?<=[.!?])\s+|\n+')
+
+
+class SentimentEngine:
+    """
+    Document sentiment backend for ITOAnalyzer.get_sentiment. Subclasses set
+    name (also the sentiment cache key) and implement analyze().
+    """
+    
+    name = ''
+    # Characters of the page that are scored
+    max_chars = NL_API_MAX_CHARS
+    # Remote engines are counted as API calls and their results cached
+    remote = False
+    
+    def analyze(self, text) -> Tuple[float, Optional[float]]:
+        """(score in [-1, 1], magnitude or None) for a document"""
+        raise NotImplementedError
+
+
+class GoogleNLSentimentEngine(SentimentEngine):
+    """Google Cloud Natural Language analyzeSentiment"""
+    
+    name = GOOGLE_NL_ENGINE
+    remote = True
+    
+    def __init__(self):
+        if language_v1 is None:
+            raise ImportError("google-cloud-language is required for the 'google' sentiment engine")
+        self._client = None
+        self._lock = threading.Lock()
+    
+    @property
+    def client(self):
+        """NL API client, created on first call"""
+        with self._lock:
+            if self._client is None:
+                self._client = language_v1.LanguageServiceClient()
+            return self._client
+    
+    def analyze(self, text):
+        document = language_v1.Document(
+            content=text,
+            type_=language_v1.Document.Type.PLAIN_TEXT
+        )
+        sentiment = self.client.analyze_sentiment(
+            request={'document': document}
+        ).document_sentiment
+        return sentiment.score, sentiment.magnitude
+
+
+class _LocalSentimentEngine(SentimentEngine):
+    """
+    In-process engine scoring each sentence and averaging, which is how the
+    NL API's document score behaves (a whole-page VADER compound saturates
+    at ±1 on long pages). Magnitude is the sum of absolute sentence scores.
+    """
+    
+    def __init__(self, scale: float = 1.0, offset: float = 0.0):
+        """
+        Args:
+            scale, offset: Linear calibration applied to the mean sentence score
+        """
+        self.scale = scale
+        self.offset = offset
+    
+    def sentence_score(self, sentence) -> float:
+        raise NotImplementedError
+    
+    def analyze(self, text):
+        scores = [self.sentence_score(sentence) for sentence in _SENTENCE_SPLIT.split(text)
+                  if any(ch.isalpha() for ch in sentence)]
+        if not scores:
+            return 0.0, 0.0
+        raw = sum(scores) / len(scores)
+        score = max(-1.0, min(1.0, raw * self.scale + self.offset))
+        return score, sum(abs(value) for value in scores)
+
+
+class VaderSentimentEngine(_LocalSentimentEngine):
+    """VADER (as used by RegionalSentimentAnalyzer), sentence compound scores"""
+    
+    name = 'vader/sentence-mean'
+    
+    def __init__(self, scale: float = 1.0, offset: float = 0.0):
+        super().__init__(scale, offset)
+        try:
+            from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+        except ImportError:
+            raise ImportError("vaderSentiment is required for the 'vader' sentiment engine "
+                              "(pip install vaderSentiment)")
+        self.vader = SentimentIntensityAnalyzer()
+    
+    def sentence_score(self, sentence):
+        return self.vader.polarity_scores(sentence)['compound']
+
+
+class TextBlobSentimentEngine(_LocalSentimentEngine):
+    """TextBlob pattern polarity (as used by EnhancedThemeAnalyzer)"""
+    
+    name = 'textblob/sentence-mean'
+    
+    def __init__(self, scale: float = 1.0, offset: float = 0.0):
+        super().__init__(scale, offset)
+        try:
+            from textblob import TextBlob
+        except ImportError:
+            raise ImportError("textblob is required for the 'textblob' sentiment engine "
+                              "(pip install textblob)")
+        self._text_blob = TextBlob
+    
+    def sentence_score(self, sentence):
+        return self._text_blob(sentence).sentiment.polarity
+
+
+SENTIMENT_ENGINES = {
+    'google': GoogleNLSentimentEngine,
+    'vader': VaderSentimentEngine,
+    'textblob': TextBlobSentimentEngine,
+}
+
+
+def load_sentiment_calibration(path: str = SENTIMENT_CALIBRATION_FILE) -> Dict[str, Dict]:
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"⚠️  Ignoring unreadable sentiment calibration file: {e}")
+        return {}
+
+
+def get_sentiment_engine(name: str = DEFAULT_SENTIMENT_ENGINE, calibrated: bool = True) -> SentimentEngine:
+    """
+    Create a sentiment engine by name
+    
+    Args:
+        name: 'google', 'vader' or 'textblob'
+        calibrated: Apply the saved linear fit to the Google scale (local engines only)
+    """
+    if name not in SENTIMENT_ENGINES:
+        raise ValueError(f"Unknown sentiment engine '{name}' (choose from {', '.join(SENTIMENT_ENGINES)})")
+    engine_class = SENTIMENT_ENGINES[name]
+    if engine_class.remote or not calibrated:
+        return engine_class()
+    fit = load_sentiment_calibration().get(name, {})
+    return engine_class(scale=fit.get('scale', 1.0), offset=fit.get('offset', 0.0))
 
 
 class ITOAnalyzer:
     """Analyzes ITO content for creative tourism sectors"""
     
-    def __init__(self):
-        self.client = language_v1.LanguageServiceClient()
+    def __init__(self, sentiment_cache: Optional[SentimentCache] = None, sentiment_engine=None):
+        """
+        Args:
+            sentiment_cache: Store for remote engine results (defaults to the shared one)
+            sentiment_engine: SentimentEngine, or an engine name for
+                get_sentiment_engine (defaults to ITO_SENTIMENT_ENGINE / 'google')
+        """
+        self._sentiment_engine = sentiment_engine
+        self._sentiment_cache = sentiment_cache
+        self._lock = threading.Lock()
+        self.api_calls = 0
         
         # Creative sector keywords (improved with context filtering)
         self.SECTOR_KEYWORDS = {
@@ -66,30 +401,24 @@ class ITOAnalyzer:
                 r'\bplay video\b', r'\bvideo tour\b'
             ]
         }
-    
-    def _should_filter_keyword(self, keyword, context_text, sector):
-        """Check if keyword should be filtered based on context"""
-        if sector not in self.CONTEXT_FILTERS:
-            return False
         
-        # Check if any filter pattern matches in the surrounding context
-        for pattern in self.CONTEXT_FILTERS[sector]:
-            if re.search(pattern, context_text, re.IGNORECASE):
-                return True
-        return False
+        # Rebuild this if the keyword or filter lists are changed after init
+        self.keyword_matcher = SectorKeywordMatcher(self.SECTOR_KEYWORDS, self.CONTEXT_FILTERS)
     
-    def _extract_keyword_context(self, text, keyword, window=50):
-        """Extract surrounding context for a keyword match"""
-        pattern = re.compile(r'\b' + re.escape(keyword) + r'\b', re.IGNORECASE)
-        matches = []
-        
-        for match in pattern.finditer(text):
-            start = max(0, match.start() - window)
-            end = min(len(text), match.end() + window)
-            context = text[start:end]
-            matches.append(context)
-        
-        return matches
+    @property
+    def sentiment_engine(self) -> SentimentEngine:
+        """Sentiment backend, created on first sentiment call"""
+        with self._lock:
+            if not isinstance(self._sentiment_engine, SentimentEngine):
+                self._sentiment_engine = get_sentiment_engine(self._sentiment_engine or DEFAULT_SENTIMENT_ENGINE)
+            return self._sentiment_engine
+    
+    @property
+    def sentiment_cache(self):
+        """Store for NL API results, opened on first sentiment call"""
+        if self._sentiment_cache is None:
+            self._sentiment_cache = get_sentiment_cache()
+        return self._sentiment_cache
     
     def analyze_creative_sectors(self, text):
         """Analyze creative sector mentions with improved context filtering"""
@@ -97,21 +426,15 @@ class ITOAnalyzer:
         sector_details = {}
         sector_justifications = {}
         
-        for sector, keywords in self.SECTOR_KEYWORDS.items():
+        keyword_counts = self.keyword_matcher.count(text)
+        
+        for sector, counts in keyword_counts.items():
             mentions = []
             unique_terms = set()
             
-            for keyword in keywords:
-                # Find all contexts where this keyword appears
-                contexts = self._extract_keyword_context(text, keyword)
-                
-                # Filter out false positives
-                valid_mentions = 0
-                for context in contexts:
-                    if not self._should_filter_keyword(keyword, context, sector):
-                        valid_mentions += 1
-                        unique_terms.add(keyword)
-                
+            for keyword, valid_mentions in counts.items():
+                if valid_mentions:
+                    unique_terms.add(keyword)
                 mentions.extend([keyword] * valid_mentions)
             
             # Score based on mention count and term diversity
@@ -161,18 +484,22 @@ class ITOAnalyzer:
         return sector_scores, sector_details, sector_justifications
     
     def get_sentiment(self, text):
-        """Get sentiment score using Google NL API"""
+        """Get document sentiment score from the sentiment engine (remote results cached by content)"""
+        engine = self.sentiment_engine
+        content = text[:engine.max_chars]  # API limit
+        if engine.remote:
+            cached = self.sentiment_cache.get(engine.name, content)
+            if cached is not None:
+                return round(cached['score'], 2)
+        
         try:
-            document = language_v1.Document(
-                content=text[:10000],  # API limit
-                type_=language_v1.Document.Type.PLAIN_TEXT
-            )
-            
-            sentiment = self.client.analyze_sentiment(
-                request={'document': document}
-            ).document_sentiment
-            
-            return round(sentiment.score, 2)
+            if engine.remote:
+                with self._lock:
+                    self.api_calls += 1
+            score, magnitude = engine.analyze(content)
+            if engine.remote:
+                self.sentiment_cache.put(engine.name, content, score, magnitude)
+            return round(score, 2)
         except Exception as e:
             print(f"  ⚠️  Sentiment analysis failed: {e}")
             return 0.0
@@ -265,15 +592,8 @@ class ITOAnalyzer:
         
         return packaging_type, destination_pct, countries_list, countries_detected
     
-    def analyze_content(self, page_name, text, destination_country='Gambia'):
-        """Full analysis of ITO content"""
-        print(f"="*80)
-        print(f"Analyzing: {page_name} ({destination_country})")
-        print(f"="*80)
-        
-        # Get sentiment
-        sentiment = self.get_sentiment(text)
-        
+    def analyze_text(self, text, destination_country='Gambia'):
+        """Keyword, theme and packaging analysis - everything except sentiment"""
         # Analyze creative sectors
         sector_scores, sector_details, sector_justifications = self.analyze_creative_sectors(text)
         
@@ -286,7 +606,25 @@ class ITOAnalyzer:
         # Packaging analysis
         packaging_type, destination_pct, countries_list, countries_detected = self.determine_packaging(text, destination_country)
         
-        # Print summary
+        return {
+            'creative_score': creative_score,
+            'themes': themes,
+            'sector_scores': sector_scores,
+            'sector_details': sector_details,
+            'sector_justifications': sector_justifications,
+            'packaging_type': packaging_type,
+            'destination_percentage': destination_pct,
+            'countries_detected': countries_list,
+            'countries_dict': countries_detected,
+            # Keep old key for backwards compatibility
+            'gambia_percentage': destination_pct
+        }
+    
+    def _print_analysis(self, analysis):
+        sentiment = analysis['sentiment']
+        sector_scores = analysis['sector_scores']
+        themes = analysis['themes']
+        
         sentiment_label = "Neutral"
         if sentiment > 0.2:
             sentiment_label = "Positive"
@@ -297,29 +635,120 @@ class ITOAnalyzer:
         
         print(f"📊 ANALYSIS SUMMARY:")
         print(f"  Sentiment: {sentiment:.2f} ({sentiment_label})")
-        print(f"  Creative Tourism Score: {creative_score}/100")
+        print(f"  Creative Tourism Score: {analysis['creative_score']}/100")
         print(f"  Top Themes: {', '.join(themes) if themes else 'None identified'}")
         
         # Print non-zero sector scores
         print(f"  Sector Scores:")
         for sector, score in sorted(sector_scores.items(), key=lambda x: x[1], reverse=True):
             if score > 0:
-                detail = sector_details[sector]
+                detail = analysis['sector_details'][sector]
                 print(f"    {sector.replace('_', ' ').title()}: {score}/10")
                 print(f"      → {detail}")
+    
+    def analyze_content(self, page_name, text, destination_country='Gambia', quiet=False):
+        """Full analysis of ITO content"""
+        if not quiet:
+            print(f"="*80)
+            print(f"Analyzing: {page_name} ({destination_country})")
+            print(f"="*80)
         
-        return {
-            'sentiment': sentiment,
-            'creative_score': creative_score,
-            'themes': themes,
-            'sector_scores': sector_scores,
-            'sector_details': sector_details,
-            'sector_justifications': sector_justifications,
-            'packaging_type': packaging_type,
-            'destination_percentage': destination_pct,
-            'countries_detected': countries_list,
-            'countries_dict': countries_detected,
-            # Keep old key for backwards compatibility
-            'gambia_percentage': destination_pct
-        }
+        # Get sentiment
+        sentiment = self.get_sentiment(text)
+        
+        analysis = {'sentiment': sentiment, **self.analyze_text(text, destination_country)}
+        if not quiet:
+            self._print_analysis(analysis)
+        return analysis
+    
+    def analyze_many(self, pages: List[Dict], concurrency: int = DEFAULT_SENTIMENT_CONCURRENCY,
+                     workers: int = DEFAULT_TEXT_WORKERS, quiet: bool = True) -> List[Dict]:
+        """
+        Analyze a batch of pages: sentiment requests run concurrently on
+        threads while keyword and packaging analysis runs in worker processes
+        
+        Args:
+            pages: Dicts with 'text' and optional 'name' and 'destination_country'
+            concurrency: NL API requests in flight at once
+            workers: Processes for text analysis (1 runs it in this process)
+            quiet: Skip the per-page summaries analyze_content prints
+        
+        Returns:
+            One analysis dict per page, in input order (as analyze_content
+            returns). A page whose text analysis failed gets {'sentiment',
+            'error'} instead, so one bad page doesn't sink the batch.
+        """
+        if not pages:
+            return []
+        texts = [page['text'] for page in pages]
+        destinations = [page.get('destination_country', 'Gambia') for page in pages]
+        workers = max(1, min(workers, len(pages))) if len(pages) >= MIN_PAGES_FOR_WORKERS else 1
+        
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as sentiment_pool:
+            sentiments = sentiment_pool.map(self.get_sentiment, texts)
+            text_results = None
+            if workers > 1:
+                try:
+                    # Workers must not be forked from this process: the NL client and
+                    # the sentiment threads don't survive fork()
+                    with ProcessPoolExecutor(
+                        max_workers=workers,
+                        mp_context=_worker_context(),
+                        initializer=_init_text_worker,
+                        initargs=(self.SECTOR_KEYWORDS, self.CONTEXT_FILTERS)
+                    ) as text_pool:
+                        chunksize = max(1, len(pages) // (workers * 4))
+                        text_results = list(text_pool.map(_analyze_text_worker, texts, destinations,
+                                                          chunksize=chunksize))
+                except Exception as e:
+                    # A worker process died (per-page errors come back as results)
+                    print(f"  ⚠️  Text analysis workers failed ({e}), analyzing in this process")
+            if text_results is None:
+                text_results = list(map(self._analyze_text_or_error, texts, destinations))
+            sentiments = list(sentiments)
+        
+        analyses = []
+        for page, destination, sentiment, text_result in zip(pages, destinations, sentiments, text_results):
+            analysis = {'sentiment': sentiment, **text_result}
+            if not quiet and 'error' not in analysis:
+                print(f"="*80)
+                print(f"Analyzing: {page.get('name', '')} ({destination})")
+                print(f"="*80)
+                self._print_analysis(analysis)
+            analyses.append(analysis)
+        return analyses
+    
+    def _analyze_text_or_error(self, text, destination_country) -> Dict:
+        try:
+            return self.analyze_text(text, destination_country)
+        except Exception as e:
+            return {'error': str(e)}
+    
+    def print_summary(self):
+        engine = self.sentiment_engine
+        if engine.remote:
+            self.sentiment_cache.print_summary()
+            print(f"   {engine.name} calls this run: {self.api_calls}")
+        else:
+            print(f"\n🧠 Sentiment engine: {engine.name} (local, no API calls)")
+
+
+# Text analysis in analyze_many's worker processes
+_worker_analyzer: Optional[ITOAnalyzer] = None
+
+
+def _worker_context():
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+
+
+def _init_text_worker(sector_keywords, context_filters):
+    global _worker_analyzer
+    _worker_analyzer = ITOAnalyzer()
+    _worker_analyzer.SECTOR_KEYWORDS = sector_keywords
+    _worker_analyzer.CONTEXT_FILTERS = context_filters
+    _worker_analyzer.keyword_matcher = SectorKeywordMatcher(sector_keywords, context_filters)
+
 
+def _analyze_text_worker(text, destination_country):
+    return _worker_analyzer._analyze_text_or_error(text, destination_country)
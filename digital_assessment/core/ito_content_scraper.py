@@ -6,19 +6,343 @@ Intelligently extracts meaningful content from tour operator pages
 
 import asyncio
 import json
+import os
 import re
+import sys
+import threading
+import time
+import urllib.parse
 from datetime import datetime
 from playwright.async_api import async_playwright
-from bs4 import BeautifulSoup
 from typing import Dict, List, Optional
 
+from crawl_scheduler import CrawlScheduler
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from shared.utils.html_extract import HtmlDocument
+from shared.utils.metrics import time_upstream, print_upstream_summary
+
+# Pages kept open per browser; also the default scrape_many concurrency
+DEFAULT_PAGE_POOL_SIZE = 4
+
+# Page readiness: content counts as loaded once the main text has stopped
+# changing for READY_QUIET_MS, and we never wait longer than the ceiling
+READY_QUIET_MS = 500
+READY_MAX_WAIT_SECONDS = 10
+# Below this much main text a page may still be an empty JS shell, so it
+# has to stay quiet for longer before we accept it
+READY_MIN_TEXT_CHARS = 200
+READY_POLL_MS = 100
+
+# Request blocking: only text is kept, so heavy resources and third-party
+# trackers are aborted before they download. Pick a profile per run.
+RESOURCE_BLOCK_PROFILES = {
+    'none': {'resource_types': set(), 'block_trackers': False},
+    'standard': {'resource_types': {'image', 'media', 'font'}, 'block_trackers': True},
+    # Stylesheets can affect what counts as visible text, so only drop them on request
+    'aggressive': {'resource_types': {'image', 'media', 'font', 'stylesheet', 'texttrack',
+                                      'eventsource', 'websocket', 'manifest', 'other'},
+                   'block_trackers': True},
+}
+DEFAULT_BLOCK_PROFILE = 'standard'
+
+# Matched against the request host and each of its parent domains
+TRACKER_DOMAINS = {
+    'google-analytics.com', 'googletagmanager.com', 'googleadservices.com',
+    'doubleclick.net', 'googlesyndication.com',
+    'facebook.net', 'connect.facebook.net', 'hotjar.com', 'hotjar.io',
+    'clarity.ms', 'bing.com', 'bat.bing.com', 'linkedin.com', 'licdn.com',
+    'ads-twitter.com', 'analytics.tiktok.com', 'pinimg.com', 'segment.io',
+    'segment.com', 'mixpanel.com', 'amplitude.com', 'fullstory.com',
+    'mouseflow.com', 'crazyegg.com', 'optimizely.com', 'newrelic.com',
+    'nr-data.net', 'quantserve.com', 'scorecardresearch.com', 'criteo.com',
+    'criteo.net', 'taboola.com', 'outbrain.com', 'adnxs.com', 'adsrvr.org',
+    'trustpilot.com', 'tawk.to', 'intercom.io', 'intercomcdn.com',
+    'zendesk.com', 'zopim.com', 'livechatinc.com', 'cookiebot.com',
+    'onetrust.com', 'cookielaw.org', 'youtube.com', 'ytimg.com', 'vimeo.com',
+}
+
+# Blocked requests never download, so their size is estimated from typical
+# transfer sizes per resource type (roughly HTTP Archive medians)
+TYPICAL_RESOURCE_BYTES = {
+    'image': 45_000, 'media': 500_000, 'font': 30_000, 'stylesheet': 20_000,
+    'script': 25_000, 'xhr': 5_000, 'fetch': 5_000, 'other': 5_000,
+}
+
+
+class ResourceBlocker:
+    """Aborts requests matching a blocking profile and tallies what was saved"""
+    
+    def __init__(self, profile: str = DEFAULT_BLOCK_PROFILE):
+        if profile not in RESOURCE_BLOCK_PROFILES:
+            raise ValueError(f"Unknown block profile '{profile}' "
+                             f"(choose from {', '.join(RESOURCE_BLOCK_PROFILES)})")
+        self.profile = profile
+        self.resource_types = RESOURCE_BLOCK_PROFILES[profile]['resource_types']
+        self.block_trackers = RESOURCE_BLOCK_PROFILES[profile]['block_trackers']
+        # Totals for the whole run
+        self.blocked = {}
+        self.bytes_saved = 0
+        self.bytes_loaded = 0
+    
+    @property
+    def enabled(self) -> bool:
+        return bool(self.resource_types) or self.block_trackers
+    
+    def is_tracker(self, url: str) -> bool:
+        host = urllib.parse.urlsplit(url).hostname or ''
+        parts = host.split('.')
+        return any('.'.join(parts[i:]) in TRACKER_DOMAINS for i in range(len(parts) - 1))
+    
+    def block_reason(self, resource_type: str, url: str) -> Optional[str]:
+        if resource_type in self.resource_types:
+            return resource_type
+        # Never block the page itself, even on a tracker-listed host
+        if self.block_trackers and resource_type != 'document' and self.is_tracker(url):
+            return 'tracker'
+        return None
+    
+    async def attach(self, page, counters: Dict):
+        """
+        Route a page's requests through the profile; per-page numbers are
+        added to counters ('blocked', 'bytes_saved', 'bytes_loaded')
+        """
+        async def _route(route):
+            request = route.request
+            reason = self.block_reason(request.resource_type, request.url)
+            if reason is None:
+                await route.continue_()
+                return
+            saved = TYPICAL_RESOURCE_BYTES.get(request.resource_type, TYPICAL_RESOURCE_BYTES['other'])
+            counters['blocked'] = counters.get('blocked', 0) + 1
+            counters['bytes_saved'] = counters.get('bytes_saved', 0) + saved
+            self.blocked[reason] = self.blocked.get(reason, 0) + 1
+            self.bytes_saved += saved
+            await route.abort('blockedbyclient')
+        
+        def _response(response):
+            try:
+                size = int(response.headers.get('content-length', 0))
+            except ValueError:
+                size = 0
+            counters['bytes_loaded'] = counters.get('bytes_loaded', 0) + size
+            self.bytes_loaded += size
+        
+        if self.enabled:
+            await page.route('**/*', _route)
+        page.on('response', _response)
+    
+    def print_summary(self):
+        total = sum(self.blocked.values())
+        print(f"\n🚫 Resource blocking ({self.profile}): {total} requests blocked")
+        for reason, count in sorted(self.blocked.items(), key=lambda item: -item[1]):
+            print(f"   {reason:<12} {count:>6}")
+        print(f"   ~{self.bytes_saved / 1_048_576:.1f} MB saved (estimated), "
+              f"{self.bytes_loaded / 1_048_576:.1f} MB loaded")
+
+
+# Runs in the page: watches DOM mutations and the main content's text
+# length, scrolls once (for lazy-loaded sections) when the page is taller
+# than the viewport, and resolves when things have settled or time runs out
+READINESS_SCRIPT = """
+async ({quietMs, maxWaitMs, minChars, pollMs}) => {
+    const start = performance.now();
+    let lastChange = start;
+    let lastLength = -1;
+    let scrolled = false;
+    const observer = new MutationObserver(() => { lastChange = performance.now(); });
+    observer.observe(document.documentElement, {childList: true, subtree: true, characterData: true});
+    const mainText = () => {
+        const root = document.querySelector('main, article, .content, #content') || document.body;
+        return root ? root.innerText.length : 0;
+    };
+    try {
+        while (true) {
+            const now = performance.now();
+            const length = mainText();
+            if (length !== lastLength) {
+                lastLength = length;
+                lastChange = now;
+            }
+            if (now - start >= maxWaitMs) {
+                return {reason: 'ceiling', waited_ms: Math.round(now - start), text_length: length};
+            }
+            const quietNeeded = length >= minChars ? quietMs : quietMs * 4;
+            if (now - lastChange >= quietNeeded) {
+                if (!scrolled && document.body && document.body.scrollHeight > window.innerHeight) {
+                    scrolled = true;
+                    window.scrollTo(0, document.body.scrollHeight);
+                    lastChange = performance.now();
+                } else {
+                    return {reason: 'stable', waited_ms: Math.round(now - start), text_length: length};
+                }
+            }
+            await new Promise(resolve => setTimeout(resolve, pollMs));
+        }
+    } finally {
+        observer.disconnect();
+    }
+}
+"""
+
+
 class ITOContentScraper:
-    def __init__(self):
+    def __init__(self, max_pages: int = DEFAULT_PAGE_POOL_SIZE,
+                 ready_max_wait: float = READY_MAX_WAIT_SECONDS,
+                 ready_quiet_ms: int = READY_QUIET_MS,
+                 block_profile: str = DEFAULT_BLOCK_PROFILE,
+                 fetch_cache=None):
+        """
+        One Chromium instance is shared by every scrape until close(); pages
+        are reused from a pool of at most max_pages.
+        
+        Args:
+            max_pages: Size of the page pool
+            ready_max_wait: Ceiling in seconds on waiting for a page's content to settle
+            ready_quiet_ms: How long the content must stay unchanged to count as loaded
+            block_profile: Key of RESOURCE_BLOCK_PROFILES ('none' loads everything)
+            fetch_cache: Optional shared.utils.fetch_cache.FetchCache; rendered
+                HTML is reused from it and, in offline mode, never fetched
+        """
         self.results = []
+        self.max_pages = max_pages
+        self.ready_max_wait = ready_max_wait
+        self.ready_quiet_ms = ready_quiet_ms
+        self.blocker = ResourceBlocker(block_profile)
+        self.fetch_cache = fetch_cache
+        
+        self._playwright = None
+        self._browser = None
+        self._browser_lock: Optional[asyncio.Lock] = None
+        self._idle_pages = []
+        self._page_slots: Optional[asyncio.Semaphore] = None
+        # Blocking counters of each pooled page, reset per scrape
+        self._page_counters: Dict = {}
+        # Event loop used by the synchronous wrappers; the browser belongs to it
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[threading.Thread] = None
+    
+    def run_coroutine(self, coro):
+        """Run a coroutine on the scraper's own loop so the browser outlives the call"""
+        if self._loop is None:
+            self._loop = asyncio.new_event_loop()
+            self._loop_thread = threading.Thread(
+                target=self._loop.run_forever, name='ito-scraper-loop', daemon=True
+            )
+            self._loop_thread.start()
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
     
     def scrape_page(self, url: str, page_type: str = 'tour_page') -> Dict:
         """Synchronous wrapper for async scrape_page_async"""
-        return asyncio.run(self.scrape_page_async(url, page_type))
+        return self.run_coroutine(self.scrape_page_async(url, page_type))
+    
+    def scrape_many(self, urls: List[str], page_type: str = 'tour_page',
+                    concurrency: Optional[int] = None) -> List[Dict]:
+        """Synchronous wrapper for async scrape_many_async"""
+        return self.run_coroutine(self.scrape_many_async(urls, page_type, concurrency))
+    
+    def close(self):
+        """Close the browser and stop the synchronous wrappers' loop"""
+        if self._loop is None:
+            return
+        self.run_coroutine(self.aclose())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._loop_thread.join()
+        self._loop.close()
+        self._loop = None
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc):
+        await self.aclose()
+    
+    async def _ensure_browser(self):
+        """Launch Chromium on first use"""
+        if self._browser_lock is None:
+            self._browser_lock = asyncio.Lock()
+            self._page_slots = asyncio.Semaphore(self.max_pages)
+        async with self._browser_lock:
+            if self._browser is None or not self._browser.is_connected():
+                if self._playwright is None:
+                    self._playwright = await async_playwright().start()
+                self._browser = await self._playwright.chromium.launch(headless=True)
+                self._idle_pages = []
+        return self._browser
+    
+    async def _acquire_page(self):
+        """Idle page from the pool, or a new one while under max_pages"""
+        browser = await self._ensure_browser()
+        await self._page_slots.acquire()
+        try:
+            while self._idle_pages:
+                page = self._idle_pages.pop()
+                if not page.is_closed():
+                    return page
+                self._page_counters.pop(page, None)
+            page = await browser.new_page()
+            self._page_counters[page] = {}
+            await self.blocker.attach(page, self._page_counters[page])
+            return page
+        except BaseException:
+            self._page_slots.release()
+            raise
+    
+    async def _release_page(self, page, reusable: bool = True):
+        """Return a page to the pool; pages left in a bad state are closed"""
+        try:
+            if reusable and not page.is_closed():
+                self._idle_pages.append(page)
+            else:
+                self._page_counters.pop(page, None)
+                if not page.is_closed():
+                    await page.close()
+        except Exception:
+            pass
+        finally:
+            self._page_slots.release()
+    
+    async def aclose(self):
+        """Close pooled pages, the browser and Playwright"""
+        pages, self._idle_pages = self._idle_pages, []
+        self._page_counters = {}
+        for page in pages:
+            try:
+                await page.close()
+            except Exception:
+                pass
+        if self._browser is not None:
+            try:
+                await self._browser.close()
+            except Exception:
+                pass
+            self._browser = None
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+        self._browser_lock = None
+        self._page_slots = None
+    
+    async def scrape_many_async(self, urls: List[str], page_type: str = 'tour_page',
+                                concurrency: Optional[int] = None) -> List[Dict]:
+        """
+        Scrape several pages concurrently in the shared browser
+        
+        Args:
+            urls: URLs to scrape
+            page_type: 'gambia_page' or 'tour_page'
+            concurrency: Pages loading at once (defaults to, and is capped by, max_pages)
+        
+        Returns:
+            One result dict per URL, in the order given
+        """
+        limit = asyncio.Semaphore(max(1, concurrency or self.max_pages))
+        
+        async def _scrape(url):
+            async with limit:
+                return await self.scrape_page_async(url, page_type)
+        
+        return await asyncio.gather(*(_scrape(url) for url in urls))
     
     async def scrape_page_async(self, url: str, page_type: str) -> Dict:
         """
@@ -31,126 +355,198 @@ class ITOContentScraper:
         Returns:
             Dict with extracted content
         """
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=True)
-            page = await browser.new_page()
+        loop = asyncio.get_running_loop()
+        if self.fetch_cache is not None:
+            cached = await loop.run_in_executor(None, self.fetch_cache.lookup, url, 'rendered')
+            if cached is not None:
+                print(f"  Cached: {url[:80]}...")
+                result = await loop.run_in_executor(
+                    None, self.extract_content, url, page_type, cached.text
+                )
+                result['from_cache'] = True
+                return result
+            if self.fetch_cache.offline:
+                print(f"    ❌ Not cached (offline): {url[:80]}")
+                return self._error_result(url, page_type, 'Not in fetch cache (offline mode)')
+        
+        page = None
+        reusable = False
+        try:
+            page = await self._acquire_page()
+            counters = self._page_counters[page]
+            counters.clear()
+            print(f"  Scraping: {url[:80]}...")
+            
+            # Browser time (load, waits, scrolling) is reported as the 'scrape' upstream
+            with time_upstream('scrape', 'browser'):
+                # Extended timeout for slow sites; readiness is judged below
+                # rather than by waiting for the network to go idle
+                await page.goto(url, wait_until='domcontentloaded', timeout=45000)
+                readiness = await self.wait_until_ready(page)
             
-            try:
-                print(f"  Scraping: {url[:80]}...")
-                
-                # Load page with extended timeout for JS-heavy sites
-                await page.goto(url, wait_until='networkidle', timeout=45000)
-                
-                # Wait for common content containers to load
-                try:
-                    await page.wait_for_selector('main, article, .content, #content', timeout=5000)
-                except:
-                    pass  # Continue even if selector not found
-                
-                # Scroll to load lazy-loaded content
-                await page.evaluate('window.scrollTo(0, document.body.scrollHeight/2)')
-                await page.wait_for_timeout(1000)
-                await page.evaluate('window.scrollTo(0, document.body.scrollHeight)')
-                await page.wait_for_timeout(2000)
-                
-                # Additional wait for dynamic content
-                await page.wait_for_timeout(3000)
-                
                 # Get HTML content
                 html = await page.content()
-                soup = BeautifulSoup(html, 'html.parser')
-                
-                # Extract metadata
-                title = soup.find('title')
-                title_text = title.get_text().strip() if title else ''
-                
-                meta_desc = soup.find('meta', attrs={'name': 'description'})
-                meta_description = meta_desc.get('content', '').strip() if meta_desc else ''
-                
-                # Extract special sections for creative tourism analysis
-                special_sections = self._extract_special_sections(soup)
-                
-                # Extract main content
-                main_content = self._extract_main_content(soup)
-                
-                # Extract headers (important for themes)
-                headers = self._extract_headers(soup)
-                
-                # ENHANCED: Weighted content assembly for creative tourism
-                # Priority order reflects importance for cultural/creative positioning:
-                # 1. Title + Meta (positioning keywords) - 1x
-                # 2. Headers (themes and structure) - 1x
-                # 3. Overview (marketing language) - 1.5x
-                # 4. Highlights (key selling points) - 2x
-                # 5. Itinerary (detailed cultural activities) - 2x
-                # 6. Image descriptions (visual cultural content) - 1x
-                # 7. Main content (catch-all) - 1x
-                
-                weighted_content = []
-                weighted_content.append(title_text)
-                weighted_content.append(meta_description)
-                weighted_content.append(headers)
-                
-                # Overview - 1.5x weight
-                if special_sections['overview']:
-                    weighted_content.append(special_sections['overview'])
-                    weighted_content.append(special_sections['overview'][:len(special_sections['overview'])//2])
-                
-                # Highlights - 2x weight (key cultural selling points)
-                if special_sections['highlights']:
-                    weighted_content.append(special_sections['highlights'])
-                    weighted_content.append(special_sections['highlights'])
-                
-                # Itinerary - 2x weight (detailed cultural activities)
-                if special_sections['itinerary']:
-                    weighted_content.append(special_sections['itinerary'])
-                    weighted_content.append(special_sections['itinerary'])
-                
-                # Image descriptions - 1x weight
-                if special_sections['image_descriptions']:
-                    weighted_content.append(special_sections['image_descriptions'])
-                
-                # Main content - 1x weight
-                weighted_content.append(main_content)
-                
-                # Assemble and clean
-                full_text = '\n\n'.join(weighted_content)
-                full_text = self._clean_text(full_text)
-                
-                word_count = len(full_text.split())
-                
-                result = {
-                    'url': url,
-                    'page_type': page_type,
-                    'success': True,
-                    'title': title_text,
-                    'meta_description': meta_description,
-                    'headers': headers,
-                    'highlights': special_sections['highlights'][:500],  # First 500 chars
-                    'itinerary': special_sections['itinerary'][:1000],  # First 1000 chars
-                    'main_content': main_content[:3000],  # First 3000 chars
-                    'full_text': full_text,
-                    'word_count': word_count,
-                    'scraped_at': datetime.now().isoformat()
-                }
-                
-                print(f"    ✅ Extracted {word_count} words")
-                return result
-                
-            except Exception as e:
-                print(f"    ❌ Error: {str(e)[:100]}")
-                return {
-                    'url': url,
-                    'page_type': page_type,
-                    'success': False,
-                    'error': str(e),
-                    'full_text': '',
-                    'word_count': 0
-                }
-            finally:
-                await browser.close()
+            reusable = True
+        except Exception as e:
+            print(f"    ❌ Error: {str(e)[:100]}")
+            return self._error_result(url, page_type, str(e))
+        finally:
+            if page is not None:
+                # Snapshot before the page goes back to the pool, where the
+                # next task to take it clears the shared counters
+                request_counts = dict(self._page_counters.get(page, {}))
+                await self._release_page(page, reusable)
+        
+        if self.fetch_cache is not None:
+            await loop.run_in_executor(None, lambda: self.fetch_cache.put(
+                url, html.encode('utf-8'), {'Content-Type': 'text/html; charset=utf-8'},
+                variant='rendered'
+            ))
+        
+        # Parse off the loop so other pages keep loading meanwhile
+        result = await loop.run_in_executor(
+            None, self.extract_content, url, page_type, html
+        )
+        result['readiness'] = readiness
+        result['blocked_requests'] = request_counts.get('blocked', 0)
+        result['bytes_saved_estimate'] = request_counts.get('bytes_saved', 0)
+        return result
+    
+    def _error_result(self, url: str, page_type: str, error: str) -> Dict:
+        return {
+            'url': url,
+            'page_type': page_type,
+            'success': False,
+            'error': error,
+            'full_text': '',
+            'word_count': 0
+        }
+    
+    async def wait_until_ready(self, page) -> Dict:
+        """
+        Wait until the page's main content has stopped changing
+        
+        Returns:
+            {'reason': 'stable' | 'ceiling' | 'error', 'waited_ms': ..., 'text_length': ...},
+            plus 'error' (the exception message) when reason is 'error'
+        """
+        started = time.monotonic()
+        try:
+            return await page.evaluate(READINESS_SCRIPT, {
+                'quietMs': self.ready_quiet_ms,
+                'maxWaitMs': int(self.ready_max_wait * 1000),
+                'minChars': READY_MIN_TEXT_CHARS,
+                'pollMs': READY_POLL_MS,
+            })
+        except Exception as e:
+            # Typically a client-side redirect replacing the document mid-wait;
+            # settle for whatever has loaded by now
+            try:
+                await page.wait_for_load_state('load', timeout=int(self.ready_max_wait * 1000))
+            except Exception:
+                pass
+            return {
+                'reason': 'error',
+                'waited_ms': int((time.monotonic() - started) * 1000),
+                'text_length': None,
+                'error': str(e)[:200],
+            }
     
-    def _extract_special_sections(self, soup: BeautifulSoup) -> Dict[str, str]:
+    def extract_content(self, url: str, page_type: str, html: str) -> Dict:
+        """Build the result dict for a page from its rendered HTML"""
+        try:
+            # Parsed once; every lookup below is answered from its element index
+            doc = HtmlDocument(html)
+            
+            # Extract metadata
+            title = doc.find('title')
+            title_text = title.get_text().strip() if title else ''
+            
+            meta_desc = doc.meta_content(name='description')
+            meta_description = meta_desc.strip() if meta_desc is not None else ''
+            
+            # Extract special sections for creative tourism analysis
+            special_sections = self._extract_special_sections(doc)
+            
+            # Extract main content
+            main_content = self._extract_main_content(doc)
+            
+            # Extract headers (important for themes)
+            headers = self._extract_headers(doc)
+            
+            # ENHANCED: Weighted content assembly for creative tourism
+            # Priority order reflects importance for cultural/creative positioning:
+            # 1. Title + Meta (positioning keywords) - 1x
+            # 2. Headers (themes and structure) - 1x
+            # 3. Overview (marketing language) - 1.5x
+            # 4. Highlights (key selling points) - 2x
+            # 5. Itinerary (detailed cultural activities) - 2x
+            # 6. Image descriptions (visual cultural content) - 1x
+            # 7. Main content (catch-all) - 1x
+            
+            weighted_content = []
+            weighted_content.append(title_text)
+            weighted_content.append(meta_description)
+            weighted_content.append(headers)
+            
+            # Overview - 1.5x weight
+            if special_sections['overview']:
+                weighted_content.append(special_sections['overview'])
+                weighted_content.append(special_sections['overview'][:len(special_sections['overview'])//2])
+            
+            # Highlights - 2x weight (key cultural selling points)
+            if special_sections['highlights']:
+                weighted_content.append(special_sections['highlights'])
+                weighted_content.append(special_sections['highlights'])
+            
+            # Itinerary - 2x weight (detailed cultural activities)
+            if special_sections['itinerary']:
+                weighted_content.append(special_sections['itinerary'])
+                weighted_content.append(special_sections['itinerary'])
+            
+            # Image descriptions - 1x weight
+            if special_sections['image_descriptions']:
+                weighted_content.append(special_sections['image_descriptions'])
+            
+            # Main content - 1x weight
+            weighted_content.append(main_content)
+            
+            # Assemble and clean
+            full_text = '\n\n'.join(weighted_content)
+            full_text = self._clean_text(full_text)
+            
+            word_count = len(full_text.split())
+            
+            result = {
+                'url': url,
+                'page_type': page_type,
+                'success': True,
+                'title': title_text,
+                'meta_description': meta_description,
+                'headers': headers,
+                'highlights': special_sections['highlights'][:500],  # First 500 chars
+                'itinerary': special_sections['itinerary'][:1000],  # First 1000 chars
+                'main_content': main_content[:3000],  # First 3000 chars
+                'full_text': full_text,
+                'word_count': word_count,
+                'scraped_at': datetime.now().isoformat()
+            }
+            
+            print(f"    ✅ Extracted {word_count} words")
+            return result
+            
+        except Exception as e:
+            print(f"    ❌ Error: {str(e)[:100]}")
+            return {
+                'url': url,
+                'page_type': page_type,
+                'success': False,
+                'error': str(e),
+                'full_text': '',
+                'word_count': 0
+            }
+    
+    def _extract_special_sections(self, doc: HtmlDocument) -> Dict[str, str]:
         """Extract specific sections important for creative tourism analysis"""
         sections = {}
         
@@ -162,9 +558,9 @@ class ITOContentScraper:
         ]
         highlights = []
         for selector in highlights_selectors:
-            elements = soup.select(selector)
+            elements = doc.select(selector)
             for elem in elements:
-                text = elem.get_text(separator=' ', strip=True)
+                text = doc.text(elem, separator=' ', strip=True)
                 if text and len(text) > 20:
                     highlights.append(text)
         sections['highlights'] = ' '.join(highlights) if highlights else ''
@@ -177,9 +573,9 @@ class ITOContentScraper:
         ]
         itinerary = []
         for selector in itinerary_selectors:
-            elements = soup.select(selector)
+            elements = doc.select(selector)
             for elem in elements:
-                text = elem.get_text(separator=' ', strip=True)
+                text = doc.text(elem, separator=' ', strip=True)
                 if text and len(text) > 50:
                     itinerary.append(text)
         sections['itinerary'] = ' '.join(itinerary) if itinerary else ''
@@ -192,16 +588,18 @@ class ITOContentScraper:
         ]
         overview = []
         for selector in overview_selectors:
-            elements = soup.select(selector)
+            elements = doc.select(selector)
             for elem in elements:
-                text = elem.get_text(separator=' ', strip=True)
+                text = doc.text(elem, separator=' ', strip=True)
                 if text and len(text) > 50:
                     overview.append(text)
         sections['overview'] = ' '.join(overview) if overview else ''
         
         # Image alt text (often contains activity descriptions)
         image_alts = []
-        for img in soup.find_all('img', alt=True):
+        for img in doc.find_all('img'):
+            if not img.has_attr('alt'):
+                continue
             alt_text = img['alt'].strip()
             if alt_text and len(alt_text) > 10 and len(alt_text) < 200:
                 image_alts.append(alt_text)
@@ -209,13 +607,12 @@ class ITOContentScraper:
         
         return sections
     
-    def _extract_main_content(self, soup: BeautifulSoup) -> str:
+    def _extract_main_content(self, doc: HtmlDocument) -> str:
         """Extract main content, filtering out navigation/footer/ads"""
         
         # Remove unwanted elements
-        for element in soup(['nav', 'footer', 'script', 'style', 'aside', 
-                            'header', 'menu', 'iframe', 'noscript']):
-            element.decompose()
+        doc.remove('nav', 'footer', 'script', 'style', 'aside',
+                   'header', 'menu', 'iframe', 'noscript')
         
         # Try to find main content areas (in priority order)
         content_selectors = [
@@ -248,26 +645,26 @@ class ITOContentScraper:
         extracted_text = []
         
         for selector in content_selectors:
-            elements = soup.select(selector)
+            elements = doc.select(selector)
             if elements:
                 for elem in elements:
-                    text = elem.get_text(separator=' ', strip=True)
+                    text = doc.text(elem, separator=' ', strip=True)
                     if len(text) > 100:  # Only include substantial content
                         extracted_text.append(text)
         
         # If no main content found, fall back to body (less ideal)
         if not extracted_text:
-            body = soup.find('body')
+            body = doc.find('body')
             if body:
                 extracted_text.append(body.get_text(separator=' ', strip=True))
         
         return ' '.join(extracted_text)
     
-    def _extract_headers(self, soup: BeautifulSoup) -> str:
+    def _extract_headers(self, doc: HtmlDocument) -> str:
         """Extract all headers (H1-H3) as they often contain key themes"""
         headers = []
         for tag in ['h1', 'h2', 'h3']:
-            for header in soup.find_all(tag):
+            for header in doc.find_all(tag):
                 text = header.get_text().strip()
                 if text and len(text) > 2:
                     headers.append(text)
@@ -285,14 +682,29 @@ class ITOContentScraper:
         return text.strip()
 
 
-async def scrape_operator_urls(operator_name: str, gambia_urls: List[str], tour_urls: List[str]) -> Dict:
+async def scrape_operator_urls(operator_name: str, gambia_urls: List[str], tour_urls: List[str],
+                               scraper: Optional[ITOContentScraper] = None,
+                               scheduler: Optional[CrawlScheduler] = None) -> Dict:
     """
     Scrape all URLs for a single operator
     
+    Gambia and tour pages go through the scheduler together, so they are
+    limited only by its per-domain politeness budget
+    
+    Args:
+        scraper: Shared scraper (and browser) to use; a temporary one is
+            created and closed if omitted
+        scheduler: Shared CrawlScheduler, so several operators can be
+            scraped concurrently under the same per-domain limits
+    
     Returns:
         Dict with combined content from all pages
     """
-    scraper = ITOContentScraper()
+    own_scraper = scraper is None and scheduler is None
+    if own_scraper:
+        scraper = ITOContentScraper()
+    if scheduler is None:
+        scheduler = CrawlScheduler(scraper, progress=False)
     
     print(f"\n{'='*80}")
     print(f"Scraping: {operator_name}")
@@ -307,29 +719,29 @@ async def scrape_operator_urls(operator_name: str, gambia_urls: List[str], tour_
         'scraped_at': datetime.now().isoformat()
     }
     
-    # Scrape Gambia pages
-    if gambia_urls:
-        print(f"📄 Gambia Pages ({len(gambia_urls)}):")
-        for url in gambia_urls:
+    jobs = []
+    for urls, page_type, key in ((gambia_urls, 'gambia_page', 'gambia_pages'),
+                                 (tour_urls, 'tour_page', 'tour_pages')):
+        for url in urls or []:
             if url and url.strip():
-                result = await scraper.scrape_page_async(url.strip(), 'gambia_page')
-                all_content['gambia_pages'].append(result)
-                if result['success']:
-                    all_content['total_word_count'] += result['word_count']
-                    all_content['combined_text'] += f"\n\n{result['full_text']}"
-    
-    # Scrape tour pages
-    if tour_urls:
-        print(f"🎫 Tour Pages ({len(tour_urls)}):")
-        for url in tour_urls:
-            if url and url.strip():
-                result = await scraper.scrape_page_async(url.strip(), 'tour_page')
-                all_content['tour_pages'].append(result)
-                if result['success']:
-                    all_content['total_word_count'] += result['word_count']
-                    all_content['combined_text'] += f"\n\n{result['full_text']}"
+                jobs.append({'url': url.strip(), 'page_type': page_type, 'content_key': key})
+    print(f"📄 {len(jobs)} page(s) to scrape")
+    
+    try:
+        results = await scheduler.run(jobs)
+    finally:
+        if own_scraper:
+            await scraper.aclose()
+    
+    for job, result in zip(jobs, results):
+        if result is None:
+            continue  # Already done in a resumed run
+        all_content[job['content_key']].append(result)
+        if result['success']:
+            all_content['total_word_count'] += result['word_count']
+            all_content['combined_text'] += f"\n\n{result['full_text']}"
     
-    print(f"✅ Total extracted: {all_content['total_word_count']} words")
+    print(f"✅ {operator_name}: extracted {all_content['total_word_count']} words")
     
     return all_content
 
@@ -351,25 +763,29 @@ async def main():
         }
     ]
     
-    all_results = []
-    
-    for test in test_cases:
-        result = await scrape_operator_urls(
-            test['operator'],
-            test['gambia_urls'],
-            test['tour_urls']
-        )
-        all_results.append(result)
+    async with ITOContentScraper() as scraper:
+        # Operators run side by side; each site still sees one request at a time
+        scheduler = CrawlScheduler(scraper)
+        all_results = await asyncio.gather(*(
+            scrape_operator_urls(test['operator'], test['gambia_urls'], test['tour_urls'],
+                                 scraper, scheduler)
+            for test in test_cases
+        ))
+        
+        for test, result in zip(test_cases, all_results):
+            # Save individual result
+            filename = f"ito_content_{test['operator'].lower().replace(' ', '_')}.json"
+            with open(filename, 'w', encoding='utf-8') as f:
+                json.dump(result, f, indent=2, ensure_ascii=False)
+            print(f"💾 Saved to {filename}")
         
-        # Save individual result
-        filename = f"ito_content_{test['operator'].lower().replace(' ', '_')}.json"
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(result, f, indent=2, ensure_ascii=False)
-        print(f"💾 Saved to {filename}")
+        scheduler.print_summary()
+        scraper.blocker.print_summary()
     
     print(f"\n{'='*80}")
     print(f"✅ Scraping complete! Tested {len(all_results)} operators")
     print(f"{'='*80}")
+    print_upstream_summary()
 
 
 if __name__ == '__main__':
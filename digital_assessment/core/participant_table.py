@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Indexed in-memory participant table for /api/participants
+Rows are parsed once per snapshot; sector/region indexes and sort orders let
+the API filter, sort, paginate and project fields without rescanning the sheet
+"""
+
+import bisect
+import threading
+from typing import Dict, List, Optional
+
+from aggregate_views import safe_float, get_maturity_level
+
+# Column layout of the CI Assessment tab (text columns first, then scores)
+TEXT_FIELDS = ['name', 'sector', 'region']
+SCORE_FIELDS = [
+    'socialMedia', 'website', 'visualContent', 'discoverability', 'digitalSales',
+    'platformIntegration', 'externalTotal', 'surveyTotal', 'combinedScore'
+]
+PARTICIPANT_FIELDS = TEXT_FIELDS + SCORE_FIELDS + ['maturityLevel']
+# min_score filters on the same score that drives the maturity level
+MIN_SCORE_FIELD = 'externalTotal'
+
+
+def parse_participant(row: List[str]) -> Dict:
+    """One CI Assessment row as the participant dict the dashboard expects"""
+    participant = {
+        'name': row[0],
+        'sector': row[1] if len(row) > 1 else 'Unknown',
+        'region': row[2] if len(row) > 2 else 'Unknown',
+    }
+    for offset, field in enumerate(SCORE_FIELDS):
+        column = 3 + offset
+        participant[field] = safe_float(row[column]) if len(row) > column else 0
+    participant['maturityLevel'] = get_maturity_level(participant['externalTotal'])
+    return participant
+
+
+class ParticipantQuery:
+    """Validated /api/participants query parameters"""
+
+    def __init__(self, params: Dict[str, List[str]]):
+        """
+        Args:
+            params: Output of urllib.parse.parse_qs for the request
+
+        Raises:
+            ValueError: If a parameter is malformed
+        """
+        self.fields = None
+        if params.get('fields'):
+            self.fields = [f.strip() for f in ','.join(params['fields']).split(',') if f.strip()]
+            unknown = [f for f in self.fields if f not in PARTICIPANT_FIELDS]
+            if unknown:
+                raise ValueError(f"Unknown field(s): {', '.join(unknown)}")
+
+        # Sector names contain commas, so multiple values use repeated params
+        self.sectors = [s.strip().lower() for s in params.get('sector', []) if s.strip()]
+        self.regions = [r.strip().lower() for r in params.get('region', []) if r.strip()]
+
+        self.min_score = None
+        if params.get('min_score'):
+            try:
+                self.min_score = float(params['min_score'][0])
+            except ValueError:
+                raise ValueError("min_score must be a number")
+
+        self.sort = None
+        self.descending = False
+        if params.get('sort'):
+            sort = params['sort'][0].strip()
+            self.descending = sort.startswith('-')
+            self.sort = sort.lstrip('-')
+            if self.sort not in PARTICIPANT_FIELDS:
+                raise ValueError(f"Cannot sort by '{self.sort}'")
+
+        self.offset = self._int_param(params, 'offset', 0)
+        self.limit = self._int_param(params, 'limit', None)
+
+    @staticmethod
+    def _int_param(params, name, default):
+        if not params.get(name):
+            return default
+        try:
+            value = int(params[name][0])
+        except ValueError:
+            raise ValueError(f"{name} must be an integer")
+        if value < 0:
+            raise ValueError(f"{name} must not be negative")
+        return value
+
+
+class ParticipantTable:
+    """All participants from one snapshot plus lookup indexes"""
+
+    def __init__(self, rows: List[List[str]]):
+        self.participants = [parse_participant(row) for row in rows[1:] if len(row) > 0 and row[0]]
+        self.by_sector: Dict[str, List[int]] = {}
+        self.by_region: Dict[str, List[int]] = {}
+        for i, p in enumerate(self.participants):
+            self.by_sector.setdefault(str(p['sector']).lower(), []).append(i)
+            self.by_region.setdefault(str(p['region']).lower(), []).append(i)
+
+        self._orders: Dict[str, List[int]] = {}
+        self._orders_lock = threading.Lock()
+        score_order = self.order(MIN_SCORE_FIELD)
+        self._score_keys = [self.participants[i][MIN_SCORE_FIELD] for i in score_order]
+
+    def order(self, field: str) -> List[int]:
+        """Row positions sorted ascending by field, computed once per table"""
+        order = self._orders.get(field)
+        if order is None:
+            with self._orders_lock:
+                order = self._orders.get(field)
+                if order is None:
+                    key = (lambda i: str(self.participants[i][field]).lower()) if field in TEXT_FIELDS + ['maturityLevel'] \
+                        else (lambda i: self.participants[i][field])
+                    order = sorted(range(len(self.participants)), key=key)
+                    self._orders[field] = order
+        return order
+
+    def _candidates(self, query: ParticipantQuery) -> Optional[set]:
+        """Positions matching the filters, or None when nothing is filtered"""
+        candidates = None
+        for index, wanted in ((self.by_sector, query.sectors), (self.by_region, query.regions)):
+            if not wanted:
+                continue
+            matches = set()
+            for value in wanted:
+                matches.update(index.get(value, []))
+            candidates = matches if candidates is None else candidates & matches
+
+        if query.min_score is not None:
+            start = bisect.bisect_left(self._score_keys, query.min_score)
+            matches = set(self.order(MIN_SCORE_FIELD)[start:])
+            candidates = matches if candidates is None else candidates & matches
+        return candidates
+
+    def query(self, query: ParticipantQuery):
+        """
+        Run a query against the table
+
+        Returns:
+            (page of participant dicts, total number of matches before paging)
+        """
+        candidates = self._candidates(query)
+
+        if query.sort:
+            order = self.order(query.sort)
+            if query.descending:
+                order = order[::-1]
+            positions = order if candidates is None else [i for i in order if i in candidates]
+        else:
+            positions = range(len(self.participants)) if candidates is None else sorted(candidates)
+
+        total = len(positions)
+        end = None if query.limit is None else query.offset + query.limit
+        page = positions[query.offset:end]
+
+        if query.fields is None:
+            return [self.participants[i] for i in page], total
+        fields = query.fields
+        return [{f: self.participants[i][f] for f in fields} for i in page], total
+
+
+class ParticipantTableCache:
+    """Keeps one ParticipantTable per snapshot version"""
+
+    def __init__(self, range_name: str):
+        self.range_name = range_name
+        self._current = (None, None)
+        self._lock = threading.Lock()
+        # Best-effort counters for /api/metrics
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, snapshot) -> ParticipantTable:
+        version, table = self._current
+        if table is not None and version == snapshot.version:
+            self.hits += 1
+            return table
+        with self._lock:
+            version, table = self._current
+            if table is None or version != snapshot.version:
+                self.misses += 1
+                table = ParticipantTable(snapshot.rows(self.range_name))
+                self._current = (snapshot.version, table)
+            return table
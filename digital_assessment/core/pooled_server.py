@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Thread-pool HTTP server for the dashboard servers
+Handles requests concurrently on a fixed number of workers, keeps HTTP/1.1
+connections alive and shuts down gracefully on SIGINT/SIGTERM
+"""
+
+import http.server
+import os
+import selectors
+import signal
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_WORKERS = 32
+# Idle keep-alive connections are closed after this many seconds
+KEEPALIVE_TIMEOUT_SECONDS = 5
+
+
+class ThreadPoolHTTPServer(http.server.HTTPServer):
+    """
+    HTTPServer that runs each request on a bounded worker pool.
+
+    A worker only holds a connection while it is handling a request. Between
+    requests, keep-alive connections are parked in a selector and handed back
+    to the pool when the client sends the next one, so idle browsers don't tie
+    up workers. Pipelined requests are not supported (browsers don't send them).
+    """
+
+    allow_reuse_address = True
+    request_queue_size = 128
+
+    def __init__(self, server_address, handler_class, workers: int = DEFAULT_WORKERS,
+                 keepalive_timeout: float = KEEPALIVE_TIMEOUT_SECONDS):
+        self.workers = workers
+        self.keepalive_timeout = keepalive_timeout
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='http-worker')
+        self._closing = threading.Event()
+        self._idle = selectors.DefaultSelector()
+        self._idle_since = {}
+        self._idle_lock = threading.Lock()
+        super().__init__(server_address, handler_class)
+
+        self._poller = threading.Thread(target=self._poll_idle, name='http-keepalive', daemon=True)
+        self._poller.start()
+
+    def process_request(self, request, client_address):
+        """Queue the new connection on the pool instead of handling it inline"""
+        self.pool.submit(self._open_connection, request, client_address)
+
+    def _open_connection(self, request, client_address):
+        """Build the handler without running its blocking handle() loop"""
+        handler_class = self.RequestHandlerClass
+        handler = handler_class.__new__(handler_class)
+        handler.request = request
+        handler.client_address = client_address
+        handler.server = self
+        if isinstance(handler, http.server.SimpleHTTPRequestHandler) and not hasattr(handler, 'directory'):
+            # Normally set in SimpleHTTPRequestHandler.__init__, which is skipped here
+            handler.directory = os.getcwd()
+        try:
+            handler.setup()
+        except Exception:
+            self.handle_error(request, client_address)
+            self.shutdown_request(request)
+            return
+        self._serve_one(handler)
+
+    def _serve_one(self, handler):
+        """Handle a single request, then park or close the connection"""
+        try:
+            handler.close_connection = True
+            handler.handle_one_request()
+        except Exception:
+            self.handle_error(handler.request, handler.client_address)
+            handler.close_connection = True
+
+        if handler.close_connection or self._closing.is_set():
+            self._close(handler)
+        else:
+            self._park(handler)
+
+    def _park(self, handler):
+        with self._idle_lock:
+            self._idle_since[handler] = time.monotonic()
+            self._idle.register(handler.request, selectors.EVENT_READ, handler)
+
+    def _unpark(self, handler):
+        with self._idle_lock:
+            self._idle_since.pop(handler, None)
+            try:
+                self._idle.unregister(handler.request)
+            except (KeyError, ValueError):
+                pass
+
+    def _close(self, handler):
+        try:
+            handler.finish()
+        except Exception:
+            pass
+        self.shutdown_request(handler.request)
+
+    def _poll_idle(self):
+        """Dispatch parked connections that have data and expire idle ones"""
+        while not self._closing.is_set():
+            try:
+                events = self._idle.select(timeout=0.5)
+            except OSError:
+                # Windows select() refuses an empty fd set
+                time.sleep(0.01)
+                continue
+
+            for key, _ in events:
+                handler = key.data
+                self._unpark(handler)
+                try:
+                    self.pool.submit(self._serve_one, handler)
+                except RuntimeError:
+                    # Pool already shut down
+                    self._close(handler)
+
+            cutoff = time.monotonic() - self.keepalive_timeout
+            with self._idle_lock:
+                expired = [h for h, since in self._idle_since.items() if since < cutoff]
+            for handler in expired:
+                self._unpark(handler)
+                self._close(handler)
+
+    def server_close(self):
+        """Stop accepting connections, let in-flight requests finish, drop idle ones"""
+        self._closing.set()
+        super().server_close()
+        self._poller.join(timeout=2)
+        self.pool.shutdown(wait=True)
+        with self._idle_lock:
+            parked = list(self._idle_since)
+        for handler in parked:
+            self._unpark(handler)
+            self._close(handler)
+        self._idle.close()
+
+
+def serve_until_shutdown(httpd: http.server.HTTPServer):
+    """
+    Serve until SIGINT/SIGTERM, then drain in-flight requests and close.
+
+    shutdown() blocks until serve_forever() returns, so it has to run on a
+    different thread from the one serving.
+    """
+    def _request_shutdown(signum, frame):
+        print("\n🛑 Shutting down, finishing in-flight requests...")
+        threading.Thread(target=httpd.shutdown, daemon=True).start()
+
+    previous = {}
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        previous[sig] = signal.signal(sig, _request_shutdown)
+
+    try:
+        httpd.serve_forever()
+    finally:
+        httpd.server_close()
+        for sig, handler in previous.items():
+            signal.signal(sig, handler)
+        print("👋 Server stopped")
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+GET response cache with request coalescing for the dashboard proxy
+Fresh entries are served without contacting the API server; concurrent
+identical misses share one upstream request (single-flight); expired entries
+are revalidated with If-None-Match so unchanged data costs only a 304
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from response_cache import negotiate_encoding, MIN_COMPRESS_BYTES
+
+DEFAULT_TTL_SECONDS = 5
+MAX_CACHE_BYTES = 32 * 1024 * 1024
+MAX_ENTRY_BYTES = 2 * 1024 * 1024
+# Expired entries are kept this long so they can be revalidated cheaply
+STALE_KEEP_SECONDS = 300
+
+
+class CachedResponse:
+    """A complete upstream response held in memory"""
+
+    def __init__(self, status: int, reason: str, headers: List[Tuple[str, str]], body: bytes):
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self.body = body
+        self.etag = next((v for k, v in headers if k.lower() == 'etag'), None)
+        self.stored_at = time.monotonic()
+
+    @property
+    def size(self) -> int:
+        return len(self.body) + sum(len(k) + len(v) for k, v in self.headers)
+
+
+class Flight:
+    """One in-progress upstream request that identical requests wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.entry: Optional[CachedResponse] = None
+
+    def wait(self, timeout: float) -> Optional[CachedResponse]:
+        """The shared response, or None if the leader couldn't produce one"""
+        if not self.done.wait(timeout):
+            return None
+        return self.entry
+
+
+class ProxyCache:
+    """TTL + byte-bounded LRU cache keyed by path and negotiated encoding"""
+
+    def __init__(self, ttl_seconds: float = DEFAULT_TTL_SECONDS,
+                 max_bytes: int = MAX_CACHE_BYTES, max_entry_bytes: int = MAX_ENTRY_BYTES):
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self._entries: "OrderedDict[Tuple[str, str], CachedResponse]" = OrderedDict()
+        self._bytes = 0
+        self._flights: Dict[Tuple[str, str], Flight] = {}
+        self._lock = threading.Lock()
+        # Counters for /api/metrics
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.revalidated = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0
+
+    @staticmethod
+    def key_for(path: str, accept_encoding: Optional[str]) -> Tuple[str, str]:
+        """
+        Requests that would get the same upstream response share a key: the
+        API only varies on Accept-Encoding, so key on the coding it would pick
+        """
+        return path, negotiate_encoding(accept_encoding, MIN_COMPRESS_BYTES)
+
+    def get_fresh(self, key) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry.stored_at >= self.ttl_seconds:
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def get_stale(self, key) -> Optional[CachedResponse]:
+        """Entry past its TTL that can still be revalidated"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry.stored_at >= self.ttl_seconds + STALE_KEEP_SECONDS:
+                return None
+            return entry
+
+    def join(self, key) -> Tuple[Flight, bool]:
+        """
+        Join the upstream request for key, starting one if none is running
+
+        Returns:
+            (flight, True if the caller is the leader and must call complete())
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                self.coalesced += 1
+                return flight, False
+            flight = self._flights[key] = Flight()
+            self.misses += 1
+            return flight, True
+
+    def complete(self, key, flight: Flight, entry: Optional[CachedResponse]):
+        """
+        Finish a flight. A None entry (error or uncacheable response) sends
+        the waiting requests to the API server themselves.
+        """
+        with self._lock:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+        flight.entry = entry
+        flight.done.set()
+
+    def store(self, key, entry: CachedResponse) -> CachedResponse:
+        if entry.size > self.max_entry_bytes:
+            return entry
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old.size
+            self._entries[key] = entry
+            self._bytes += entry.size
+            while self._bytes > self.max_bytes and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.size
+        return entry
+
+    def refresh(self, key, entry: CachedResponse) -> CachedResponse:
+        """Upstream confirmed an entry is unchanged (304): start a new TTL"""
+        with self._lock:
+            entry.stored_at = time.monotonic()
+            if key in self._entries:
+                self._entries.move_to_end(key)
+            self.revalidated += 1
+        return entry
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
@@ -4,20 +4,54 @@ Proxy server that serves the dashboard and proxies API calls
 """
 
 import os
+import sys
 import json
+import argparse
 import http.server
-import socketserver
-import urllib.request
 import urllib.parse
 from http.server import SimpleHTTPRequestHandler
 
-class ProxyHandler(SimpleHTTPRequestHandler):
-    def __init__(self, *args, **kwargs):
-        self.api_base = 'http://localhost:5003'
-        super().__init__(*args, **kwargs)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from shared.utils.metrics import MetricsHandlerMixin, registry as metrics, time_upstream
+
+from pooled_server import ThreadPoolHTTPServer, serve_until_shutdown, DEFAULT_WORKERS, KEEPALIVE_TIMEOUT_SECONDS
+from upstream_pool import get_upstream_pool, REQUEST_TIMEOUT_SECONDS
+from proxy_cache import ProxyCache, CachedResponse, DEFAULT_TTL_SECONDS
+from response_cache import etag_matches
+
+API_BASE = 'http://localhost:5003'
+# Bodies are relayed to the browser in pieces of this size as they arrive
+STREAM_CHUNK_BYTES = 64 * 1024
+
+# Connection-level headers that must not be forwarded in either direction
+HOP_BY_HOP_HEADERS = {
+    'connection', 'keep-alive', 'proxy-authenticate', 'proxy-authorization',
+    'te', 'trailer', 'transfer-encoding', 'upgrade', 'proxy-connection',
+}
+# Headers the proxy sets itself on every response
+PROXY_RESPONSE_HEADERS = {
+    'server', 'date', 'access-control-allow-origin',
+    'access-control-allow-methods', 'access-control-allow-headers',
+}
+# Client validators are answered from the cache, not sent with shared requests
+CONDITIONAL_HEADERS = {'if-none-match', 'if-modified-since'}
+
+# Shared by every handler thread
+proxy_cache = ProxyCache()
+
+class ProxyHandler(MetricsHandlerMixin, SimpleHTTPRequestHandler):
+    api_base = API_BASE
+    # Keep-alive to the browser; every response carries a Content-Length or is chunked
+    protocol_version = 'HTTP/1.1'
+    timeout = KEEPALIVE_TIMEOUT_SECONDS
+    disable_nagle_algorithm = True
+    # Metrics for the proxy itself; the API server's are at :5003/api/metrics
+    metrics_route_prefixes = ('/api/participant/',)
 
     def do_GET(self):
-        if self.path.startswith('/api/'):
+        if urllib.parse.urlsplit(self.path).path == '/api/metrics':
+            self.send_metrics_response()
+        elif self.path.startswith('/api/'):
             self.proxy_api_request()
         else:
             super().do_GET()
@@ -26,43 +60,229 @@ class ProxyHandler(SimpleHTTPRequestHandler):
         if self.path.startswith('/api/'):
             self.proxy_api_request()
         else:
-            super().do_POST()
+            self.send_error(404, "Not Found")
 
     def proxy_api_request(self):
-        """Proxy API requests to the API server"""
+        """Proxy API requests to the API server over a pooled keep-alive connection"""
+        pool = get_upstream_pool(self.api_base)
+        if self.is_cacheable_request():
+            self.proxy_cached_get(pool)
+            return
+
+        body = None
+        if self.command != 'GET':
+            content_length = int(self.headers.get('Content-Length', 0))
+            body = self.rfile.read(content_length)
+
+        # Copy end-to-end headers (Accept-Encoding, If-None-Match, ...) as-is
+        headers = self.upstream_headers()
+        if body is not None:
+            headers['Content-Length'] = str(len(body))
+            headers.setdefault('Content-Type', 'application/json')
+
         try:
-            # Forward the request to the API server
-            api_url = f"{self.api_base}{self.path}"
-            
-            if self.command == 'GET':
-                req = urllib.request.Request(api_url)
-            else:
-                # Handle POST requests
-                content_length = int(self.headers.get('Content-Length', 0))
-                post_data = self.rfile.read(content_length)
-                req = urllib.request.Request(api_url, data=post_data, method=self.command)
-                req.add_header('Content-Type', self.headers.get('Content-Type', 'application/json'))
-            
-            # Copy headers
-            for header, value in self.headers.items():
-                if header.lower() not in ['host', 'content-length']:
-                    req.add_header(header, value)
-            
-            # Make the request
-            with urllib.request.urlopen(req) as response:
-                # Copy response headers
-                for header, value in response.headers.items():
-                    if header.lower() not in ['content-encoding', 'transfer-encoding']:
-                        self.send_header(header, value)
-                
-                # Send response
-                self.send_response(response.status)
-                self.end_headers()
-                self.wfile.write(response.read())
-                
+            with time_upstream('api', self.command):
+                conn, response = pool.request(self.command, self.path, body=body, headers=headers)
+        except Exception as e:
+            print(f"Proxy error: {e}")
+            self.send_error(502, f"Proxy error: {str(e)}")
+            return
+
+        try:
+            self.relay_response(response)
+        except Exception as e:
+            # Headers are already out, so the only safe signal is closing the connection
+            print(f"Proxy error while streaming: {e}")
+            self.close_connection = True
+            pool.discard(conn)
+            return
+        pool.release(conn, response)
+
+    def upstream_headers(self, exclude=()):
+        """End-to-end request headers to forward to the API server"""
+        headers = {}
+        for header, value in self.headers.items():
+            name = header.lower()
+            if name in HOP_BY_HOP_HEADERS or name in ('host', 'content-length') or name in exclude:
+                continue
+            headers[header] = value
+        return headers
+
+    def is_cacheable_request(self):
+        """Plain GETs may be served from, and share, cached responses"""
+        if self.command != 'GET' or not proxy_cache.enabled:
+            return False
+        if self.headers.get('Authorization') or self.headers.get('Cookie'):
+            return False
+        return 'no-store' not in (self.headers.get('Cache-Control') or '')
+
+    def proxy_cached_get(self, pool):
+        """
+        Serve a GET from the cache, or fetch it once for every identical
+        request in flight and cache the result
+        """
+        key = proxy_cache.key_for(self.path, self.headers.get('Accept-Encoding'))
+        # A browser reload (no-cache) skips fresh entries but still coalesces
+        if 'no-cache' not in (self.headers.get('Cache-Control') or ''):
+            entry = proxy_cache.get_fresh(key)
+            if entry is not None:
+                self.send_cached_response(entry, 'HIT')
+                return
+
+        flight, leader = proxy_cache.join(key)
+        if not leader:
+            entry = flight.wait(REQUEST_TIMEOUT_SECONDS)
+            if entry is not None:
+                self.send_cached_response(entry, 'COALESCED')
+                return
+            # The shared request failed or wasn't cacheable: go upstream alone
+            self.proxy_uncached_get(pool)
+            return
+
+        entry = None
+        try:
+            headers = self.upstream_headers(exclude=CONDITIONAL_HEADERS)
+            # One canonical value per key, so the shared response fits everyone
+            headers.pop('Accept-Encoding', None)
+            headers.pop('accept-encoding', None)
+            headers['Accept-Encoding'] = key[1]
+            stale = proxy_cache.get_stale(key)
+            if stale is not None and stale.etag:
+                headers['If-None-Match'] = stale.etag
+
+            try:
+                with time_upstream('api', 'GET'):
+                    conn, response = pool.request('GET', self.path, headers=headers)
+            except Exception as e:
+                print(f"Proxy error: {e}")
+                self.send_error(502, f"Proxy error: {str(e)}")
+                return
+
+            if response.status == 304 and stale is not None:
+                response.read()
+                pool.release(conn, response)
+                entry = proxy_cache.refresh(key, stale)
+                # Release waiting requests before writing to this client
+                proxy_cache.complete(key, flight, entry)
+                self.send_cached_response(entry, 'REVALIDATED')
+                return
+
+            if not self.is_cacheable_response(response):
+                # Waiting requests fall back to their own upstream call
+                proxy_cache.complete(key, flight, None)
+                try:
+                    self.relay_response(response)
+                except Exception as e:
+                    print(f"Proxy error while streaming: {e}")
+                    self.close_connection = True
+                    pool.discard(conn)
+                    return
+                pool.release(conn, response)
+                return
+
+            try:
+                body = response.read()
+            except Exception as e:
+                pool.discard(conn)
+                print(f"Proxy error: {e}")
+                self.send_error(502, f"Proxy error: {str(e)}")
+                return
+            pool.release(conn, response)
+            entry = proxy_cache.store(key, CachedResponse(
+                response.status, response.reason, self.forwardable_headers(response), body
+            ))
+            # Release waiting requests before writing to this client, so a
+            # slow or vanished client doesn't hold them up
+            proxy_cache.complete(key, flight, entry)
+            self.send_cached_response(entry, 'MISS')
+        finally:
+            if not flight.done.is_set():
+                proxy_cache.complete(key, flight, entry)
+
+    def proxy_uncached_get(self, pool):
+        """Plain pass-through GET (used when a shared request couldn't be reused)"""
+        try:
+            with time_upstream('api', 'GET'):
+                conn, response = pool.request('GET', self.path, headers=self.upstream_headers())
         except Exception as e:
             print(f"Proxy error: {e}")
-            self.send_error(500, f"Proxy error: {str(e)}")
+            self.send_error(502, f"Proxy error: {str(e)}")
+            return
+        try:
+            self.relay_response(response)
+        except Exception as e:
+            print(f"Proxy error while streaming: {e}")
+            self.close_connection = True
+            pool.discard(conn)
+            return
+        pool.release(conn, response)
+
+    def is_cacheable_response(self, response):
+        """Only complete, public 200s of a known, bounded size are shared"""
+        if response.status != 200 or response.getheader('Set-Cookie'):
+            return False
+        cache_control = (response.getheader('Cache-Control') or '').lower()
+        if 'no-store' in cache_control or 'private' in cache_control:
+            return False
+        vary = {v.strip().lower() for v in (response.getheader('Vary') or '').split(',') if v.strip()}
+        if not vary <= {'accept-encoding'}:
+            return False
+        length = response.getheader('Content-Length')
+        return length is not None and int(length) <= proxy_cache.max_entry_bytes
+
+    def forwardable_headers(self, response):
+        return [(header, value) for header, value in response.getheaders()
+                if header.lower() not in HOP_BY_HOP_HEADERS and header.lower() not in PROXY_RESPONSE_HEADERS]
+
+    def send_cached_response(self, entry, cache_status):
+        """Send a cached response, answering the client's If-None-Match from it"""
+        if entry.etag and etag_matches(self.headers.get('If-None-Match'), entry.etag):
+            self.send_response(304)
+            for header, value in entry.headers:
+                if header.lower() in ('etag', 'cache-control', 'vary', 'access-control-expose-headers'):
+                    self.send_header(header, value)
+            self.send_header('X-Proxy-Cache', cache_status)
+            self.end_headers()
+            return
+
+        self.send_response(entry.status, entry.reason)
+        for header, value in entry.headers:
+            self.send_header(header, value)
+        self.send_header('X-Proxy-Cache', cache_status)
+        self.end_headers()
+        self.wfile.write(entry.body)
+
+    def relay_response(self, response):
+        """Send the upstream status and headers, then stream the body through"""
+        self.send_response(response.status, response.reason)
+        for header, value in self.forwardable_headers(response):
+            self.send_header(header, value)
+
+        no_body = self.command == 'HEAD' or response.status in (204, 304) or response.status < 200
+        length = response.getheader('Content-Length')
+        chunked = False
+        if not no_body and length is None:
+            if self.request_version == 'HTTP/1.1':
+                # Unknown length: relay with chunked encoding as it arrives
+                self.send_header('Transfer-Encoding', 'chunked')
+                chunked = True
+            else:
+                self.close_connection = True
+        self.end_headers()
+
+        if no_body:
+            response.read()
+            return
+        while True:
+            chunk = response.read1(STREAM_CHUNK_BYTES) if chunked else response.read(STREAM_CHUNK_BYTES)
+            if not chunk:
+                break
+            if chunked:
+                self.wfile.write(b'%x\r\n%s\r\n' % (len(chunk), chunk))
+            else:
+                self.wfile.write(chunk)
+        if chunked:
+            self.wfile.write(b'0\r\n\r\n')
 
     def end_headers(self):
         # Add CORS headers
@@ -74,18 +294,39 @@ class ProxyHandler(SimpleHTTPRequestHandler):
     def do_OPTIONS(self):
         """Handle CORS preflight requests"""
         self.send_response(200)
+        self.send_header('Content-Length', '0')
         self.end_headers()
 
-def run_proxy_server(port=3001):
+def run_proxy_server(port=3001, api_base=API_BASE, workers=DEFAULT_WORKERS, cache_ttl=DEFAULT_TTL_SECONDS):
     """Run the proxy server"""
     print(f"🚀 Starting proxy server on port {port}")
-    print("📊 Serving dashboard with API proxy to localhost:5003")
-    
-    with socketserver.TCPServer(("", port), ProxyHandler) as httpd:
+    metrics.server = 'proxy'
+    print(f"📊 Serving dashboard with API proxy to {api_base}")
+
+    ProxyHandler.api_base = api_base
+    pool = get_upstream_pool(api_base)
+    metrics.register_cache('upstream_connections', lambda: (pool.reused, pool.created))
+    proxy_cache.ttl_seconds = cache_ttl
+    metrics.register_cache('proxy_responses', lambda: (proxy_cache.hits + proxy_cache.revalidated, proxy_cache.misses))
+    metrics.register_cache('proxy_coalescing', lambda: (proxy_cache.coalesced, proxy_cache.misses))
+    if cache_ttl > 0:
+        print(f"🗄️  Caching API GET responses for {cache_ttl}s (identical requests in flight are coalesced)")
+
+    with ThreadPoolHTTPServer(("", port), ProxyHandler, workers=workers) as httpd:
         print(f"✅ Dashboard running at http://localhost:{port}")
-        print("🔗 API calls will be proxied to http://localhost:5003")
+        print(f"🔗 API calls will be proxied to {api_base}")
         print("🌐 Access your dashboard now!")
-        httpd.serve_forever()
+        serve_until_shutdown(httpd)
+
+    pool.close()
 
 if __name__ == "__main__":
-    run_proxy_server()
+    parser = argparse.ArgumentParser(description='Dashboard proxy server')
+    parser.add_argument('--port', type=int, default=3001, help='Port to listen on')
+    parser.add_argument('--api-base', default=API_BASE, help='API server to proxy /api/ calls to')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help='Number of request worker threads')
+    parser.add_argument('--cache-ttl', type=float, default=DEFAULT_TTL_SECONDS,
+                        help='Seconds to serve cached API GETs before revalidating (0 disables the cache)')
+    args = parser.parse_args()
+
+    run_proxy_server(port=args.port, api_base=args.api_base, workers=args.workers, cache_ttl=args.cache_ttl)
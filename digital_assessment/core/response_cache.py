@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Encoded JSON response cache for the dashboard API
+Bodies are serialised once per snapshot version, compressed lazily per
+content-coding and served with strong ETags so unchanged polls get a 304
+"""
+
+import gzip
+import hashlib
+import json
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Dict, Optional
+
+# Bodies smaller than this aren't worth compressing
+MIN_COMPRESS_BYTES = 1024
+SUPPORTED_ENCODINGS = ['gzip', 'deflate']
+MAX_CACHED_RESPONSES = 256
+
+
+def negotiate_encoding(accept_encoding: Optional[str], body_size: int) -> str:
+    """Pick gzip, deflate or identity from an Accept-Encoding header"""
+    if not accept_encoding or body_size < MIN_COMPRESS_BYTES:
+        return 'identity'
+
+    accepted = {}
+    for part in accept_encoding.split(','):
+        coding, _, params = part.strip().partition(';')
+        coding = coding.strip().lower()
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding] = q
+
+    for coding in SUPPORTED_ENCODINGS:
+        q = accepted.get(coding, accepted.get('*', 0.0))
+        if q > 0:
+            return coding
+    return 'identity'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """True if an If-None-Match header covers this ETag (any encoding of it)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    base = etag[:-1]
+    for tag in if_none_match.split(','):
+        tag = tag.strip()
+        if tag.startswith('W/'):
+            tag = tag[2:]
+        if tag == etag or tag.startswith(base + '-'):
+            return True
+    return False
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    """Compress a body for a content-coding (deterministic output)"""
+    if encoding == 'gzip':
+        return gzip.compress(body, compresslevel=6, mtime=0)
+    if encoding == 'deflate':
+        return zlib.compress(body, 6)
+    return body
+
+
+class EncodedResponse:
+    """A JSON body serialised once, with its compressed variants memoised"""
+
+    def __init__(self, data, etag: Optional[str] = None, headers: Optional[Dict[str, str]] = None):
+        self.body = json.dumps(data).encode('utf-8')
+        # Without a version to derive it from, the ETag is a content hash
+        self.etag = etag or f'"{hashlib.sha1(self.body).hexdigest()[:20]}"'
+        self.headers = headers or {}
+        self._encoded = {'identity': self.body}
+
+    def encoded(self, encoding: str) -> bytes:
+        body = self._encoded.get(encoding)
+        if body is None:
+            # Two threads may compress the same body once each; both results are identical
+            body = compress(self.body, encoding)
+            self._encoded[encoding] = body
+        return body
+
+    def etag_for(self, encoding: str) -> str:
+        """Strong ETags must differ between content-codings of the same body"""
+        if encoding == 'identity':
+            return self.etag
+        return f'{self.etag[:-1]}-{encoding}"'
+
+
+class ResponseCache:
+    """Encoded responses for the current snapshot version, LRU-bounded"""
+
+    def __init__(self, max_entries: int = MAX_CACHED_RESPONSES):
+        self.max_entries = max_entries
+        self._version = None
+        self._entries: "OrderedDict[str, EncodedResponse]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_etag(version: str, key: str) -> str:
+        key_hash = hashlib.sha1(key.encode('utf-8')).hexdigest()[:8]
+        return f'"{version}-{key_hash}"'
+
+    def get(self, version: str, key: str) -> Optional[EncodedResponse]:
+        with self._lock:
+            if version != self._version:
+                self.misses += 1
+                return None
+            response = self._entries.get(key)
+            if response is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return response
+
+    def put(self, version: str, key: str, response: EncodedResponse) -> EncodedResponse:
+        with self._lock:
+            if version != self._version:
+                # New snapshot: everything cached so far is out of date
+                self._entries.clear()
+                self._version = version
+            self._entries[key] = response
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return response
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Shared Google Sheets snapshot for the dashboard API servers
+Loads the assessment ranges once per process, serves them from memory and
+refreshes them in a background thread (stale-while-revalidate). Can also serve
+from an offline snapshot file (see snapshot_store.py) instead of live Sheets
+"""
+
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from google.oauth2 import service_account
+from googleapiclient.discovery import build
+
+from snapshot_store import read_snapshot, file_signature
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from shared.utils.metrics import time_upstream
+
+SCOPES = ['https://www.googleapis.com/auth/spreadsheets']
+DEFAULT_TTL_SECONDS = 300
+# After a failed connect, requests don't retry (or log) again for this long
+CONNECT_RETRY_SECONDS = 60
+
+
+class Snapshot:
+    """Read-only copy of the sheet ranges taken at one point in time"""
+
+    def __init__(self, ranges: Dict[str, List[List[str]]], loaded_at: datetime):
+        self.ranges = ranges
+        self.loaded_at = loaded_at
+        self.checked_monotonic = time.monotonic()
+        # Content hash - identical sheet data always gives the same version
+        digest = hashlib.sha1(json.dumps(ranges, sort_keys=True).encode('utf-8'))
+        self.version = digest.hexdigest()[:16]
+
+    def rows(self, range_name: str) -> List[List[str]]:
+        """Rows for a range exactly as requested (header row included)"""
+        return self.ranges.get(range_name, [])
+
+    def age(self) -> float:
+        """Seconds since this snapshot was last confirmed against the sheet"""
+        return time.monotonic() - self.checked_monotonic
+
+    def mark_checked(self):
+        """Record that a refresh found the sheet unchanged"""
+        self.checked_monotonic = time.monotonic()
+
+
+class SheetsSnapshotCache:
+    """Process-wide snapshot of a fixed set of sheet ranges"""
+
+    def __init__(self, sheet_id: str, credentials_path: str, ranges: List[str],
+                 ttl_seconds: float = DEFAULT_TTL_SECONDS, service=None,
+                 snapshot_path: Optional[str] = None):
+        """
+        Args:
+            sheet_id: Spreadsheet to read from
+            credentials_path: Service account JSON, only used when service is None
+            ranges: A1 ranges loaded into every snapshot
+            ttl_seconds: Age after which a snapshot is refreshed in the background
+                (in file mode, how often the file is checked for a new export)
+            service: Pre-built Sheets service (skips credential loading)
+            snapshot_path: Serve from this snapshot file instead of Google Sheets
+        """
+        self.sheet_id = sheet_id
+        self.credentials_path = credentials_path
+        self.ranges = list(ranges)
+        self.ttl_seconds = ttl_seconds
+        self.service = service
+        self.snapshot_path = snapshot_path
+        self._file_signature = None
+
+        # googleapiclient services are not thread-safe, so every call made
+        # through the shared service goes through this lock
+        self.service_lock = threading.Lock()
+        self._connect_lock = threading.Lock()
+        self._connect_failed_at: Optional[float] = None
+        self._snapshot: Optional[Snapshot] = None
+        self._load_lock = threading.Lock()
+        self._refreshing = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def connect(self):
+        """Build the Sheets service once for the whole process"""
+        if self.service is not None:
+            return self.service
+        with self._connect_lock:
+            if self.service is not None:
+                return self.service
+            if (self._connect_failed_at is not None and
+                    time.monotonic() - self._connect_failed_at < CONNECT_RETRY_SECONDS):
+                return None
+            try:
+                credentials = service_account.Credentials.from_service_account_file(
+                    self.credentials_path, scopes=SCOPES
+                )
+                self.service = build('sheets', 'v4', credentials=credentials)
+                self._connect_failed_at = None
+                print("✅ Connected to Google Sheets for API data")
+            except Exception as e:
+                print(f"❌ Error connecting to Google Sheets (retrying in {CONNECT_RETRY_SECONDS}s): {e}")
+                self._connect_failed_at = time.monotonic()
+                self.service = None
+            return self.service
+
+    def get(self) -> Optional[Snapshot]:
+        """
+        Current snapshot, loading it synchronously only on first use.
+        A stale snapshot is still returned while a refresh runs in the background.
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._load_lock:
+                if self._snapshot is None:
+                    self.refresh()
+                return self._snapshot
+
+        if snapshot.age() > self.ttl_seconds:
+            self.refresh_async()
+        return snapshot
+
+    def refresh(self) -> bool:
+        """Fetch all ranges in one batchGet and swap in the new snapshot"""
+        if self.snapshot_path:
+            return self.refresh_from_file()
+        if not self.connect():
+            return False
+        try:
+            with self.service_lock, time_upstream('sheets', 'batchGet'):
+                result = self.service.spreadsheets().values().batchGet(
+                    spreadsheetId=self.sheet_id,
+                    ranges=self.ranges
+                ).execute()
+
+            # The API echoes normalised range names, so match by position
+            value_ranges = result.get('valueRanges', [])
+            ranges = {}
+            for i, range_name in enumerate(self.ranges):
+                values = value_ranges[i].get('values', []) if i < len(value_ranges) else []
+                ranges[range_name] = values
+
+            self._swap(Snapshot(ranges, datetime.now()))
+            return True
+        except Exception as e:
+            # Keep serving the previous snapshot
+            print(f"⚠️  Snapshot refresh failed: {e}")
+            return False
+
+    def refresh_from_file(self) -> bool:
+        """Reload the snapshot file if a new export has been moved into place"""
+        signature = file_signature(self.snapshot_path)
+        if signature is None:
+            print(f"⚠️  Snapshot file not found: {self.snapshot_path}")
+            return False
+        if signature == self._file_signature and self._snapshot is not None:
+            self._snapshot.mark_checked()
+            return True
+        try:
+            meta, stored = read_snapshot(self.snapshot_path)
+            missing = [r for r in self.ranges if r not in stored]
+            if missing:
+                print(f"⚠️  Snapshot file has no data for: {', '.join(missing)}")
+            ranges = {r: stored.get(r, []) for r in self.ranges}
+            self._swap(Snapshot(ranges, datetime.fromisoformat(meta['exported_at'])))
+            self._file_signature = signature
+            print(f"📦 Loaded snapshot {meta['version']} from {self.snapshot_path}")
+            return True
+        except Exception as e:
+            print(f"⚠️  Snapshot file load failed: {e}")
+            return False
+
+    def _swap(self, snapshot: Snapshot):
+        """Make a freshly loaded snapshot current (a single reference swap)"""
+        current = self._snapshot
+        if current is not None and current.version == snapshot.version:
+            # Unchanged data keeps the same snapshot, so everything derived
+            # from it (views, encoded responses, ETags) stays valid
+            current.mark_checked()
+        else:
+            self._snapshot = snapshot
+
+    def refresh_async(self):
+        """Start a background refresh unless one is already running"""
+        if self._refreshing.is_set():
+            return
+        self._refreshing.set()
+
+        def _run():
+            try:
+                self.refresh()
+            finally:
+                self._refreshing.clear()
+
+        threading.Thread(target=_run, name='sheets-snapshot-refresh', daemon=True).start()
+
+    def start(self):
+        """Load the first snapshot and keep it fresh on a timer"""
+        self.get()
+        if self._thread and self._thread.is_alive():
+            return
+
+        def _loop():
+            while not self._stop.wait(self.ttl_seconds):
+                self.refresh_async()
+
+        self._thread = threading.Thread(target=_loop, name='sheets-snapshot-timer', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the background refresh timer"""
+        self._stop.set()
+
+
+_caches: Dict[Tuple[str, Tuple[str, ...]], SheetsSnapshotCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_snapshot_cache(sheet_id: str, credentials_path: str, ranges: List[str],
+                       ttl_seconds: float = DEFAULT_TTL_SECONDS) -> SheetsSnapshotCache:
+    """
+    Return the process-wide cache for a spreadsheet and set of ranges,
+    creating it on first use
+
+    Raises:
+        ValueError: If the cache already exists with a different ttl_seconds
+    """
+    key = (sheet_id, tuple(ranges))
+    with _caches_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            cache = SheetsSnapshotCache(sheet_id, credentials_path, ranges, ttl_seconds)
+            _caches[key] = cache
+        elif cache.ttl_seconds != ttl_seconds:
+            raise ValueError(f"Snapshot cache for {sheet_id} already uses ttl_seconds={cache.ttl_seconds}, "
+                             f"not {ttl_seconds}")
+        return cache
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Offline snapshot files for the dashboard API
+Exports the assessment tabs from Google Sheets into a small versioned SQLite
+file that full_api_server.py can serve from (--snapshot) without credentials
+
+Usage:
+    python snapshot_store.py export data/api_snapshot.sqlite
+    python snapshot_store.py info data/api_snapshot.sqlite
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import zlib
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+SNAPSHOT_FORMAT_VERSION = 1
+
+# The first range is the one full_api_server.py serves; the full tabs are kept
+# alongside it so other tools can work from the same export
+DEFAULT_EXPORT_RANGES = [
+    'CI Assessment!A1:Z100',
+    'CI Assessment!A1:AO1000',
+    'TO Assessment!A1:AO1000',
+    'Checklist Detail!A1:BS1000',
+]
+
+
+def write_snapshot(path: str, ranges: Dict[str, List[List[str]]], version: str,
+                   sheet_id: str = '', exported_at: Optional[datetime] = None):
+    """
+    Write ranges to a snapshot file atomically.
+
+    The file is built next to the target and moved into place with os.replace,
+    so a server polling the path only ever sees a complete snapshot.
+    """
+    exported_at = exported_at or datetime.now()
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    conn = sqlite3.connect(tmp_path)
+    try:
+        conn.execute('CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)')
+        conn.execute('CREATE TABLE ranges (position INTEGER PRIMARY KEY, name TEXT UNIQUE NOT NULL, '
+                     'row_count INTEGER NOT NULL, rows BLOB NOT NULL)')
+        meta = {
+            'format_version': str(SNAPSHOT_FORMAT_VERSION),
+            'version': version,
+            'sheet_id': sheet_id,
+            'exported_at': exported_at.isoformat(),
+        }
+        conn.executemany('INSERT INTO meta VALUES (?, ?)', meta.items())
+        for position, (name, rows) in enumerate(ranges.items()):
+            # Rows are stored as compressed JSON - they're always read whole
+            blob = zlib.compress(json.dumps(rows, ensure_ascii=False).encode('utf-8'), 9)
+            conn.execute('INSERT INTO ranges VALUES (?, ?, ?, ?)', (position, name, len(rows), blob))
+        conn.commit()
+    finally:
+        conn.close()
+
+    os.replace(tmp_path, path)
+
+
+def read_snapshot(path: str) -> Tuple[Dict[str, str], Dict[str, List[List[str]]]]:
+    """
+    Read a snapshot file
+
+    Returns:
+        (meta dict, ranges dict in export order)
+    """
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        meta = dict(conn.execute('SELECT key, value FROM meta'))
+        if int(meta.get('format_version', 0)) != SNAPSHOT_FORMAT_VERSION:
+            raise ValueError(f"Unsupported snapshot format {meta.get('format_version')} in {path}")
+        ranges = {}
+        for name, blob in conn.execute('SELECT name, rows FROM ranges ORDER BY position'):
+            ranges[name] = json.loads(zlib.decompress(blob).decode('utf-8'))
+        return meta, ranges
+    finally:
+        conn.close()
+
+
+def file_signature(path: str) -> Optional[Tuple[int, int, int]]:
+    """(inode, size, mtime) - changes whenever a new snapshot is moved into place"""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_ino, st.st_size, st.st_mtime_ns
+
+
+def export_from_sheets(path: str, sheet_id: str, credentials_path: str, ranges: List[str]) -> bool:
+    """Fetch ranges from Google Sheets and write them to a snapshot file"""
+    from sheets_snapshot import SheetsSnapshotCache
+
+    cache = SheetsSnapshotCache(sheet_id, credentials_path, ranges)
+    if not cache.refresh():
+        return False
+    snapshot = cache.get()
+    write_snapshot(path, snapshot.ranges, snapshot.version, sheet_id, snapshot.loaded_at)
+    return True
+
+
+def main():
+    from full_api_server import SHEET_ID, CREDENTIALS_PATH
+
+    parser = argparse.ArgumentParser(description='Export or inspect offline API snapshots')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    export = sub.add_parser('export', help='Refresh a snapshot file from Google Sheets')
+    export.add_argument('path', help='Snapshot file to write')
+    export.add_argument('--range', dest='ranges', action='append',
+                        help='A1 range to export (repeatable, defaults to the assessment tabs)')
+    export.add_argument('--credentials', default=CREDENTIALS_PATH, help='Service account JSON')
+
+    info = sub.add_parser('info', help='Show what a snapshot file contains')
+    info.add_argument('path', help='Snapshot file to read')
+
+    args = parser.parse_args()
+
+    if args.command == 'export':
+        ranges = args.ranges or DEFAULT_EXPORT_RANGES
+        print(f"📥 Exporting {len(ranges)} ranges to {args.path}")
+        if export_from_sheets(args.path, SHEET_ID, args.credentials, ranges):
+            meta, _ = read_snapshot(args.path)
+            print(f"✅ Snapshot {meta['version']} written at {meta['exported_at']}")
+        else:
+            print("❌ Export failed - existing snapshot left untouched")
+    else:
+        meta, ranges = read_snapshot(args.path)
+        print(f"📦 Snapshot {meta['version']} (format {meta['format_version']})")
+        print(f"   Exported: {meta['exported_at']}")
+        for name, rows in ranges.items():
+            print(f"   - {name}: {len(rows)} rows")
+
+
+if __name__ == '__main__':
+    main()
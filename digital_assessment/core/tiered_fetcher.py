@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Tiered page fetcher for tour operator pages
+Tries a plain HTTP GET first and only renders the page in headless Chromium
+when the static HTML doesn't carry enough content. Which domains need the
+browser is remembered across runs, so known JS-rendered sites go straight to it.
+"""
+
+import asyncio
+import json
+import os
+import sys
+import threading
+import urllib.parse
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from ito_content_scraper import ITOContentScraper
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from shared.utils.fetch_cache import DEFAULT_CACHE_DIR as FETCH_CACHE_DIR, FetchCache, FetchedPage, get_fetch_cache
+from shared.utils.metrics import time_upstream
+
+# Static HTML is good enough when it has at least this many words...
+MIN_STATIC_WORDS = 250
+# ...and, for tour pages, an itinerary or highlights section
+STRUCTURED_PAGE_TYPES = {'tour_page'}
+STATIC_TIMEOUT_SECONDS = 20
+STATIC_MAX_RETRIES = 2
+
+# A domain goes straight to the browser once the static tier has fallen
+# short this many times more often than it has worked
+BROWSER_DOMAIN_THRESHOLD = 2
+# The browser result replaces the static one only if it adds real content
+BROWSER_GAIN_RATIO = 1.2
+
+# Learned per-domain results live with the fetch cache, not in the source tree
+DOMAIN_STRATEGY_FILE = os.path.join(FETCH_CACHE_DIR, 'domain_strategy.json')
+
+STATIC_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'en-GB,en;q=0.8',
+}
+
+
+def domain_of(url: str) -> str:
+    host = (urllib.parse.urlsplit(url).hostname or '').lower()
+    return host[4:] if host.startswith('www.') else host
+
+
+class TieredFetcher:
+    """
+    Drop-in replacement for ITOContentScraper that uses the browser only
+    when a page needs it. Results carry 'fetch_tier': 'static' or 'browser'.
+    """
+
+    def __init__(self, scraper: Optional[ITOContentScraper] = None,
+                 strategy_file: Optional[str] = DOMAIN_STRATEGY_FILE,
+                 min_words: int = MIN_STATIC_WORDS,
+                 fetch_cache: Optional[FetchCache] = None):
+        """
+        Args:
+            scraper: Browser scraper for the escalation tier (created if omitted)
+            strategy_file: JSON file of per-domain results (None keeps it in memory)
+            min_words: Word count below which static HTML is considered insufficient
+            fetch_cache: On-disk cache for both tiers (defaults to the shared one)
+        """
+        self.fetch_cache = fetch_cache or get_fetch_cache()
+        self.scraper = scraper or ITOContentScraper(fetch_cache=self.fetch_cache)
+        if self.scraper.fetch_cache is None:
+            self.scraper.fetch_cache = self.fetch_cache
+        self.strategy_file = strategy_file
+        self.min_words = min_words
+        self.domains = self._load_strategy()
+        self.session = self._build_session()
+        self._lock = threading.Lock()
+        self.tier_counts = {'static': 0, 'browser': 0, 'escalated': 0}
+
+    @property
+    def blocker(self):
+        return self.scraper.blocker
+
+    def _build_session(self) -> requests.Session:
+        session = requests.Session()
+        retry_strategy = Retry(
+            total=STATIC_MAX_RETRIES,
+            backoff_factor=1,
+            status_forcelist=[429, 500, 502, 503, 504],
+        )
+        adapter = HTTPAdapter(max_retries=retry_strategy, pool_maxsize=16)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.headers.update(STATIC_HEADERS)
+        return session
+
+    def _load_strategy(self) -> Dict[str, Dict]:
+        if not self.strategy_file or not os.path.exists(self.strategy_file):
+            return {}
+        try:
+            with open(self.strategy_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Ignoring unreadable domain strategy file: {e}")
+            return {}
+
+    def save_strategy(self):
+        if not self.strategy_file:
+            return
+        with self._lock:
+            data = json.dumps(self.domains, indent=2, sort_keys=True)
+        os.makedirs(os.path.dirname(os.path.abspath(self.strategy_file)), exist_ok=True)
+        tmp_path = f"{self.strategy_file}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(data)
+        os.replace(tmp_path, self.strategy_file)
+
+    def needs_browser(self, url: str) -> bool:
+        """Whether earlier runs showed this domain only renders content with JS"""
+        stats = self.domains.get(domain_of(url))
+        if not stats:
+            return False
+        return stats.get('browser_needed', 0) - stats.get('static_ok', 0) >= BROWSER_DOMAIN_THRESHOLD
+
+    def _learn(self, url: str, outcome: str):
+        if self.fetch_cache.offline:
+            return  # Replayed pages say nothing new about the live site
+        with self._lock:
+            stats = self.domains.setdefault(domain_of(url), {'static_ok': 0, 'browser_needed': 0})
+            stats[outcome] = stats.get(outcome, 0) + 1
+            stats['updated_at'] = datetime.now().isoformat()
+
+    def is_sufficient(self, result: Dict) -> bool:
+        """Judge whether extracted content is complete enough to skip the browser"""
+        if not result.get('success') or result.get('word_count', 0) < self.min_words:
+            return False
+        if result.get('page_type') in STRUCTURED_PAGE_TYPES:
+            return bool(result.get('itinerary') or result.get('highlights'))
+        return True
+
+    def _fetch_static(self, url: str) -> Optional[FetchedPage]:
+        """Plain GET through the fetch cache; None if the response isn't usable HTML"""
+        with time_upstream('scrape', 'static'):
+            response = self.fetch_cache.get(url, timeout=STATIC_TIMEOUT_SECONDS, session=self.session)
+        if response.status_code != 200:
+            return None
+        content_type = response.headers.get('Content-Type', '')
+        if content_type and 'html' not in content_type:
+            return None
+        return response
+
+    async def scrape_page_async(self, url: str, page_type: str = 'tour_page') -> Dict:
+        """Fetch one page through the cheapest tier that gives usable content"""
+        loop = asyncio.get_running_loop()
+        static_result = None
+
+        if not self.needs_browser(url):
+            try:
+                response = await loop.run_in_executor(None, self._fetch_static, url)
+            except Exception as e:
+                print(f"    ⚠️  Static fetch failed ({str(e)[:80]}), trying browser")
+                response = None
+            if response is not None:
+                print(f"  Fetched (static{', cached' if response.from_cache else ''}): {url[:80]}...")
+                static_result = await loop.run_in_executor(
+                    None, self.scraper.extract_content, url, page_type, response.text
+                )
+                if self.is_sufficient(static_result):
+                    self._learn(url, 'static_ok')
+                    self.tier_counts['static'] += 1
+                    static_result['fetch_tier'] = 'static'
+                    return static_result
+            self.tier_counts['escalated'] += 1
+
+        browser_result = await self.scraper.scrape_page_async(url, page_type)
+        browser_result['fetch_tier'] = 'browser'
+
+        if static_result is not None and static_result.get('success'):
+            if not browser_result.get('success'):
+                # The browser timed out or was blocked, which may be transient:
+                # keep the thin static page and learn nothing about the domain
+                self.tier_counts['static'] += 1
+                static_result['fetch_tier'] = 'static'
+                return static_result
+            gained = browser_result.get('word_count', 0) >= static_result['word_count'] * BROWSER_GAIN_RATIO
+            if not gained:
+                # Rendering didn't add anything - the page is simply short
+                self._learn(url, 'static_ok')
+                self.tier_counts['static'] += 1
+                static_result['fetch_tier'] = 'static'
+                return static_result
+            self._learn(url, 'browser_needed')
+        elif browser_result.get('success') and static_result is None and not self.needs_browser(url):
+            # Static fetch was unusable (blocked, non-HTML, error) but the browser got through
+            self._learn(url, 'browser_needed')
+
+        self.tier_counts['browser'] += 1
+        return browser_result
+
+    async def scrape_many_async(self, urls: List[str], page_type: str = 'tour_page',
+                                concurrency: Optional[int] = None) -> List[Dict]:
+        """
+        Fetch several pages concurrently; browser work is still limited by
+        the scraper's page pool
+
+        Returns:
+            One result dict per URL, in the order given
+        """
+        limit = asyncio.Semaphore(max(1, concurrency or self.scraper.max_pages * 2))
+
+        async def _fetch(url):
+            async with limit:
+                return await self.scrape_page_async(url, page_type)
+
+        return await asyncio.gather(*(_fetch(url) for url in urls))
+
+    def run_coroutine(self, coro):
+        """Run a coroutine on the browser scraper's loop"""
+        return self.scraper.run_coroutine(coro)
+
+    def scrape_page(self, url: str, page_type: str = 'tour_page') -> Dict:
+        """Synchronous wrapper for async scrape_page_async"""
+        return self.scraper.run_coroutine(self.scrape_page_async(url, page_type))
+
+    def scrape_many(self, urls: List[str], page_type: str = 'tour_page',
+                    concurrency: Optional[int] = None) -> List[Dict]:
+        """Synchronous wrapper for async scrape_many_async"""
+        return self.scraper.run_coroutine(self.scrape_many_async(urls, page_type, concurrency))
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
+    async def aclose(self):
+        await self.scraper.aclose()
+        self.session.close()
+        self.save_strategy()
+
+    def close(self):
+        self.scraper.close()
+        self.session.close()
+        self.save_strategy()
+
+    def print_summary(self):
+        self.fetch_cache.print_summary()
+        total = self.tier_counts['static'] + self.tier_counts['browser']
+        print(f"\n🧭 Fetch tiers: {self.tier_counts['static']}/{total} pages served without a browser, "
+              f"{self.tier_counts['browser']} rendered ({self.tier_counts['escalated']} escalated from static)")
+        browser_domains = sorted(d for d in self.domains if self.needs_browser(f"http://{d}/"))
+        if browser_domains:
+            print(f"   Domains needing JS rendering: {', '.join(browser_domains)}")
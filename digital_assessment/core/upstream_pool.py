@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Keep-alive connection pool for proxying to the dashboard API server
+Idle HTTP/1.1 connections are reused across requests and handler threads
+instead of opening a new TCP connection for every proxied call
+"""
+
+import http.client
+import threading
+import time
+import urllib.parse
+from typing import Dict, List, Optional, Tuple
+
+DEFAULT_MAX_IDLE = 16
+# Kept below the API server's keep-alive timeout so we drop idle connections
+# before the server closes them underneath us
+IDLE_TIMEOUT_SECONDS = 4
+REQUEST_TIMEOUT_SECONDS = 30
+
+# Errors that mean a reused connection had already been closed by the server
+STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, ConnectionResetError,
+                           BrokenPipeError, ConnectionAbortedError)
+
+
+class UpstreamConnectionPool:
+    """HTTP/1.1 keep-alive connections to one upstream server"""
+
+    def __init__(self, base_url: str, max_idle: int = DEFAULT_MAX_IDLE,
+                 idle_timeout: float = IDLE_TIMEOUT_SECONDS,
+                 timeout: float = REQUEST_TIMEOUT_SECONDS):
+        """
+        Args:
+            base_url: Upstream origin, e.g. 'http://localhost:5003'
+            max_idle: Idle connections kept for reuse (extras are closed)
+            idle_timeout: Seconds an idle connection may wait before it's discarded
+            timeout: Socket timeout for upstream requests
+        """
+        parsed = urllib.parse.urlsplit(base_url)
+        self.host = parsed.hostname or 'localhost'
+        self.port = parsed.port or 80
+        self.prefix = parsed.path.rstrip('/')
+        self.max_idle = max_idle
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+
+        self._idle: List[Tuple[http.client.HTTPConnection, float]] = []
+        self._lock = threading.Lock()
+        # Connection reuse counters, reported through /api/metrics
+        self.reused = 0
+        self.created = 0
+
+    def _acquire(self) -> Tuple[http.client.HTTPConnection, bool]:
+        """Most recently used idle connection, or a new one"""
+        now = time.monotonic()
+        with self._lock:
+            while self._idle:
+                conn, released_at = self._idle.pop()
+                if now - released_at < self.idle_timeout:
+                    self.reused += 1
+                    return conn, True
+                conn.close()
+            self.created += 1
+        return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout), False
+
+    def request(self, method: str, path: str, body: Optional[bytes] = None,
+                headers: Optional[Dict[str, str]] = None):
+        """
+        Send a request and return once the response headers are in
+
+        Returns:
+            (connection, response) - read the body, then call release(connection, response)
+            or discard(connection) if the body wasn't read to the end
+        """
+        while True:
+            conn, reused = self._acquire()
+            try:
+                conn.request(method, self.prefix + path, body=body, headers=headers or {})
+                return conn, conn.getresponse()
+            except STALE_CONNECTION_ERRORS:
+                conn.close()
+                # A fresh connection failing is a real error; a reused one was
+                # closed while idle and the request never reached the server
+                if not reused:
+                    raise
+            except Exception:
+                conn.close()
+                raise
+
+    def release(self, conn: http.client.HTTPConnection, response: http.client.HTTPResponse):
+        """Return a connection whose response has been read to the end"""
+        if conn.sock is None or response.will_close or not response.isclosed():
+            self.discard(conn)
+            return
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append((conn, time.monotonic()))
+                return
+        conn.close()
+
+    def discard(self, conn: http.client.HTTPConnection):
+        conn.close()
+
+    def close(self):
+        """Close every idle connection"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn, _ in idle:
+            conn.close()
+
+
+_pools: Dict[str, UpstreamConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_upstream_pool(base_url: str) -> UpstreamConnectionPool:
+    """Return the process-wide pool for an upstream, creating it on first use"""
+    with _pools_lock:
+        pool = _pools.get(base_url)
+        if pool is None:
+            pool = UpstreamConnectionPool(base_url)
+            _pools[base_url] = pool
+        return pool
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+In-memory dashboard user directory with write-behind login tracking
+Usernames are looked up in a dict loaded from the dashboard_auth tab and
+refreshed in the background; login counts and timestamps are buffered and
+written back as one batchUpdate every few seconds
+"""
+
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from shared.utils.metrics import time_upstream
+
+AUTH_TAB = 'dashboard_auth'
+AUTH_RANGE = f'{AUTH_TAB}!A1:Z100'
+DIRECTORY_TTL_SECONDS = 60
+FLUSH_INTERVAL_SECONDS = 10
+# An unknown username triggers a reload (for newly added users) at most this often
+MISS_REFRESH_SECONDS = 10
+
+
+def _login_count(row) -> int:
+    try:
+        return int(row[4]) if len(row) > 4 and row[4].strip() else 0
+    except ValueError:
+        return 0
+
+
+class UserDirectory:
+    """Usernames from the auth tab, plus logins not yet written back"""
+
+    def __init__(self, sheet_id: str, connect: Callable, service_lock: Optional[threading.Lock] = None,
+                 ttl_seconds: float = DIRECTORY_TTL_SECONDS,
+                 flush_interval: float = FLUSH_INTERVAL_SECONDS):
+        """
+        Args:
+            sheet_id: Spreadsheet holding the auth tab
+            connect: Returns the (shared) Sheets service, or None if unavailable
+            service_lock: Lock guarding calls on that service, if it is shared
+            ttl_seconds: Age after which the directory is reloaded in the background
+            flush_interval: Seconds between write-behind flushes of login updates
+        """
+        self.sheet_id = sheet_id
+        self.connect = connect
+        self.service_lock = service_lock or threading.Lock()
+        self.ttl_seconds = ttl_seconds
+        self.flush_interval = flush_interval
+
+        # username -> {'row': sheet row, 'name', 'role', 'count': login count in the sheet}
+        self._users: Dict[str, Dict] = {}
+        self._loaded_at: Optional[float] = None
+        # username -> [logins since the last flush, last login timestamp]
+        self._pending: Dict[str, list] = {}
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._refreshing = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._last_miss_refresh = 0.0
+        # Counters for /api/metrics
+        self.hits = 0
+        self.misses = 0
+
+    def _read_rows(self):
+        service = self.connect()
+        if not service:
+            return None
+        with self.service_lock, time_upstream('sheets', 'values.get'):
+            result = service.spreadsheets().values().get(
+                spreadsheetId=self.sheet_id,
+                range=AUTH_RANGE
+            ).execute()
+        return result.get('values', [])
+
+    def refresh(self) -> bool:
+        """Reload every user from the auth tab"""
+        try:
+            rows = self._read_rows()
+        except Exception as e:
+            print(f"⚠️  User directory refresh failed: {e}")
+            return False
+        if rows is None:
+            return False
+
+        users = {}
+        for i, row in enumerate(rows[1:], start=2):
+            if len(row) >= 3:
+                username = row[1].strip().lower()
+                # First row wins, as with the old row-by-row scan
+                if username and username not in users:
+                    users[username] = {
+                        'row': i,
+                        'name': row[0].strip(),
+                        'role': row[2].strip().lower(),
+                        'count': _login_count(row),
+                    }
+        with self._lock:
+            self._users = users
+            self._loaded_at = time.monotonic()
+        return True
+
+    def _refresh_async(self):
+        if self._refreshing.is_set():
+            return
+        self._refreshing.set()
+
+        def _run():
+            try:
+                self.refresh()
+            finally:
+                self._refreshing.clear()
+
+        threading.Thread(target=_run, name='user-directory-refresh', daemon=True).start()
+
+    def authenticate(self, username: str) -> Optional[Dict]:
+        """The dashboard user record for a username, or None if unknown"""
+        if self._loaded_at is None:
+            with self._load_lock:
+                if self._loaded_at is None:
+                    self.refresh()
+        elif time.monotonic() - self._loaded_at > self.ttl_seconds:
+            self._refresh_async()
+
+        user = self._users.get(username)
+        if user is None:
+            # Possibly added since the last load - reload, but not on every miss
+            now = time.monotonic()
+            if now - self._last_miss_refresh > MISS_REFRESH_SECONDS:
+                self._last_miss_refresh = now
+                self.refresh()
+                user = self._users.get(username)
+        if user is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        with self._lock:
+            pending = self._pending.get(username)
+            count = user['count'] + (pending[0] if pending else 0)
+        return {
+            'id': username,
+            'username': username,
+            'name': user['name'],
+            'role': user['role'],
+            'email': f"{username}@itc.int",
+            'loginCount': count
+        }
+
+    def record_login(self, username: str):
+        """Count a login; it reaches the sheet with the next flush"""
+        with self._lock:
+            pending = self._pending.setdefault(username, [0, None])
+            pending[0] += 1
+            pending[1] = datetime.now().isoformat()
+
+    def flush(self) -> int:
+        """
+        Write buffered logins back in one batchUpdate
+
+        Returns:
+            Number of users updated
+        """
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return 0
+
+            try:
+                # Re-read first so row numbers and counts are current
+                if not self.refresh():
+                    raise RuntimeError("auth tab could not be read")
+                data = []
+                for username, (logins, last_login) in pending.items():
+                    user = self._users.get(username)
+                    if user is None:
+                        continue
+                    data.append({
+                        'range': f"{AUTH_TAB}!E{user['row']}:F{user['row']}",
+                        'values': [[str(user['count'] + logins), last_login]]
+                    })
+                if data:
+                    service = self.connect()
+                    with self.service_lock, time_upstream('sheets', 'values.batchUpdate'):
+                        service.spreadsheets().values().batchUpdate(
+                            spreadsheetId=self.sheet_id,
+                            body={'valueInputOption': 'RAW', 'data': data}
+                        ).execute()
+            except Exception as e:
+                print(f"⚠️  Login flush failed, will retry: {e}")
+                with self._lock:
+                    # Put the logins back, merged with any recorded meanwhile
+                    for username, (logins, last_login) in pending.items():
+                        current = self._pending.setdefault(username, [0, None])
+                        current[0] += logins
+                        current[1] = current[1] or last_login
+                return 0
+
+            with self._lock:
+                for username, (logins, _) in pending.items():
+                    user = self._users.get(username)
+                    if user is not None:
+                        user['count'] += logins
+            print(f"✅ Updated logins for {len(data)} user(s)")
+            return len(data)
+
+    def start(self):
+        """Load the directory and flush logins on a timer"""
+        self.refresh()
+        if self._thread and self._thread.is_alive():
+            return
+
+        def _loop():
+            while not self._stop.wait(self.flush_interval):
+                self.flush()
+                if self._loaded_at is not None and time.monotonic() - self._loaded_at > self.ttl_seconds:
+                    self.refresh()
+
+        self._thread = threading.Thread(target=_loop, name='user-directory-flush', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the timer and write out any buffered logins"""
+        self._stop.set()
+        self.flush()
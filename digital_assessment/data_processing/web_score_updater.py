@@ -5,6 +5,7 @@ Runs locally in your browser - no tkinter needed!
 """
 
 import os
+import sys
 import json
 import csv
 from datetime import datetime
@@ -14,6 +15,9 @@ import urllib.parse
 import threading
 import webbrowser
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from shared.utils.metrics import MetricsHandlerMixin, registry as metrics, time_upstream
+
 try:
     from google.oauth2 import service_account
     from googleapiclient.discovery import build
@@ -247,27 +251,30 @@ class WebScoreUpdater:
         try:
             # Step 1: Load scores from Checklist Detail (A to BS columns)
             range_name = "Checklist Detail!A2:BS1000"
-            result = self.service.spreadsheets().values().get(
-                spreadsheetId=self.spreadsheet_id,
-                range=range_name
-            ).execute()
+            with time_upstream('sheets', 'values.get'):
+                result = self.service.spreadsheets().values().get(
+                    spreadsheetId=self.spreadsheet_id,
+                    range=range_name
+                ).execute()
             
             checklist_values = result.get('values', [])
             print(f"✅ Loaded {len(checklist_values)} rows from Checklist Detail sheet")
             
             # Step 2: Load URLs from CI Assessment (columns A, AK-AO)
-            ci_result = self.service.spreadsheets().values().get(
-                spreadsheetId=self.spreadsheet_id,
-                range="CI Assessment!A2:AO1000"
-            ).execute()
+            with time_upstream('sheets', 'values.get'):
+                ci_result = self.service.spreadsheets().values().get(
+                    spreadsheetId=self.spreadsheet_id,
+                    range="CI Assessment!A2:AO1000"
+                ).execute()
             ci_values = ci_result.get('values', [])
             print(f"✅ Loaded {len(ci_values)} rows from CI Assessment sheet")
             
             # Step 3: Load URLs from TO Assessment (columns A, AK-AO)
-            to_result = self.service.spreadsheets().values().get(
-                spreadsheetId=self.spreadsheet_id,
-                range="TO Assessment!A2:AO1000"
-            ).execute()
+            with time_upstream('sheets', 'values.get'):
+                to_result = self.service.spreadsheets().values().get(
+                    spreadsheetId=self.spreadsheet_id,
+                    range="TO Assessment!A2:AO1000"
+                ).execute()
             to_values = to_result.get('values', [])
             print(f"✅ Loaded {len(to_values)} rows from TO Assessment sheet")
             
@@ -390,29 +397,32 @@ class WebScoreUpdater:
             row_data.append(str(sum(pi_scores)))
             
             # Update scores (F to BS)
-            self.service.spreadsheets().values().update(
-                spreadsheetId=self.spreadsheet_id,
-                range=f"Checklist Detail!F{row_num}:BS{row_num}",
-                valueInputOption='RAW',
-                body={'values': [row_data]}
-            ).execute()
+            with time_upstream('sheets', 'values.update'):
+                self.service.spreadsheets().values().update(
+                    spreadsheetId=self.spreadsheet_id,
+                    range=f"Checklist Detail!F{row_num}:BS{row_num}",
+                    valueInputOption='RAW',
+                    body={'values': [row_data]}
+                ).execute()
             
             # Update Assessor column (E) with 'Alex'
-            self.service.spreadsheets().values().update(
-                spreadsheetId=self.spreadsheet_id,
-                range=f"Checklist Detail!E{row_num}",
-                valueInputOption='RAW',
-                body={'values': [['Alex']]}
-            ).execute()
+            with time_upstream('sheets', 'values.update'):
+                self.service.spreadsheets().values().update(
+                    spreadsheetId=self.spreadsheet_id,
+                    range=f"Checklist Detail!E{row_num}",
+                    valueInputOption='RAW',
+                    body={'values': [['Alex']]}
+                ).execute()
             
             # Update Assessment Date column (C)
             assessment_date = stakeholder.get('assessmentDate', datetime.now().strftime('%Y-%m-%d'))
-            self.service.spreadsheets().values().update(
-                spreadsheetId=self.spreadsheet_id,
-                range=f"Checklist Detail!C{row_num}",
-                valueInputOption='RAW',
-                body={'values': [[assessment_date]]}
-            ).execute()
+            with time_upstream('sheets', 'values.update'):
+                self.service.spreadsheets().values().update(
+                    spreadsheetId=self.spreadsheet_id,
+                    range=f"Checklist Detail!C{row_num}",
+                    valueInputOption='RAW',
+                    body={'values': [[assessment_date]]}
+                ).execute()
             
             print(f"✅ Saved {stakeholder['name']} and marked as assessed by Alex")
             return {'success': True, 'stakeholder': stakeholder['name']}
@@ -477,10 +487,11 @@ class WebScoreUpdater:
                 'data': batch_data
             }
             
-            result = self.service.spreadsheets().values().batchUpdate(
-                spreadsheetId=self.spreadsheet_id,
-                body=body
-            ).execute()
+            with time_upstream('sheets', 'values.batchUpdate'):
+                result = self.service.spreadsheets().values().batchUpdate(
+                    spreadsheetId=self.spreadsheet_id,
+                    body=body
+                ).execute()
             
             print(f"✅ Successfully saved {len(self.stakeholders_data)} stakeholders to Google Sheets")
             return {'success': True, 'count': len(self.stakeholders_data)}
@@ -537,14 +548,16 @@ class WebScoreUpdater:
 # Global instance
 updater = WebScoreUpdater()
 
-class RequestHandler(BaseHTTPRequestHandler):
+class RequestHandler(MetricsHandlerMixin, BaseHTTPRequestHandler):
     def do_GET(self):
-        if self.path == '/':
+        if urllib.parse.urlsplit(self.path).path == '/api/metrics':
+            self.send_metrics_response()
+        elif self.path == '/':
             self.send_response(200)
             self.send_header('Content-type', 'text/html')
             self.end_headers()
             self.wfile.write(self.get_html().encode())
-        elif self.path == '/api/stakeholders':
+        elif self.path.split('?')[0] == '/api/stakeholders':
             self.send_response(200)
             self.send_header('Content-type', 'application/json')
             self.send_header('Access-Control-Allow-Origin', '*')
@@ -1477,6 +1490,7 @@ class RequestHandler(BaseHTTPRequestHandler):
 def run_server(port=8080):
     """Run the web server"""
     server_address = ('', port)
+    metrics.server = 'score_updater'
     httpd = HTTPServer(server_address, RequestHandler)
     
     print(f"🎯 Visual Score Updater running at: http://localhost:{port}")
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Benchmark for ITOAnalyzer.analyze_creative_sectors
+Times the single-pass SectorKeywordMatcher against the previous
+per-keyword scan (one regex compile and full-text search per keyword, then
+context filter searches per match) on long synthetic tour pages, and checks
+that both give identical scores, details and justifications.
+
+Usage:
+    python scripts/benchmark_keyword_matcher.py
+    python scripts/benchmark_keyword_matcher.py --words 2000 10000 50000 --repeat 5
+    python scripts/benchmark_keyword_matcher.py --pages ito_content_explore.json
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import time
+from typing import Dict, List
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT_DIR, 'core'))
+from ito_ai_analyzer import ITOAnalyzer
+
+DEFAULT_WORDS = [2000, 10000, 40000]
+DEFAULT_REPEAT = 3
+
+FILLER = (
+    'day tour guide visit the of and to in a with our you will river boat village '
+    'lunch hotel transfer morning afternoon evening drive explore local people '
+    'community traditional enjoy beautiful wildlife birds beach Banjul Gambia '
+    'Senegal optional included price per person departure return book video'
+).split()
+# Near-misses for the context filters and keyword boundaries
+DISTRACTORS = [
+    'book now', 'Booking', 'to book', 'reserve', 'watch video', 'video tour',
+    'play video', 'rebooking', 'preserve', 'crafts-market', 'photo-safari',
+    'Story.', 'MUSIC,', 'tie-dye', 'e-book', 'storytelling',
+]
+
+
+def legacy_sector_counts(analyzer: ITOAnalyzer, text: str) -> Dict[str, Dict[str, int]]:
+    """The previous implementation: one full-text regex scan per keyword"""
+    counts = {}
+    for sector, keywords in analyzer.SECTOR_KEYWORDS.items():
+        counts[sector] = {}
+        for keyword in keywords:
+            pattern = re.compile(r'\b' + re.escape(keyword) + r'\b', re.IGNORECASE)
+            valid = 0
+            for match in pattern.finditer(text):
+                start = max(0, match.start() - 50)
+                end = min(len(text), match.end() + 50)
+                context = text[start:end]
+                if not any(re.search(p, context, re.IGNORECASE)
+                           for p in analyzer.CONTEXT_FILTERS.get(sector, [])):
+                    valid += 1
+            counts[sector][keyword] = counts[sector].get(keyword, 0) + valid
+    return counts
+
+
+class _LegacyMatcher:
+    """Adapter so analyze_creative_sectors can score the legacy counts"""
+
+    def __init__(self, analyzer: ITOAnalyzer):
+        self.analyzer = analyzer
+
+    def count(self, text):
+        return legacy_sector_counts(self.analyzer, text)
+
+
+def synthetic_page(words: int, rng: random.Random, keywords: List[str]) -> str:
+    """A long tour page: mostly filler, with keywords and filter phrases mixed in"""
+    parts = []
+    for i in range(words):
+        roll = rng.random()
+        if roll < 0.04:
+            word = rng.choice(keywords)
+            parts.append(word.title() if rng.random() < 0.3 else word)
+        elif roll < 0.06:
+            parts.append(rng.choice(DISTRACTORS))
+        else:
+            parts.append(rng.choice(FILLER))
+        if i % 25 == 24:
+            parts[-1] += '.\n'
+    return ' '.join(parts)
+
+
+def load_pages(paths: List[str]) -> List[str]:
+    """full_text of every page in scraper JSON output files"""
+    texts = []
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        records = data if isinstance(data, list) else [data]
+        for record in records:
+            for page in [record] + record.get('gambia_pages', []) + record.get('tour_pages', []):
+                if page.get('full_text'):
+                    texts.append(page['full_text'])
+    return texts
+
+
+def time_call(func, text: str, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(text)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark sector keyword matching on long tour pages')
+    parser.add_argument('--words', type=int, nargs='+', default=DEFAULT_WORDS,
+                        help='Synthetic page sizes in words')
+    parser.add_argument('--pages', nargs='+', default=[],
+                        help='Scraper JSON output files to benchmark instead of synthetic pages')
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT, help='Runs per page (best time is kept)')
+    parser.add_argument('--seed', type=int, default=42, help='Synthetic page seed')
+    args = parser.parse_args()
+
+    analyzer = ITOAnalyzer()
+    legacy = ITOAnalyzer()
+    legacy.keyword_matcher = _LegacyMatcher(legacy)
+
+    if args.pages:
+        texts = [(f"page {i + 1}", text) for i, text in enumerate(load_pages(args.pages))]
+    else:
+        rng = random.Random(args.seed)
+        keywords = [kw for kws in analyzer.SECTOR_KEYWORDS.values() for kw in kws]
+        texts = [(f"{words} words", synthetic_page(words, rng, keywords)) for words in args.words]
+    if not texts:
+        print("❌ No pages to benchmark")
+        sys.exit(1)
+
+    print(f"📊 analyze_creative_sectors: per-keyword scan vs single-pass matcher (best of {args.repeat})")
+    print(f"   {'page':<14} {'chars':>9} {'before ms':>10} {'after ms':>10} {'speedup':>8}  identical")
+    mismatches = 0
+    total_before = total_after = 0.0
+    for label, text in texts:
+        identical = legacy.analyze_creative_sectors(text) == analyzer.analyze_creative_sectors(text)
+        mismatches += not identical
+        before = time_call(legacy.analyze_creative_sectors, text, args.repeat)
+        after = time_call(analyzer.analyze_creative_sectors, text, args.repeat)
+        total_before += before
+        total_after += after
+        print(f"   {label:<14} {len(text):>9,} {before * 1000:>10.1f} {after * 1000:>10.1f} "
+              f"{before / after if after else 0:>7.1f}x  {'✅' if identical else '❌'}")
+
+    print(f"\n   Overall: {total_before * 1000:.0f} ms → {total_after * 1000:.0f} ms "
+          f"({total_before / total_after if total_after else 0:.1f}x faster)")
+    if mismatches:
+        print(f"❌ {mismatches} page(s) scored differently")
+        sys.exit(1)
+    print("✅ Scores, details and justifications identical on every page")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,455 @@
+#!/usr/bin/env python3
+"""
+Benchmark harness for the dashboard HTTP servers
+Starts full_api_server, proxy_server and web_score_updater in a child process
+against a stub Sheets service filled with synthetic fixture data, drives each
+endpoint with concurrent keep-alive clients and writes throughput and
+p50/p95/p99 latency to a JSON file that can be diffed between runs.
+
+Usage:
+    python scripts/benchmark_servers.py --output bench_before.json
+    python scripts/benchmark_servers.py --output bench_after.json --compare bench_before.json
+"""
+
+import argparse
+import http.client
+import json
+import math
+import multiprocessing
+import os
+import platform
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CORE_DIR = os.path.join(ROOT_DIR, 'core')
+DATA_PROCESSING_DIR = os.path.join(ROOT_DIR, 'data_processing')
+
+SECTORS = [
+    'Cultural heritage sites/museums',
+    'Crafts and artisan products',
+    'Performing and visual arts',
+    'Music (artists, production, venues, education)',
+    'Fashion & Design',
+    'Audiovisual (film, photography, TV, videography)',
+    'Marketing/advertising/publishing',
+    'Festivals and cultural events',
+]
+REGIONS = [
+    'Greater Banjul Area', 'West Coast Region', 'North Bank Region',
+    'Lower River Region', 'Central River Region', 'Upper River Region',
+]
+
+# Static file the pooled servers serve from their working directory
+STATIC_PAGE = '/index.html'
+
+# Endpoints driven on each server; {name} is replaced with a fixture participant
+ENDPOINTS = {
+    'api': [
+        '/api/dashboard',
+        '/api/sectors',
+        '/api/participants',
+        '/api/participants?sector=Crafts+and+artisan+products&sort=-externalTotal&limit=20',
+        '/api/participant/{name}/plan',
+        STATIC_PAGE,
+    ],
+    'proxy': [
+        '/api/dashboard',
+        '/api/participants',
+        STATIC_PAGE,
+    ],
+    'score_updater': [
+        '/api/stakeholders',
+        '/api/stakeholders?filter=centre',
+    ],
+}
+
+DEFAULT_ROWS = 99           # CI Assessment!A1:Z100 holds a header plus 99 participants
+DEFAULT_CONCURRENCY = [1, 8, 32]
+DEFAULT_DURATION_SECONDS = 5.0
+DEFAULT_WARMUP_SECONDS = 1.0
+DEFAULT_TOLERANCE = 0.15
+
+
+# ---------------------------------------------------------------------------
+# Synthetic fixtures and the stub Sheets service
+# ---------------------------------------------------------------------------
+
+def build_fixtures(rows: int, seed: int) -> Dict[str, List[List[str]]]:
+    """Whole tabs (row 1 = header) shaped like the real assessment sheet"""
+    rng = random.Random(seed)
+    names = [f"{rng.choice(['Kora', 'Batik', 'Kankurang', 'Jola', 'Riverside', 'Sahel'])} "
+             f"{rng.choice(['Arts', 'Studio', 'Collective', 'Centre', 'Crafts', 'Sounds'])} {i + 1}"
+             for i in range(rows)]
+
+    ci = [['Stakeholder Name', 'Sector', 'Region', 'Social Media', 'Website', 'Visual Content',
+           'Discoverability', 'Digital Sales', 'Platform Integration', 'External Total',
+           'Survey Total', 'Combined Score']]
+    checklist = [['Stakeholder Name', 'Sector', 'Date', 'Notes', 'Assessor']]
+    for name in names:
+        sector, region = rng.choice(SECTORS), rng.choice(REGIONS)
+        categories = [rng.randint(0, 10) for _ in range(6)]
+        external = sum(categories)
+        survey = rng.randint(0, 30)
+        row = [name, sector, region] + [str(c) for c in categories] + \
+              [str(external), str(survey), str(external + survey)]
+        row += [''] * (36 - len(row))
+        slug = name.lower().replace(' ', '')
+        row += [f'https://{slug}.gm', f'https://facebook.com/{slug}',
+                f'https://instagram.com/{slug}', '', '']
+        ci.append(row)
+
+        checks = [name, sector, '2025-10-01', '', 'Alex']
+        checks += [str(rng.randint(0, 1)) for _ in range(5, 70)]
+        checklist.append(checks)
+
+    to = [ci[0]] + ci[1:1 + rows // 3]
+    return {
+        'CI Assessment': ci,
+        'TO Assessment': to,
+        'Checklist Detail': checklist,
+        'dashboard_auth': [['Name', 'Username', 'Role', 'Email', 'Login Count', 'Last Login'],
+                           ['Bench User', 'bench', 'admin', '', '0', '']],
+    }
+
+
+def _column_index(letters: str) -> int:
+    index = 0
+    for ch in letters.upper():
+        index = index * 26 + (ord(ch) - ord('A') + 1)
+    return index - 1
+
+
+def parse_a1(range_name: str) -> Tuple[str, int, int, Optional[int], Optional[int]]:
+    """'Tab!A2:BS1000' -> (tab, first row, first col, last row, last col), 0-based"""
+    tab, _, cells = range_name.rpartition('!')
+    tab = tab.strip("'")
+    bounds = []
+    for cell in cells.split(':'):
+        match = re.fullmatch(r'([A-Za-z]*)(\d*)', cell)
+        letters, digits = match.groups()
+        bounds.append((int(digits) - 1 if digits else None, _column_index(letters) if letters else None))
+    (row0, col0), (row1, col1) = bounds[0], bounds[-1]
+    return tab, row0 or 0, col0 or 0, row1, col1
+
+
+class _StubRequest:
+    def __init__(self, fn, latency: float):
+        self.fn = fn
+        self.latency = latency
+
+    def execute(self):
+        if self.latency:
+            time.sleep(self.latency)
+        return self.fn()
+
+
+class StubSheetsService:
+    """Just enough of spreadsheets().values() for the servers, backed by fixtures"""
+
+    def __init__(self, tabs: Dict[str, List[List[str]]], latency: float = 0.0):
+        self.tabs = tabs
+        self.latency = latency
+
+    def spreadsheets(self):
+        return self
+
+    def values(self):
+        return self
+
+    def _read(self, range_name: str) -> Dict:
+        tab, row0, col0, row1, col1 = parse_a1(range_name)
+        rows = self.tabs.get(tab, [])[row0:None if row1 is None else row1 + 1]
+        values = [row[col0:None if col1 is None else col1 + 1] for row in rows]
+        # Like the real API: trailing empty cells and rows are dropped
+        values = [row[:max([i + 1 for i, v in enumerate(row) if v != ''] or [0])] for row in values]
+        while values and not values[-1]:
+            values.pop()
+        return {'range': range_name, 'values': values}
+
+    def get(self, spreadsheetId=None, range=None, **kwargs):
+        return _StubRequest(lambda: self._read(range), self.latency)
+
+    def batchGet(self, spreadsheetId=None, ranges=None, **kwargs):
+        return _StubRequest(lambda: {'valueRanges': [self._read(r) for r in ranges]}, self.latency)
+
+    def update(self, **kwargs):
+        return _StubRequest(lambda: {'updatedCells': 0}, self.latency)
+
+    def batchUpdate(self, **kwargs):
+        return _StubRequest(lambda: {'totalUpdatedCells': 0}, self.latency)
+
+
+# ---------------------------------------------------------------------------
+# Servers (child process)
+# ---------------------------------------------------------------------------
+
+def _quiet(handler_class):
+    """Handler subclass without per-request access logging"""
+    return type(handler_class.__name__, (handler_class,), {'log_message': lambda self, *args: None})
+
+
+def serve_fixtures(options: Dict, ready):
+    """
+    Child process: start all three servers on free ports against the stub
+    service and report the ports on the ready queue
+    """
+    if not options['verbose']:
+        sys.stdout = open(os.devnull, 'w')
+    sys.path[:0] = [CORE_DIR, DATA_PROCESSING_DIR]
+    # Non-API paths are static files from the working directory
+    os.chdir(tempfile.mkdtemp(prefix='bench-static-'))
+    with open(STATIC_PAGE.lstrip('/'), 'w') as f:
+        f.write('<!doctype html><title>Dashboard</title>' + '<p>benchmark</p>' * 200)
+
+    from http.server import HTTPServer
+    import full_api_server
+    import proxy_server
+    import web_score_updater
+    from pooled_server import ThreadPoolHTTPServer
+
+    service = StubSheetsService(build_fixtures(options['rows'], options['seed']),
+                                options['sheets_latency_ms'] / 1000.0)
+
+    # Same server classes the run_*_server() functions use
+    full_api_server.snapshot_cache.service = service
+    full_api_server.snapshot_cache.start()
+    api = ThreadPoolHTTPServer(('127.0.0.1', 0), _quiet(full_api_server.APIHandler),
+                               workers=options['workers'])
+    api_port = api.server_address[1]
+
+    proxy_handler = _quiet(proxy_server.ProxyHandler)
+    proxy_handler.api_base = f'http://127.0.0.1:{api_port}'
+    proxy = ThreadPoolHTTPServer(('127.0.0.1', 0), proxy_handler, workers=options['workers'])
+
+    web_score_updater.updater.service = service
+    web_score_updater.updater.load_from_sheets()
+    scores = HTTPServer(('127.0.0.1', 0), _quiet(web_score_updater.RequestHandler))
+
+    servers = {'api': api, 'proxy': proxy, 'score_updater': scores}
+    for name, server in servers.items():
+        threading.Thread(target=server.serve_forever, name=f'bench-{name}', daemon=True).start()
+    ready.put({name: server.server_address[1] for name, server in servers.items()})
+    threading.Event().wait()
+
+
+# ---------------------------------------------------------------------------
+# Load generation (parent process)
+# ---------------------------------------------------------------------------
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(q * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def drive(port: int, path: str, concurrency: int, duration: float, headers: Dict[str, str]) -> Dict:
+    """Hit one endpoint with `concurrency` keep-alive clients for `duration` seconds"""
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    failures = [0]
+    received = [0]
+    lock = threading.Lock()
+    start_barrier = threading.Barrier(concurrency + 1)
+    deadline = [0.0]
+
+    def client():
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        local, local_statuses, local_failures, local_bytes = [], Counter(), 0, 0
+        start_barrier.wait()
+        while time.perf_counter() < deadline[0]:
+            t0 = time.perf_counter()
+            try:
+                conn.request('GET', path, headers=headers)
+                response = conn.getresponse()
+                body = response.read()
+                local.append(time.perf_counter() - t0)
+                local_statuses[response.status] += 1
+                local_bytes += len(body)
+                if response.will_close:
+                    conn.close()
+            except (OSError, http.client.HTTPException):
+                local_failures += 1
+                conn.close()
+        conn.close()
+        with lock:
+            latencies.extend(local)
+            statuses.update(local_statuses)
+            failures[0] += local_failures
+            received[0] += local_bytes
+
+    threads = [threading.Thread(target=client, daemon=True) for _ in range(concurrency)]
+    for t in threads:
+        t.start()
+    deadline[0] = time.perf_counter() + duration
+    started = time.perf_counter()
+    start_barrier.wait()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    errors = failures[0] + sum(n for status, n in statuses.items() if status >= 400)
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'statuses': {str(s): n for s, n in sorted(statuses.items())},
+        'throughput_rps': round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 3),
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 3),
+        'max_ms': round(latencies[-1] * 1000, 3) if latencies else 0.0,
+        'bytes_per_response': round(received[0] / len(latencies)) if latencies else 0,
+    }
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT_DIR,
+                              capture_output=True, text=True, timeout=10).stdout.strip()
+    except Exception:
+        return ''
+
+
+def compare_results(current: Dict, baseline: Dict, tolerance: float) -> Tuple[List[str], int]:
+    """
+    Endpoints whose throughput fell or p95 rose by more than tolerance
+
+    Returns:
+        (regression descriptions, number of endpoint/concurrency pairs compared)
+    """
+    regressions = []
+    compared = 0
+    for server, endpoints in current['results'].items():
+        for path, levels in endpoints.items():
+            for level, result in levels.items():
+                before = baseline.get('results', {}).get(server, {}).get(path, {}).get(level)
+                if not before:
+                    continue
+                compared += 1
+                if before['throughput_rps'] and \
+                        result['throughput_rps'] < before['throughput_rps'] * (1 - tolerance):
+                    regressions.append(f"{server} {path} c={level}: throughput "
+                                       f"{before['throughput_rps']} -> {result['throughput_rps']} rps")
+                if before['p95_ms'] and result['p95_ms'] > before['p95_ms'] * (1 + tolerance):
+                    regressions.append(f"{server} {path} c={level}: p95 "
+                                       f"{before['p95_ms']} -> {result['p95_ms']} ms")
+    return regressions, compared
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the dashboard HTTP servers against stub Sheets data')
+    parser.add_argument('--output', default='benchmark_results.json', help='JSON results file to write')
+    parser.add_argument('--servers', nargs='+', choices=sorted(ENDPOINTS), default=sorted(ENDPOINTS),
+                        help='Servers to benchmark')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=DEFAULT_CONCURRENCY,
+                        help='Concurrent clients (one run per value)')
+    parser.add_argument('--duration', type=float, default=DEFAULT_DURATION_SECONDS,
+                        help='Seconds to drive each endpoint at each concurrency')
+    parser.add_argument('--warmup', type=float, default=DEFAULT_WARMUP_SECONDS,
+                        help='Seconds of unrecorded load before each endpoint')
+    parser.add_argument('--rows', type=int, default=DEFAULT_ROWS, help='Synthetic participants per tab')
+    parser.add_argument('--seed', type=int, default=42, help='Fixture data seed')
+    parser.add_argument('--sheets-latency-ms', type=float, default=0.0,
+                        help='Delay added to every stub Sheets call')
+    parser.add_argument('--workers', type=int, default=32, help='API server worker threads')
+    parser.add_argument('--accept-encoding', default='gzip, deflate',
+                        help="Accept-Encoding sent by clients ('' for identity)")
+    parser.add_argument('--compare', metavar='BASELINE', help='Previous results file to check for regressions')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help='Allowed fractional drop in throughput / rise in p95 before failing')
+    parser.add_argument('--verbose', action='store_true', help='Show server output')
+    args = parser.parse_args()
+
+    options = {
+        'rows': args.rows,
+        'seed': args.seed,
+        'sheets_latency_ms': args.sheets_latency_ms,
+        'workers': args.workers,
+        'verbose': args.verbose,
+    }
+    fixture_name = build_fixtures(args.rows, args.seed)['CI Assessment'][1][0]
+    headers = {'Accept-Encoding': args.accept_encoding} if args.accept_encoding else {}
+
+    ready = multiprocessing.Queue()
+    child = multiprocessing.Process(target=serve_fixtures, args=(options, ready), daemon=True)
+    child.start()
+    print("🚀 Starting servers against stub Sheets data...")
+    try:
+        ports = ready.get(timeout=60)
+    except Exception:
+        child.terminate()
+        print("❌ Servers did not start (run with --verbose to see why)")
+        sys.exit(1)
+
+    results: Dict[str, Dict[str, Dict[str, Dict]]] = {}
+    try:
+        for server in args.servers:
+            print(f"\n📊 {server} (port {ports[server]})")
+            results[server] = {}
+            for template in ENDPOINTS[server]:
+                path = template.replace('{name}', fixture_name.replace(' ', '%20'))
+                results[server][template] = {}
+                if args.warmup > 0:
+                    drive(ports[server], path, max(args.concurrency), args.warmup, headers)
+                for level in args.concurrency:
+                    result = drive(ports[server], path, level, args.duration, headers)
+                    results[server][template][str(level)] = result
+                    print(f"   {template[:60]:<60} c={level:<3} {result['throughput_rps']:>9.1f} rps  "
+                          f"p50 {result['p50_ms']:.2f}  p95 {result['p95_ms']:.2f}  "
+                          f"p99 {result['p99_ms']:.2f} ms  errors {result['errors']}")
+    finally:
+        child.terminate()
+        child.join(5)
+
+    report = {
+        'meta': {
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'git_commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'concurrency': args.concurrency,
+            'duration_seconds': args.duration,
+            'rows': args.rows,
+            'seed': args.seed,
+            'sheets_latency_ms': args.sheets_latency_ms,
+            'accept_encoding': args.accept_encoding,
+            'api_workers': args.workers,
+        },
+        'results': results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+        f.write('\n')
+    print(f"\n💾 Results saved to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions, compared = compare_results(report, baseline, args.tolerance)
+        if not compared:
+            print(f"⚠️  Nothing to compare - {args.compare} has no matching endpoints/concurrency levels")
+        elif regressions:
+            print(f"\n❌ {len(regressions)} regression(s) against {args.compare} "
+                  f"(tolerance {args.tolerance:.0%}):")
+            for line in regressions:
+                print(f"   - {line}")
+            sys.exit(1)
+        else:
+            print(f"✅ No regressions in {compared} measurements against {args.compare} "
+                  f"(tolerance {args.tolerance:.0%})")
+
+
+if __name__ == '__main__':
+    main()
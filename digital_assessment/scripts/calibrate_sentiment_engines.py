@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Sentiment engine calibration report
+Scores the same pages with the Google Natural Language engine and a local
+engine (VADER or TextBlob) and reports how well they agree: correlation,
+mean absolute difference, agreement on the Positive/Neutral/Negative labels
+analyze_content prints, and the pages they disagree on most. The linear fit
+mapping local scores onto the Google scale can be saved, and
+get_sentiment_engine() then applies it to the local engine.
+
+Pages come from the on-disk fetch cache (text extracted as the ITO scraper
+does) or from scraper JSON output. Google scores are read from the sentiment
+cache, so the report makes no API calls unless --allow-api is given.
+
+Usage:
+    python scripts/calibrate_sentiment_engines.py
+    python scripts/calibrate_sentiment_engines.py --local textblob --pages ito_content_*.json
+    python scripts/calibrate_sentiment_engines.py --save
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT_DIR, 'core'))
+sys.path.insert(0, ROOT_DIR)
+from ito_ai_analyzer import (GOOGLE_NL_ENGINE, ITOAnalyzer, SENTIMENT_CALIBRATION_FILE,
+                             get_sentiment_engine, load_sentiment_calibration)
+from shared.utils.fetch_cache import get_fetch_cache
+from shared.utils.sentiment_cache import get_sentiment_cache
+
+# A fit is only saved from at least this many pages, and only if the
+# engines actually track each other
+MIN_PAGES_FOR_FIT = 10
+MIN_FIT_CORRELATION = 0.3
+# Pages shorter than this say little about document sentiment
+MIN_WORDS = 50
+
+
+def sentiment_label(score: float) -> str:
+    """Label thresholds used by ITOAnalyzer.analyze_content"""
+    if score < -0.2:
+        return 'Negative'
+    if score > 0.4:
+        return 'Very Positive'
+    if score > 0.2:
+        return 'Positive'
+    return 'Neutral'
+
+
+def cached_page_texts(limit: Optional[int] = None) -> List[Tuple[str, str]]:
+    """(url, full_text) for pages in the fetch cache, rendered copies preferred"""
+    from ito_content_scraper import ITOContentScraper
+
+    cache = get_fetch_cache()
+    scraper = ITOContentScraper(fetch_cache=cache)
+    by_url = {}
+    for url, variant in cache.urls():
+        if url not in by_url or variant == 'rendered':
+            by_url[url] = variant
+    texts = []
+    for url, variant in by_url.items():
+        page = cache.lookup(url, variant, max_age=float('inf'))
+        if page is None or 'html' not in page.headers.get('Content-Type', 'text/html'):
+            continue
+        result = scraper.extract_content(url, 'tour_page', page.text)
+        if result.get('success') and result['word_count'] >= MIN_WORDS:
+            texts.append((url, result['full_text']))
+            if limit and len(texts) >= limit:
+                break
+    return texts
+
+
+def json_page_texts(paths: List[str]) -> List[Tuple[str, str]]:
+    """(url, full_text) of every page in scraper JSON output files"""
+    texts = []
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        for record in data if isinstance(data, list) else [data]:
+            for page in [record] + record.get('gambia_pages', []) + record.get('tour_pages', []):
+                if page.get('full_text') and len(page['full_text'].split()) >= MIN_WORDS:
+                    texts.append((page.get('url', path), page['full_text']))
+    return texts
+
+
+def pearson(xs: List[float], ys: List[float]) -> float:
+    mean_x, mean_y = sum(xs) / len(xs), sum(ys) / len(ys)
+    cov = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys))
+    var_x = sum((x - mean_x) ** 2 for x in xs)
+    var_y = sum((y - mean_y) ** 2 for y in ys)
+    return cov / math.sqrt(var_x * var_y) if var_x and var_y else 0.0
+
+
+def linear_fit(xs: List[float], ys: List[float]) -> Tuple[float, float]:
+    """Least-squares (scale, offset) for y ≈ scale * x + offset"""
+    mean_x, mean_y = sum(xs) / len(xs), sum(ys) / len(ys)
+    var_x = sum((x - mean_x) ** 2 for x in xs)
+    if not var_x:
+        return 1.0, mean_y - mean_x
+    scale = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / var_x
+    return scale, mean_y - scale * mean_x
+
+
+def agreement(google: List[float], local: List[float]) -> Dict:
+    labels = [(sentiment_label(g), sentiment_label(l)) for g, l in zip(google, local)]
+    return {
+        'pages': len(google),
+        'pearson_r': pearson(local, google),
+        'mean_abs_diff': sum(abs(g - l) for g, l in zip(google, local)) / len(google),
+        'label_agreement': sum(g == l for g, l in labels) / len(labels),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare a local sentiment engine with the Google NL engine')
+    parser.add_argument('--local', default='vader', choices=['vader', 'textblob'], help='Local engine to calibrate')
+    parser.add_argument('--pages', nargs='+', default=[], help='Scraper JSON output files instead of the fetch cache')
+    parser.add_argument('--limit', type=int, help='At most this many cached pages')
+    parser.add_argument('--allow-api', action='store_true',
+                        help='Call the NL API for pages without a cached Google score')
+    parser.add_argument('--save', action='store_true',
+                        help=f'Save the linear fit to {SENTIMENT_CALIBRATION_FILE}')
+    parser.add_argument('--show', type=int, default=5, help='Largest disagreements to list')
+    args = parser.parse_args()
+
+    texts = json_page_texts(args.pages) if args.pages else cached_page_texts(args.limit)
+    print(f"📄 {len(texts)} pages with at least {MIN_WORDS} words")
+
+    google_analyzer = ITOAnalyzer(sentiment_engine='google') if args.allow_api else None
+    local_engine = get_sentiment_engine(args.local, calibrated=False)
+    cache = get_sentiment_cache()
+
+    rows = []
+    skipped = 0
+    for url, text in texts:
+        content = text[:local_engine.max_chars]
+        if google_analyzer is not None:
+            google_score = google_analyzer.get_sentiment(text)
+        else:
+            cached = cache.get(GOOGLE_NL_ENGINE, content)
+            if cached is None:
+                skipped += 1
+                continue
+            google_score = round(cached['score'], 2)
+        local_score, _ = local_engine.analyze(content)
+        rows.append((url, google_score, local_score))
+
+    if skipped:
+        print(f"⚠️  {skipped} pages have no cached Google score (use --allow-api to fetch them)")
+    if not rows:
+        print("❌ No pages to compare")
+        sys.exit(1)
+
+    google = [row[1] for row in rows]
+    local = [row[2] for row in rows]
+    scale, offset = linear_fit(local, google)
+    calibrated = [max(-1.0, min(1.0, score * scale + offset)) for score in local]
+    raw_stats = agreement(google, local)
+    fit_stats = agreement(google, calibrated)
+
+    print(f"\n📊 {local_engine.name} vs Google NL on {len(rows)} pages")
+    print(f"   {'':<22} {'raw':>8} {'calibrated':>11}")
+    print(f"   {'Pearson r':<22} {raw_stats['pearson_r']:>8.2f} {fit_stats['pearson_r']:>11.2f}")
+    print(f"   {'Mean |difference|':<22} {raw_stats['mean_abs_diff']:>8.2f} {fit_stats['mean_abs_diff']:>11.2f}")
+    print(f"   {'Label agreement':<22} {raw_stats['label_agreement']:>8.0%} {fit_stats['label_agreement']:>11.0%}")
+    print(f"   Fit: google ≈ {scale:.2f} × {args.local} {offset:+.2f}")
+
+    if args.show:
+        print(f"\n   Largest disagreements (after calibration):")
+        worst = sorted(zip(rows, calibrated), key=lambda item: abs(item[0][1] - item[1]), reverse=True)
+        for (url, google_score, _), local_score in worst[:args.show]:
+            print(f"   google {google_score:+.2f}  {args.local} {local_score:+.2f}  {url[:70]}")
+
+    if args.save:
+        if len(rows) < MIN_PAGES_FOR_FIT:
+            print(f"\n❌ Not saving: need at least {MIN_PAGES_FOR_FIT} pages for a fit")
+            sys.exit(1)
+        if fit_stats['pearson_r'] < MIN_FIT_CORRELATION:
+            print(f"\n❌ Not saving: correlation {fit_stats['pearson_r']:.2f} is below {MIN_FIT_CORRELATION}, "
+                  f"a linear fit would not make {args.local} track Google")
+            sys.exit(1)
+        calibration = load_sentiment_calibration()
+        calibration[args.local] = {
+            'scale': round(scale, 4),
+            'offset': round(offset, 4),
+            'pages': len(rows),
+            'pearson_r': round(fit_stats['pearson_r'], 3),
+            'label_agreement': round(fit_stats['label_agreement'], 3),
+            'created_at': datetime.now().isoformat(),
+        }
+        os.makedirs(os.path.dirname(SENTIMENT_CALIBRATION_FILE), exist_ok=True)
+        with open(SENTIMENT_CALIBRATION_FILE, 'w', encoding='utf-8') as f:
+            json.dump(calibration, f, indent=2, sort_keys=True)
+        print(f"\n💾 Saved {args.local} calibration to {SENTIMENT_CALIBRATION_FILE}")
+
+
+if __name__ == '__main__':
+    main()
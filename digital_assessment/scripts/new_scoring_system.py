@@ -15,9 +15,11 @@ from typing import Any, Dict, List, Optional, Tuple
 from urllib.parse import urlparse
 
 import pandas as pd
-import requests
 from bs4 import BeautifulSoup
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from shared.utils.fetch_cache import FetchedPage, get_fetch_cache
+
 
 # Configuration
 USER_AGENT = (
@@ -77,14 +79,13 @@ class AssessmentResult:
     details: Dict[str, Any]
 
 
-def safe_get(url: str) -> Optional[requests.Response]:
-    """Safely fetch a URL with error handling"""
+def safe_get(url: str) -> Optional[FetchedPage]:
+    """Safely fetch a URL with error handling (through the on-disk fetch cache)"""
     if not url or not isinstance(url, str):
         return None
     try:
         headers = {"User-Agent": USER_AGENT}
-        resp = requests.get(url, headers=headers, timeout=REQUEST_TIMEOUT_SECONDS, allow_redirects=True)
-        return resp
+        return get_fetch_cache().get(url, headers=headers, timeout=REQUEST_TIMEOUT_SECONDS)
     except Exception:
         return None
 
@@ -105,7 +106,7 @@ def normalize_url(url: Optional[str]) -> str:
     return f"https://{url}"
 
 
-def extract_text(response: Optional[requests.Response]) -> str:
+def extract_text(response: Optional[FetchedPage]) -> str:
     """Extract text content from response"""
     if response is None or response.status_code >= 400:
         return ""
@@ -218,7 +219,7 @@ def assess_website(website_url: str) -> Tuple[int, Dict[str, Any]]:
     # Test website
     resp = safe_get(website_url)
     if not resp or resp.status_code >= 400:
-        return 0, {'error': f'Website not accessible (status: {resp.status_code if resp else "No response"}')}
+        return 0, {'error': f'Website not accessible (status: {resp.status_code if resp else "No response"})'}
     
     # Basic Setup (3 points)
     score += 1  # Website exists and loads
@@ -940,3 +941,4 @@ if __name__ == "__main__":
     
     # Run assessment with limit for testing
     run_assessment(input_csv, output_csv, limit=10)
+    get_fetch_cache().print_summary()
@@ -7,6 +7,7 @@ Follows links in Google Sheets and scrapes content from Gambia-specific pages
 import json
 import os
 import re
+import sys
 import time
 import logging
 from datetime import datetime
@@ -18,9 +19,11 @@ from dataclasses import dataclass
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
 try:
     import requests
-    from bs4 import BeautifulSoup
+    from shared.utils.html_extract import HtmlDocument
     from requests.adapters import HTTPAdapter
     from urllib3.util.retry import Retry
     WEB_SCRAPING_AVAILABLE = True
@@ -101,15 +104,15 @@ class ITOsWebScraper:
             response = self.session.get(url, timeout=30)
             response.raise_for_status()
             
-            # Parse HTML
-            soup = BeautifulSoup(response.content, 'html.parser')
+            # Parse HTML once; the extractors below query its element index
+            doc = HtmlDocument(response.content)
             
             # Extract content
-            title = self._extract_title(soup)
-            description = self._extract_description(soup)
-            content = self._extract_main_content(soup)
-            marketing_text = self._extract_marketing_text(soup)
-            services = self._extract_services(soup)
+            title = self._extract_title(doc)
+            description = self._extract_description(doc)
+            content = self._extract_main_content(doc)
+            marketing_text = self._extract_marketing_text(doc)
+            services = self._extract_services(doc)
             
             response_time = time.time() - start_time
             
@@ -147,37 +150,36 @@ class ITOsWebScraper:
                 response_time=response_time
             )
     
-    def _extract_title(self, soup: BeautifulSoup) -> str:
+    def _extract_title(self, doc: 'HtmlDocument') -> str:
         """Extract page title"""
-        title_tag = soup.find('title')
+        title_tag = doc.find('title')
         if title_tag:
             return title_tag.get_text().strip()
         
         # Try h1 tag as fallback
-        h1_tag = soup.find('h1')
+        h1_tag = doc.find('h1')
         if h1_tag:
             return h1_tag.get_text().strip()
         
         return ""
     
-    def _extract_description(self, soup: BeautifulSoup) -> str:
+    def _extract_description(self, doc: 'HtmlDocument') -> str:
         """Extract meta description"""
-        meta_desc = soup.find('meta', attrs={'name': 'description'})
-        if meta_desc:
-            return meta_desc.get('content', '').strip()
+        meta_desc = doc.meta_content(name='description')
+        if meta_desc is not None:
+            return meta_desc.strip()
         
         # Try Open Graph description
-        og_desc = soup.find('meta', attrs={'property': 'og:description'})
-        if og_desc:
-            return og_desc.get('content', '').strip()
+        og_desc = doc.meta_content(property='og:description')
+        if og_desc is not None:
+            return og_desc.strip()
         
         return ""
     
-    def _extract_main_content(self, soup: BeautifulSoup) -> str:
+    def _extract_main_content(self, doc: 'HtmlDocument') -> str:
         """Extract main content from the page"""
         # Remove script and style elements
-        for script in soup(["script", "style", "nav", "footer", "header"]):
-            script.decompose()
+        doc.remove("script", "style", "nav", "footer", "header")
         
         # Try to find main content areas
         main_content = ""
@@ -189,21 +191,21 @@ class ITOsWebScraper:
         ]
         
         for selector in content_selectors:
-            content_elem = soup.select_one(selector)
+            content_elem = doc.select_one(selector)
             if content_elem:
                 main_content = content_elem.get_text()
                 break
         
         # If no main content found, get all text
         if not main_content:
-            main_content = soup.get_text()
+            main_content = doc.soup.get_text()
         
         # Clean up the text
         main_content = re.sub(r'\s+', ' ', main_content).strip()
         
         return main_content
     
-    def _extract_marketing_text(self, soup: BeautifulSoup) -> List[str]:
+    def _extract_marketing_text(self, doc: 'HtmlDocument') -> List[str]:
         """Extract marketing-focused text"""
         marketing_text = []
         
@@ -214,9 +216,9 @@ class ITOsWebScraper:
         ]
         
         for selector in marketing_selectors:
-            elements = soup.select(selector)
+            elements = doc.select(selector)
             for elem in elements:
-                text = elem.get_text().strip()
+                text = doc.text(elem).strip()
                 if text and len(text) > 10:  # Filter out very short text
                     marketing_text.append(text)
         
@@ -225,7 +227,7 @@ class ITOsWebScraper:
         
         return marketing_text
     
-    def _extract_services(self, soup: BeautifulSoup) -> List[str]:
+    def _extract_services(self, doc: 'HtmlDocument') -> List[str]:
         """Extract services or tour offerings"""
         services = []
         
@@ -236,9 +238,9 @@ class ITOsWebScraper:
         ]
         
         for selector in service_selectors:
-            elements = soup.select(selector)
+            elements = doc.select(selector)
             for elem in elements:
-                text = elem.get_text().strip()
+                text = doc.text(elem).strip()
                 # Filter for service-like text
                 if (text and len(text) > 5 and len(text) < 200 and 
                     any(keyword in text.lower() for keyword in ['tour', 'package', 'service', 'experience', 'adventure', 'safari', 'excursion'])):
@@ -0,0 +1,407 @@
+"""
+On-Disk Fetch Cache
+Pages fetched by the scrapers are kept on disk, keyed by normalized URL, with
+their ETag/Last-Modified validators. Fresh entries are served without any
+network; stale ones are revalidated with a conditional GET. Bodies are stored
+gzip-compressed under their SHA-256, so identical pages share one file, and the
+least recently used entries are evicted once the cache outgrows its byte budget.
+
+Offline replay (FETCH_CACHE_OFFLINE=1, or offline=True) serves every cached
+page regardless of age and never touches the network, so re-running an
+analyzer over pages fetched earlier needs no connection.
+"""
+
+import argparse
+import gzip
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import urllib.parse
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import requests
+    from requests.structures import CaseInsensitiveDict
+except ImportError:
+    requests = None
+    CaseInsensitiveDict = dict
+
+DEFAULT_CACHE_DIR = os.environ.get(
+    'FETCH_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'tourism-commons', 'fetch')
+)
+DEFAULT_TTL_SECONDS = int(os.environ.get('FETCH_CACHE_TTL', 24 * 3600))
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+# Eviction trims down to this fraction of the budget so it doesn't run on every store
+EVICT_TARGET_RATIO = 0.9
+DEFAULT_TIMEOUT_SECONDS = 15
+
+# Query parameters that never change page content
+TRACKING_PARAMS = {'fbclid', 'gclid', 'msclkid', 'mc_cid', 'mc_eid', '_ga'}
+
+
+class OfflineCacheMiss(Exception):
+    """Raised in offline mode for a URL that was never cached"""
+
+
+def normalize_url(url: str) -> str:
+    """
+    Cache key for a URL: lower-case scheme and host, default port and
+    fragment dropped, tracking parameters removed, query sorted
+    """
+    parts = urllib.parse.urlsplit(url.strip())
+    scheme = (parts.scheme or 'https').lower()
+    host = (parts.hostname or '').lower()
+    port = parts.port
+    netloc = host if port is None or (scheme, port) in (('http', 80), ('https', 443)) else f"{host}:{port}"
+    query = urllib.parse.urlencode(sorted(
+        (k, v) for k, v in urllib.parse.parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith('utm_') and k.lower() not in TRACKING_PARAMS
+    ))
+    return urllib.parse.urlunsplit((scheme, netloc, parts.path or '/', query, ''))
+
+
+class FetchedPage:
+    """The parts of a requests.Response the scrapers use, from network or cache"""
+
+    def __init__(self, url: str, status_code: int, headers: Dict[str, str], content: bytes,
+                 source: str = 'network'):
+        self.url = url
+        self.status_code = status_code
+        # Header lookups ignore case, as on requests.Response, whether the
+        # page came from the network or was rebuilt from the cache
+        self.headers = CaseInsensitiveDict(headers)
+        self.content = content
+        # 'network', 'cache' (fresh entry) or 'revalidated' (304 from the server)
+        self.source = source
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code < 400
+
+    @property
+    def from_cache(self) -> bool:
+        return self.source != 'network'
+
+    @property
+    def encoding(self) -> str:
+        content_type = self.headers.get('Content-Type', '')
+        for param in content_type.split(';')[1:]:
+            name, _, value = param.strip().partition('=')
+            if name.lower() == 'charset' and value:
+                return value.strip('"\'')
+        return 'utf-8'
+
+    @property
+    def text(self) -> str:
+        try:
+            return self.content.decode(self.encoding, errors='replace')
+        except LookupError:
+            return self.content.decode('utf-8', errors='replace')
+
+
+class FetchCache:
+    """SQLite index plus content-addressed gzip blobs"""
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, ttl_seconds: float = DEFAULT_TTL_SECONDS,
+                 max_bytes: int = DEFAULT_MAX_BYTES, offline: Optional[bool] = None):
+        """
+        Args:
+            cache_dir: Directory for the index and blobs (created if missing)
+            ttl_seconds: Age after which an entry is revalidated before use
+            max_bytes: Budget for compressed bodies on disk
+            offline: Serve only from the cache (defaults to FETCH_CACHE_OFFLINE)
+        """
+        self.cache_dir = cache_dir
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        if offline is None:
+            offline = os.environ.get('FETCH_CACHE_OFFLINE', '').lower() in ('1', 'true', 'yes')
+        self.offline = offline
+
+        os.makedirs(os.path.join(cache_dir, 'blobs'), exist_ok=True)
+        self._conn = sqlite3.connect(os.path.join(cache_dir, 'index.sqlite'),
+                                     timeout=30, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS entries ('
+            'variant TEXT NOT NULL, url TEXT NOT NULL, final_url TEXT, status INTEGER NOT NULL, '
+            'content_type TEXT, etag TEXT, last_modified TEXT, blob TEXT NOT NULL, '
+            'fetched_at REAL NOT NULL, accessed_at REAL NOT NULL, PRIMARY KEY (variant, url))'
+        )
+        self._conn.execute('CREATE TABLE IF NOT EXISTS blobs (hash TEXT PRIMARY KEY, size INTEGER NOT NULL)')
+        self._conn.commit()
+        self._lock = threading.Lock()
+
+        # Counters for this process, see print_summary()
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self.offline_misses = 0
+        self.bytes_from_cache = 0
+
+    # -- storage --------------------------------------------------------
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self.cache_dir, 'blobs', digest[:2], f"{digest}.gz")
+
+    def _read_blob(self, digest: str) -> Optional[bytes]:
+        try:
+            with gzip.open(self._blob_path(digest), 'rb') as f:
+                return f.read()
+        except (OSError, EOFError):
+            return None
+
+    def _write_blob(self, body: bytes) -> str:
+        digest = hashlib.sha256(body).hexdigest()
+        path = self._blob_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(gzip.compress(body, compresslevel=6))
+            os.replace(tmp_path, path)
+        with self._lock:
+            self._conn.execute('INSERT OR REPLACE INTO blobs (hash, size) VALUES (?, ?)',
+                               (digest, os.path.getsize(path)))
+            self._conn.commit()
+        return digest
+
+    def _entry(self, variant: str, key: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT final_url, status, content_type, etag, last_modified, blob, fetched_at '
+                'FROM entries WHERE variant = ? AND url = ?', (variant, key)
+            ).fetchone()
+        if row is None:
+            return None
+        entry = dict(zip(('final_url', 'status', 'content_type', 'etag', 'last_modified', 'blob',
+                          'fetched_at'), row))
+        entry['variant'] = variant
+        return entry
+
+    def _page(self, key: str, entry: Dict, source: str) -> Optional[FetchedPage]:
+        body = self._read_blob(entry['blob'])
+        if body is None:
+            return None
+        with self._lock:
+            self._conn.execute('UPDATE entries SET accessed_at = ? WHERE variant = ? AND url = ?',
+                               (time.time(), entry['variant'], key))
+            self._conn.commit()
+        headers = {'Content-Type': entry['content_type'] or 'text/html'}
+        if entry['etag']:
+            headers['ETag'] = entry['etag']
+        if entry['last_modified']:
+            headers['Last-Modified'] = entry['last_modified']
+        self.bytes_from_cache += len(body)
+        return FetchedPage(entry['final_url'] or key, entry['status'], headers, body, source)
+
+    def _drop_blob_if_unused(self, digest: str) -> int:
+        """Delete a body no entry points at any more; returns bytes freed (lock held)"""
+        if self._conn.execute('SELECT 1 FROM entries WHERE blob = ? LIMIT 1', (digest,)).fetchone():
+            return 0
+        size = self._conn.execute('SELECT size FROM blobs WHERE hash = ?', (digest,)).fetchone()
+        self._conn.execute('DELETE FROM blobs WHERE hash = ?', (digest,))
+        try:
+            os.remove(self._blob_path(digest))
+        except OSError:
+            pass
+        return size[0] if size else 0
+
+    def put(self, url: str, body: bytes, headers: Optional[Dict[str, str]] = None,
+            status: int = 200, final_url: Optional[str] = None, variant: str = 'raw'):
+        """
+        Store a body for a URL. variant separates different renderings of the
+        same URL, e.g. 'raw' HTTP bodies and 'rendered' browser HTML.
+        """
+        headers = {k.lower(): v for k, v in (headers or {}).items()}
+        key = normalize_url(url)
+        digest = self._write_blob(body)
+        now = time.time()
+        with self._lock:
+            previous = self._conn.execute('SELECT blob FROM entries WHERE variant = ? AND url = ?',
+                                          (variant, key)).fetchone()
+            self._conn.execute(
+                'INSERT OR REPLACE INTO entries (variant, url, final_url, status, content_type, etag, '
+                'last_modified, blob, fetched_at, accessed_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (variant, key, final_url or url, status, headers.get('content-type'),
+                 headers.get('etag'), headers.get('last-modified'), digest, now, now)
+            )
+            if previous and previous[0] != digest:
+                self._drop_blob_if_unused(previous[0])
+            self._conn.commit()
+        self.evict()
+
+    def evict(self):
+        """Drop least recently used entries until bodies fit the byte budget"""
+        with self._lock:
+            total = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM blobs').fetchone()[0]
+            if total <= self.max_bytes:
+                return
+            # Bodies left behind by an interrupted run
+            for (digest,) in self._conn.execute(
+                    'SELECT hash FROM blobs WHERE hash NOT IN (SELECT blob FROM entries)').fetchall():
+                total -= self._drop_blob_if_unused(digest)
+            target = self.max_bytes * EVICT_TARGET_RATIO
+            for variant, url, digest in self._conn.execute(
+                    'SELECT variant, url, blob FROM entries ORDER BY accessed_at').fetchall():
+                if total <= target:
+                    break
+                self._conn.execute('DELETE FROM entries WHERE variant = ? AND url = ?', (variant, url))
+                total -= self._drop_blob_if_unused(digest)
+            self._conn.commit()
+
+    # -- lookups --------------------------------------------------------
+
+    def lookup(self, url: str, variant: str = 'raw', max_age: Optional[float] = None) -> Optional[FetchedPage]:
+        """
+        Cached page without any network access: fresh entries only, or any
+        age in offline mode
+
+        Args:
+            max_age: Freshness limit in seconds (defaults to the cache TTL)
+        """
+        key = normalize_url(url)
+        entry = self._entry(variant, key)
+        if entry is None:
+            return None
+        age = time.time() - entry['fetched_at']
+        if not self.offline and age >= (self.ttl_seconds if max_age is None else max_age):
+            return None
+        page = self._page(key, entry, 'cache')
+        if page is not None:
+            self.hits += 1
+        return page
+
+    def urls(self, variant: Optional[str] = None) -> List[Tuple[str, str]]:
+        """(url, variant) of every cached page, optionally one variant only, newest first"""
+        with self._lock:
+            if variant is None:
+                rows = self._conn.execute('SELECT url, variant FROM entries ORDER BY fetched_at DESC').fetchall()
+            else:
+                rows = self._conn.execute('SELECT url, variant FROM entries WHERE variant = ? '
+                                          'ORDER BY fetched_at DESC', (variant,)).fetchall()
+        return rows
+
+    def is_fresh(self, url: str, variant: str = 'raw') -> bool:
+        """Whether lookup() would answer this URL, without reading the body"""
+        entry = self._entry(variant, normalize_url(url))
+        if entry is None:
+            return False
+        return self.offline or time.time() - entry['fetched_at'] < self.ttl_seconds
+
+    def get(self, url: str, headers: Optional[Dict[str, str]] = None,
+            timeout: float = DEFAULT_TIMEOUT_SECONDS, session=None) -> FetchedPage:
+        """
+        GET through the cache. Fresh entries are returned as they are, stale
+        ones revalidated; only 200 responses are stored.
+
+        Raises:
+            OfflineCacheMiss: In offline mode, for a URL that isn't cached
+            Network errors from requests, as a plain requests.get would
+        """
+        key = normalize_url(url)
+        entry = self._entry('raw', key)
+        if entry is not None and (self.offline or time.time() - entry['fetched_at'] < self.ttl_seconds):
+            page = self._page(key, entry, 'cache')
+            if page is not None:
+                self.hits += 1
+                return page
+            entry = None  # Blob went missing; fetch again
+        if self.offline:
+            self.offline_misses += 1
+            raise OfflineCacheMiss(f"Not in fetch cache (offline mode): {url}")
+
+        request_headers = dict(headers or {})
+        if entry is not None:
+            if entry['etag']:
+                request_headers['If-None-Match'] = entry['etag']
+            if entry['last_modified']:
+                request_headers['If-Modified-Since'] = entry['last_modified']
+
+        http = session or requests
+        response = http.get(url, headers=request_headers, timeout=timeout, allow_redirects=True)
+
+        if response.status_code == 304 and entry is not None:
+            with self._lock:
+                self._conn.execute('UPDATE entries SET fetched_at = ? WHERE variant = ? AND url = ?',
+                                   (time.time(), 'raw', key))
+                self._conn.commit()
+            page = self._page(key, entry, 'revalidated')
+            if page is not None:
+                self.revalidated += 1
+                return page
+            # Blob vanished between lookup and 304 - fetch unconditionally
+            response = http.get(url, headers=headers or {}, timeout=timeout, allow_redirects=True)
+
+        self.misses += 1
+        page = FetchedPage(response.url, response.status_code, response.headers, response.content)
+        if response.status_code == 200:
+            self.put(url, response.content, response.headers, final_url=response.url)
+        return page
+
+    def stats(self) -> Dict:
+        with self._lock:
+            entries = self._conn.execute('SELECT COUNT(*) FROM entries').fetchone()[0]
+            blobs, size = self._conn.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM blobs').fetchone()
+        return {
+            'entries': entries,
+            'blobs': blobs,
+            'bytes_on_disk': size,
+            'hits': self.hits,
+            'revalidated': self.revalidated,
+            'misses': self.misses,
+            'offline_misses': self.offline_misses,
+            'bytes_from_cache': self.bytes_from_cache,
+        }
+
+    def print_summary(self):
+        stats = self.stats()
+        mode = ' (offline)' if self.offline else ''
+        print(f"\n🗄️  Fetch cache{mode}: {stats['hits']} hits, {stats['revalidated']} revalidated, "
+              f"{stats['misses']} fetched, {stats['offline_misses']} offline misses")
+        print(f"   {stats['bytes_from_cache'] / 1_048_576:.1f} MB served from cache; "
+              f"{stats['entries']} entries, {stats['bytes_on_disk'] / 1_048_576:.1f} MB on disk")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_caches: Dict[str, FetchCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_fetch_cache(cache_dir: str = DEFAULT_CACHE_DIR) -> FetchCache:
+    """Return the process-wide cache for a directory, opening it on first use"""
+    with _caches_lock:
+        cache = _caches.get(cache_dir)
+        if cache is None:
+            cache = FetchCache(cache_dir)
+            _caches[cache_dir] = cache
+        return cache
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Inspect or prune the on-disk fetch cache')
+    parser.add_argument('--dir', default=DEFAULT_CACHE_DIR, help='Cache directory')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    subparsers.add_parser('info', help='Show entry count and size')
+    prune = subparsers.add_parser('prune', help='Evict least recently used entries down to a size')
+    prune.add_argument('--max-mb', type=float, required=True, help='Size to prune to, in MB')
+    args = parser.parse_args()
+
+    cache = FetchCache(args.dir)
+    if args.command == 'prune':
+        cache.max_bytes = int(args.max_mb * 1024 * 1024)
+        cache.evict()
+    stats = cache.stats()
+    print(f"🗄️  {args.dir}")
+    print(f"   {stats['entries']} entries, {stats['blobs']} bodies, "
+          f"{stats['bytes_on_disk'] / 1_048_576:.1f} MB on disk")
+    cache.close()
+
+
+if __name__ == '__main__':
+    main()
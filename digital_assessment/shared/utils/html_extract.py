@@ -0,0 +1,146 @@
+"""
+Single-Pass HTML Extraction
+Parses a page once (with lxml when it's installed) and indexes every element
+by tag name, class and id in one walk of the tree. The simple selectors the
+scrapers use ('tag', '.class', '#id', '[class*="x"]', '[attr="v"]' and
+comma-separated lists of those) are then answered from the index instead of
+walking the whole tree again for each one; anything more complex falls back
+to BeautifulSoup's select().
+"""
+
+import os
+import re
+from typing import Dict, List, Optional
+
+from bs4 import BeautifulSoup, Tag
+
+try:
+    import lxml  # noqa: F401 - only checking the parser backend is available
+    DEFAULT_PARSER = 'lxml'
+except ImportError:
+    DEFAULT_PARSER = 'html.parser'
+
+# HTML_PARSER=html.parser reproduces the old parser's tree exactly when needed
+PARSER = os.environ.get('HTML_PARSER', DEFAULT_PARSER)
+
+_SIMPLE_SELECTOR = re.compile(
+    r'^(?:(?P<tag>[a-zA-Z][a-zA-Z0-9]*)'
+    r'|\.(?P<cls>[\w-]+)'
+    r'|#(?P<id>[\w-]+)'
+    r'|\[(?P<attr>[\w-]+)(?P<op>\*?=)"(?P<value>[^"]*)"\])$'
+)
+
+
+class HtmlDocument:
+    """A parsed page plus an element index built in a single traversal"""
+
+    def __init__(self, html, parser: str = PARSER):
+        self.soup = BeautifulSoup(html, parser)
+        self._order: Dict[int, int] = {}
+        self._tags: List[Tag] = []
+        self._by_name: Dict[str, List[Tag]] = {}
+        self._by_class: Dict[str, List[Tag]] = {}
+        self._by_class_value: Dict[str, List[Tag]] = {}
+        self._by_id: Dict[str, List[Tag]] = {}
+        self._text_cache: Dict = {}
+        self._generation = 0
+
+        for position, tag in enumerate(self.soup.find_all(True)):
+            self._order[id(tag)] = position
+            self._tags.append(tag)
+            self._by_name.setdefault(tag.name, []).append(tag)
+            classes = tag.get('class')
+            if classes:
+                if isinstance(classes, str):
+                    classes = classes.split()
+                for cls in set(classes):
+                    self._by_class.setdefault(cls, []).append(tag)
+                self._by_class_value.setdefault(' '.join(classes), []).append(tag)
+            tag_id = tag.get('id')
+            if tag_id:
+                self._by_id.setdefault(tag_id, []).append(tag)
+
+    def _live(self, tags: List[Tag]) -> List[Tag]:
+        """Drop elements that were inside a removed subtree"""
+        if not self._generation:
+            return list(tags)
+        return [tag for tag in tags if not tag.decomposed]
+
+    def _match(self, selector: str) -> Optional[List[Tag]]:
+        """Index lookup for one simple selector, or None if it isn't one"""
+        match = _SIMPLE_SELECTOR.match(selector)
+        if not match:
+            return None
+        if match.group('tag'):
+            return self._by_name.get(match.group('tag').lower(), [])
+        if match.group('cls'):
+            return self._by_class.get(match.group('cls'), [])
+        if match.group('id'):
+            return self._by_id.get(match.group('id'), [])
+
+        attr, op, value = match.group('attr'), match.group('op'), match.group('value')
+        if attr == 'class' and op == '*=':
+            if not value:
+                return []
+            tags = [tag for class_value, group in self._by_class_value.items()
+                    if value in class_value for tag in group]
+            return sorted(tags, key=lambda tag: self._order[id(tag)])
+        if attr == 'id' and op == '=':
+            return self._by_id.get(value, [])
+        tags = self._live(self._tags)
+        if op == '=':
+            return [tag for tag in tags if tag.get(attr) == value]
+        return [tag for tag in tags if value and value in (tag.get(attr) or '')]
+
+    def select(self, selector: str, limit: Optional[int] = None) -> List[Tag]:
+        """Elements matching a CSS selector, in document order"""
+        parts = [part.strip() for part in selector.split(',')]
+        groups = [self._match(part) for part in parts]
+        if any(group is None for group in groups):
+            return self.soup.select(selector, limit=limit or None)
+        if len(groups) == 1:
+            tags = self._live(groups[0])
+        else:
+            seen = {}
+            for group in groups:
+                for tag in group:
+                    seen[id(tag)] = tag
+            tags = self._live(sorted(seen.values(), key=lambda tag: self._order[id(tag)]))
+        return tags[:limit] if limit else tags
+
+    def select_one(self, selector: str) -> Optional[Tag]:
+        tags = self.select(selector, limit=1)
+        return tags[0] if tags else None
+
+    def find_all(self, name: str, limit: Optional[int] = None) -> List[Tag]:
+        tags = self._live(self._by_name.get(name, []))
+        return tags[:limit] if limit else tags
+
+    def find(self, name: str) -> Optional[Tag]:
+        tags = self.find_all(name, limit=1)
+        return tags[0] if tags else None
+
+    def meta_content(self, name: Optional[str] = None, property: Optional[str] = None) -> Optional[str]:
+        """content of the first <meta name=...> (or property=...), None if absent"""
+        for tag in self.find_all('meta'):
+            if (name is not None and tag.get('name') == name) or \
+                    (property is not None and tag.get('property') == property):
+                return tag.get('content', '')
+        return None
+
+    def remove(self, *names: str):
+        """Decompose every element with one of these tag names (and its subtree)"""
+        for name in names:
+            for tag in self._live(self._by_name.get(name, [])):
+                if not tag.decomposed:
+                    tag.decompose()
+        self._generation += 1
+
+    def text(self, tag, separator: str = '', strip: bool = False) -> str:
+        """get_text() of an element, computed once per element until the next remove()"""
+        key = (id(tag), separator, strip, self._generation)
+        text = self._text_cache.get(key)
+        if text is None:
+            text = tag.get_text(separator=separator, strip=strip)
+            self._text_cache[key] = text
+        return text
@@ -0,0 +1,367 @@
+"""
+Request and Upstream Metrics
+In-process latency histograms, request/error counts, upstream call timings
+(Sheets, OpenAI, scraping) and cache hit ratios, exported as JSON or in the
+Prometheus text format from each server's /api/metrics endpoint
+"""
+
+import bisect
+import json
+import threading
+import time
+import urllib.parse
+from collections import Counter
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Tuple
+
+# Upper bounds in seconds (Prometheus-style cumulative buckets)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+# Window used for the JSON requests-per-second figure
+RATE_WINDOW_SECONDS = 60
+METRIC_PREFIX = 'dashboard'
+
+
+class Histogram:
+    """Fixed-bucket latency histogram"""
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile by interpolating inside its bucket"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            if seen + bucket_count >= rank and bucket_count:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.max
+                estimate = lower + (upper - lower) * (rank - seen) / bucket_count
+                return min(estimate, self.max)
+            seen += bucket_count
+        return self.max
+
+    def to_dict(self) -> Dict:
+        return {
+            'count': self.count,
+            'mean_ms': round(self.sum / self.count * 1000, 3) if self.count else 0.0,
+            'p50_ms': round(self.quantile(0.50) * 1000, 3),
+            'p95_ms': round(self.quantile(0.95) * 1000, 3),
+            'p99_ms': round(self.quantile(0.99) * 1000, 3),
+            'max_ms': round(self.max * 1000, 3),
+        }
+
+
+class RateWindow:
+    """Events per second over the last RATE_WINDOW_SECONDS, in one-second slots"""
+
+    def __init__(self, seconds: int = RATE_WINDOW_SECONDS):
+        self.seconds = seconds
+        self.slots = [0] * seconds
+        self.slot_times = [0] * seconds
+
+    def add(self, now: float):
+        second = int(now)
+        i = second % self.seconds
+        if self.slot_times[i] != second:
+            self.slot_times[i] = second
+            self.slots[i] = 0
+        self.slots[i] += 1
+
+    def rate(self, now: float) -> float:
+        cutoff = int(now) - self.seconds
+        total = sum(c for c, t in zip(self.slots, self.slot_times) if t > cutoff)
+        return total / self.seconds
+
+
+class MetricsRegistry:
+    """All metrics for one server process"""
+
+    def __init__(self, server: str = ''):
+        self.server = server
+        self.started = time.time()
+        self._lock = threading.Lock()
+        # (route, method) -> [Histogram, Counter of status codes]
+        self._requests: Dict[Tuple[str, str], list] = {}
+        # (kind, operation) -> [Histogram, error count]
+        self._upstream: Dict[Tuple[str, str], list] = {}
+        # stage -> Histogram (time spent in our own code, e.g. JSON encoding)
+        self._stages: Dict[str, Histogram] = {}
+        # cache name -> callable returning (hits, misses)
+        self._caches: Dict[str, Callable[[], Tuple[int, int]]] = {}
+        self._rate = RateWindow()
+
+    def observe_request(self, route: str, method: str, status: int, seconds: float):
+        with self._lock:
+            entry = self._requests.get((route, method))
+            if entry is None:
+                entry = self._requests[(route, method)] = [Histogram(), Counter()]
+            entry[0].observe(seconds)
+            entry[1][status] += 1
+            self._rate.add(time.time())
+
+    def observe_upstream(self, kind: str, operation: str, seconds: float, ok: bool = True):
+        with self._lock:
+            entry = self._upstream.get((kind, operation))
+            if entry is None:
+                entry = self._upstream[(kind, operation)] = [Histogram(), 0]
+            entry[0].observe(seconds)
+            if not ok:
+                entry[1] += 1
+
+    def observe_stage(self, stage: str, seconds: float):
+        with self._lock:
+            histogram = self._stages.get(stage)
+            if histogram is None:
+                histogram = self._stages[stage] = Histogram()
+            histogram.observe(seconds)
+
+    def register_cache(self, name: str, stats: Callable[[], Tuple[int, int]]):
+        """Report a cache's hit ratio; stats() returns (hits, misses) when scraped"""
+        with self._lock:
+            self._caches[name] = stats
+
+    def _cache_stats(self) -> Dict[str, Tuple[int, int]]:
+        stats = {}
+        for name, fn in list(self._caches.items()):
+            try:
+                stats[name] = tuple(fn())
+            except Exception:
+                continue
+        return stats
+
+    def to_dict(self) -> Dict:
+        """Everything as a JSON-serialisable dict (latencies in milliseconds)"""
+        now = time.time()
+        with self._lock:
+            uptime = now - self.started
+            routes = []
+            for (route, method), (histogram, statuses) in sorted(self._requests.items()):
+                errors = sum(n for status, n in statuses.items() if status >= 500)
+                routes.append({
+                    'route': route,
+                    'method': method,
+                    'requests': histogram.count,
+                    'errors': errors,
+                    'statuses': {str(s): n for s, n in sorted(statuses.items())},
+                    'latency': histogram.to_dict(),
+                })
+            upstream = [
+                {'kind': kind, 'operation': operation, 'calls': histogram.count,
+                 'errors': errors, 'latency': histogram.to_dict()}
+                for (kind, operation), (histogram, errors) in sorted(self._upstream.items())
+            ]
+            stages = {stage: h.to_dict() for stage, h in sorted(self._stages.items())}
+            total = sum(r['requests'] for r in routes)
+            rate = self._rate.rate(now)
+
+        caches = {}
+        for name, (hits, misses) in sorted(self._cache_stats().items()):
+            lookups = hits + misses
+            caches[name] = {
+                'hits': hits,
+                'misses': misses,
+                'hit_ratio': round(hits / lookups, 4) if lookups else None,
+            }
+
+        return {
+            'server': self.server,
+            'uptime_seconds': round(uptime, 1),
+            'requests_total': total,
+            'requests_per_second': round(rate, 3),
+            'routes': routes,
+            'upstream': upstream,
+            'stages': stages,
+            'caches': caches,
+        }
+
+    def to_prometheus(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)"""
+        lines: List[str] = []
+        server = {'server': self.server}
+        with self._lock:
+            uptime = time.time() - self.started
+            requests = sorted(self._requests.items())
+            upstream = sorted(self._upstream.items())
+            stages = sorted(self._stages.items())
+
+            _help(lines, 'http_request_duration_seconds', 'histogram', 'Time to handle a request')
+            for (route, method), (histogram, _) in requests:
+                _histogram(lines, 'http_request_duration_seconds', histogram,
+                           dict(server, route=route, method=method))
+
+            _help(lines, 'http_requests_total', 'counter', 'Requests handled, by status code')
+            for (route, method), (_, statuses) in requests:
+                for status, n in sorted(statuses.items()):
+                    _sample(lines, 'http_requests_total', n,
+                            dict(server, route=route, method=method, status=str(status)))
+
+            _help(lines, 'upstream_duration_seconds', 'histogram',
+                  'Time spent in calls to Sheets, OpenAI, scraped sites and other upstreams')
+            for (kind, operation), (histogram, _) in upstream:
+                _histogram(lines, 'upstream_duration_seconds', histogram,
+                           dict(server, kind=kind, operation=operation))
+
+            _help(lines, 'upstream_errors_total', 'counter', 'Upstream calls that raised')
+            for (kind, operation), (_, errors) in upstream:
+                _sample(lines, 'upstream_errors_total', errors,
+                        dict(server, kind=kind, operation=operation))
+
+            _help(lines, 'stage_duration_seconds', 'histogram', 'Time spent in in-process stages')
+            for stage, histogram in stages:
+                _histogram(lines, 'stage_duration_seconds', histogram, dict(server, stage=stage))
+
+        cache_stats = sorted(self._cache_stats().items())
+        _help(lines, 'cache_hits_total', 'counter', 'Cache lookups that hit')
+        for name, (hits, _) in cache_stats:
+            _sample(lines, 'cache_hits_total', hits, dict(server, cache=name))
+        _help(lines, 'cache_misses_total', 'counter', 'Cache lookups that missed')
+        for name, (_, misses) in cache_stats:
+            _sample(lines, 'cache_misses_total', misses, dict(server, cache=name))
+
+        _help(lines, 'uptime_seconds', 'gauge', 'Seconds since the server started')
+        _sample(lines, 'uptime_seconds', round(uptime, 3), server)
+        return '\n'.join(lines) + '\n'
+
+
+def _labels(labels: Dict[str, str]) -> str:
+    def escape(value):
+        return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    return '{' + ','.join(f'{k}="{escape(v)}"' for k, v in labels.items()) + '}'
+
+
+def _help(lines: List[str], name: str, metric_type: str, text: str):
+    lines.append(f'# HELP {METRIC_PREFIX}_{name} {text}')
+    lines.append(f'# TYPE {METRIC_PREFIX}_{name} {metric_type}')
+
+
+def _sample(lines: List[str], name: str, value, labels: Dict[str, str]):
+    lines.append(f'{METRIC_PREFIX}_{name}{_labels(labels)} {value}')
+
+
+def _histogram(lines: List[str], name: str, histogram: Histogram, labels: Dict[str, str]):
+    cumulative = 0
+    for bound, n in zip(histogram.buckets, histogram.counts):
+        cumulative += n
+        _sample(lines, f'{name}_bucket', cumulative, dict(labels, le=repr(bound)))
+    _sample(lines, f'{name}_bucket', histogram.count, dict(labels, le='+Inf'))
+    _sample(lines, f'{name}_sum', round(histogram.sum, 6), labels)
+    _sample(lines, f'{name}_count', histogram.count, labels)
+
+
+# One registry per process - each server sets its name when it starts
+registry = MetricsRegistry()
+
+
+@contextmanager
+def time_upstream(kind: str, operation: str):
+    """
+    Time a call to an upstream service
+
+    Args:
+        kind: 'sheets', 'openai', 'scrape', ...
+        operation: What was called (e.g. 'batchGet', 'chat.completions')
+    """
+    start = time.perf_counter()
+    ok = False
+    try:
+        yield
+        ok = True
+    finally:
+        registry.observe_upstream(kind, operation, time.perf_counter() - start, ok)
+
+
+@contextmanager
+def time_stage(stage: str):
+    """Time a stage of request handling in our own code"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        registry.observe_stage(stage, time.perf_counter() - start)
+
+
+class MetricsHandlerMixin:
+    """
+    Mix into a BaseHTTPRequestHandler subclass (before it in the bases) to
+    record the route, status and latency of every request
+    """
+
+    # Paths under these prefixes are reported as one route (e.g. per-name URLs)
+    metrics_route_prefixes: Tuple[str, ...] = ()
+
+    def handle_one_request(self):
+        self._metrics_start = None
+        self._metrics_status = None
+        try:
+            super().handle_one_request()
+        finally:
+            if self._metrics_start is not None and self._metrics_status is not None:
+                registry.observe_request(self.metrics_route(), self.command or '-',
+                                         self._metrics_status,
+                                         time.perf_counter() - self._metrics_start)
+
+    def parse_request(self):
+        # Timing starts once the request line is in, not while a kept-alive
+        # connection sits idle waiting for it
+        self._metrics_start = time.perf_counter()
+        return super().parse_request()
+
+    def send_response(self, code, message=None):
+        self._metrics_status = code
+        super().send_response(code, message)
+
+    def metrics_route(self) -> str:
+        """Route label for a request - bounded so URLs can't explode the label set"""
+        path = urllib.parse.urlsplit(self.path or '').path
+        if not path.startswith('/api/'):
+            return 'static'
+        if self._metrics_status == 404:
+            return 'unmatched'
+        for prefix in self.metrics_route_prefixes:
+            if path.startswith(prefix):
+                return prefix + '*'
+        return path
+
+    def send_metrics_response(self):
+        """Serve /api/metrics as JSON, or Prometheus text with ?format=prometheus"""
+        query = urllib.parse.parse_qs(urllib.parse.urlsplit(self.path).query)
+        fmt = query.get('format', [''])[0]
+        if fmt == 'prometheus' or (not fmt and 'text/plain' in self.headers.get('Accept', '')):
+            body = registry.to_prometheus().encode('utf-8')
+            content_type = 'text/plain; version=0.0.4; charset=utf-8'
+        else:
+            body = json.dumps(registry.to_dict()).encode('utf-8')
+            content_type = 'application/json'
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def print_upstream_summary():
+    """Print upstream call timings - for batch scripts that have no /api/metrics"""
+    upstream = registry.to_dict()['upstream']
+    if not upstream:
+        return
+    print("\n⏱️  Upstream call timings:")
+    for call in upstream:
+        latency = call['latency']
+        print(f"   {call['kind']:<8} {call['operation']:<20} {call['calls']:>5} calls  "
+              f"p50 {latency['p50_ms']:.0f} ms  p95 {latency['p95_ms']:.0f} ms  "
+              f"max {latency['max_ms']:.0f} ms  errors {call['errors']}")
@@ -0,0 +1,173 @@
+"""
+Persistent Search Result Cache
+Custom Search responses are kept in SQLite, keyed by the normalized query
+(lower-cased, whitespace collapsed) and the number of results requested, so
+re-running a batch repeats no queries against the daily quota. Entries older
+than SEARCH_CACHE_TTL seconds (default 30 days) are refetched.
+
+Offline replay (SEARCH_CACHE_OFFLINE=1, or offline=True) serves every cached
+query regardless of age and never calls the API; uncached queries come back
+empty.
+"""
+
+import argparse
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+DEFAULT_CACHE_DIR = os.environ.get(
+    'SEARCH_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'tourism-commons', 'search')
+)
+DEFAULT_TTL_SECONDS = int(os.environ.get('SEARCH_CACHE_TTL', 30 * 24 * 3600))
+
+
+def normalize_query(query: str) -> str:
+    """Cache key for a query: lower-case with runs of whitespace collapsed"""
+    return re.sub(r'\s+', ' ', query).strip().lower()
+
+
+class SearchCache:
+    """(normalized query, num_results) -> list of search result items"""
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, ttl_seconds: float = DEFAULT_TTL_SECONDS,
+                 offline: Optional[bool] = None):
+        """
+        Args:
+            cache_dir: Directory for the SQLite file (created if missing)
+            ttl_seconds: Age after which a query is sent to the API again
+            offline: Serve only from the cache (defaults to SEARCH_CACHE_OFFLINE)
+        """
+        self.cache_dir = cache_dir
+        self.ttl_seconds = ttl_seconds
+        if offline is None:
+            offline = os.environ.get('SEARCH_CACHE_OFFLINE', '').lower() in ('1', 'true', 'yes')
+        self.offline = offline
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self._conn = sqlite3.connect(os.path.join(cache_dir, 'search.sqlite'),
+                                     timeout=30, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS searches ('
+            'query TEXT NOT NULL, num_results INTEGER NOT NULL, items TEXT NOT NULL, '
+            'fetched_at REAL NOT NULL, PRIMARY KEY (query, num_results))'
+        )
+        self._conn.commit()
+        self._lock = threading.Lock()
+
+        # Counters for this process, see print_summary()
+        self.hits = 0
+        self.misses = 0
+        self.offline_misses = 0
+        self.stores = 0
+
+    def get(self, query: str, num_results: int) -> Optional[List[Dict]]:
+        """
+        Cached items for this query, or None on a miss or an expired entry
+        (expired entries are still served in offline mode)
+        """
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT items, fetched_at FROM searches WHERE query = ? AND num_results = ?',
+                (normalize_query(query), num_results)
+            ).fetchone()
+        if row is not None and (self.offline or time.time() - row[1] < self.ttl_seconds):
+            self.hits += 1
+            return json.loads(row[0])
+        if self.offline:
+            self.offline_misses += 1
+        else:
+            self.misses += 1
+        return None
+
+    def is_fresh(self, query: str, num_results: int) -> bool:
+        """Whether get() would answer this query, without counting a lookup"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT fetched_at FROM searches WHERE query = ? AND num_results = ?',
+                (normalize_query(query), num_results)
+            ).fetchone()
+        return row is not None and (self.offline or time.time() - row[0] < self.ttl_seconds)
+
+    def put(self, query: str, num_results: int, items: List[Dict]):
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO searches (query, num_results, items, fetched_at) VALUES (?, ?, ?, ?)',
+                (normalize_query(query), num_results, json.dumps(items), time.time())
+            )
+            self._conn.commit()
+        self.stores += 1
+
+    def prune(self, older_than_seconds: float) -> int:
+        """Delete entries older than this; returns the number removed"""
+        cutoff = time.time() - older_than_seconds
+        with self._lock:
+            cursor = self._conn.execute('DELETE FROM searches WHERE fetched_at < ?', (cutoff,))
+            self._conn.commit()
+        return cursor.rowcount
+
+    def stats(self) -> Dict:
+        with self._lock:
+            entries, oldest = self._conn.execute('SELECT COUNT(*), MIN(fetched_at) FROM searches').fetchone()
+        lookups = self.hits + self.misses + self.offline_misses
+        return {
+            'entries': entries,
+            'oldest_age_days': (time.time() - oldest) / 86400 if oldest else 0.0,
+            'hits': self.hits,
+            'misses': self.misses,
+            'offline_misses': self.offline_misses,
+            'stores': self.stores,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+    def print_summary(self):
+        stats = self.stats()
+        mode = ' (offline)' if self.offline else ''
+        print(f"\n🗄️  Search cache{mode}: {stats['hits']} hits, {stats['misses']} queried, "
+              f"{stats['offline_misses']} offline misses ({stats['hit_rate']:.0%} hit rate), "
+              f"{stats['entries']} queries stored")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_caches: Dict[str, SearchCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_search_cache(cache_dir: str = DEFAULT_CACHE_DIR) -> SearchCache:
+    """Return the process-wide cache for a directory, opening it on first use"""
+    with _caches_lock:
+        cache = _caches.get(cache_dir)
+        if cache is None:
+            cache = SearchCache(cache_dir)
+            _caches[cache_dir] = cache
+        return cache
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Inspect or prune the search result cache')
+    parser.add_argument('--dir', default=DEFAULT_CACHE_DIR, help='Cache directory')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    subparsers.add_parser('info', help='Show entry count and age')
+    prune = subparsers.add_parser('prune', help='Delete entries older than some number of days')
+    prune.add_argument('--older-than-days', type=float, required=True, help='Age cutoff in days')
+    args = parser.parse_args()
+
+    cache = SearchCache(args.dir)
+    if args.command == 'prune':
+        removed = cache.prune(args.older_than_days * 86400)
+        print(f"✅ Removed {removed} entries")
+    stats = cache.stats()
+    print(f"🗄️  {args.dir}")
+    print(f"   {stats['entries']} queries, oldest {stats['oldest_age_days']:.1f} days old")
+    cache.close()
+
+
+if __name__ == '__main__':
+    main()
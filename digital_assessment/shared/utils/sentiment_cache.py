@@ -0,0 +1,159 @@
+"""
+Persistent Sentiment Cache
+Document sentiment results are kept in SQLite, keyed by the engine that
+produced them (API and version) and the SHA-256 of the exact text sent, so
+re-analyzing an unchanged page never calls the API again. Entries can be
+given a maximum age (SENTIMENT_CACHE_MAX_AGE, in seconds) if scores should be
+refreshed periodically; by default they never expire.
+"""
+
+import argparse
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+DEFAULT_CACHE_DIR = os.environ.get(
+    'SENTIMENT_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'tourism-commons', 'sentiment')
+)
+_max_age = os.environ.get('SENTIMENT_CACHE_MAX_AGE', '')
+DEFAULT_MAX_AGE_SECONDS = float(_max_age) if _max_age else None
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class SentimentCache:
+    """(engine, content hash) -> document sentiment score and magnitude"""
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR,
+                 max_age_seconds: Optional[float] = DEFAULT_MAX_AGE_SECONDS):
+        """
+        Args:
+            cache_dir: Directory for the SQLite file (created if missing)
+            max_age_seconds: Entries older than this are ignored (None keeps them forever)
+        """
+        self.cache_dir = cache_dir
+        self.max_age_seconds = max_age_seconds
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self._conn = sqlite3.connect(os.path.join(cache_dir, 'sentiment.sqlite'),
+                                     timeout=30, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS sentiment ('
+            'engine TEXT NOT NULL, hash TEXT NOT NULL, score REAL NOT NULL, magnitude REAL, '
+            'chars INTEGER NOT NULL, created_at REAL NOT NULL, PRIMARY KEY (engine, hash))'
+        )
+        self._conn.commit()
+        self._lock = threading.Lock()
+
+        # Counters for this process, see print_summary()
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+
+    def get(self, engine: str, text: str) -> Optional[Dict]:
+        """
+        Cached result for exactly this text from this engine
+
+        Returns:
+            {'score', 'magnitude', 'created_at'}, or None on a miss or an expired entry
+        """
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT score, magnitude, created_at FROM sentiment WHERE engine = ? AND hash = ?',
+                (engine, content_hash(text))
+            ).fetchone()
+        if row is None or (self.max_age_seconds is not None and time.time() - row[2] >= self.max_age_seconds):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return {'score': row[0], 'magnitude': row[1], 'created_at': row[2]}
+
+    def put(self, engine: str, text: str, score: float, magnitude: Optional[float] = None):
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO sentiment (engine, hash, score, magnitude, chars, created_at) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (engine, content_hash(text), score, magnitude, len(text), time.time())
+            )
+            self._conn.commit()
+        self.stores += 1
+
+    def prune(self, older_than_seconds: float, engine: Optional[str] = None) -> int:
+        """Delete entries older than this (optionally for one engine); returns the number removed"""
+        cutoff = time.time() - older_than_seconds
+        with self._lock:
+            if engine is None:
+                cursor = self._conn.execute('DELETE FROM sentiment WHERE created_at < ?', (cutoff,))
+            else:
+                cursor = self._conn.execute('DELETE FROM sentiment WHERE created_at < ? AND engine = ?',
+                                            (cutoff, engine))
+            self._conn.commit()
+        return cursor.rowcount
+
+    def stats(self) -> Dict:
+        with self._lock:
+            engines = dict(self._conn.execute('SELECT engine, COUNT(*) FROM sentiment GROUP BY engine').fetchall())
+        lookups = self.hits + self.misses
+        return {
+            'entries': sum(engines.values()),
+            'engines': engines,
+            'hits': self.hits,
+            'misses': self.misses,
+            'stores': self.stores,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+    def print_summary(self):
+        stats = self.stats()
+        print(f"\n🗄️  Sentiment cache: {stats['hits']} hits, {stats['misses']} misses "
+              f"({stats['hit_rate']:.0%} hit rate), {stats['entries']} entries stored")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_caches: Dict[str, SentimentCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_sentiment_cache(cache_dir: str = DEFAULT_CACHE_DIR) -> SentimentCache:
+    """Return the process-wide cache for a directory, opening it on first use"""
+    with _caches_lock:
+        cache = _caches.get(cache_dir)
+        if cache is None:
+            cache = SentimentCache(cache_dir)
+            _caches[cache_dir] = cache
+        return cache
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Inspect or prune the sentiment result cache')
+    parser.add_argument('--dir', default=DEFAULT_CACHE_DIR, help='Cache directory')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    subparsers.add_parser('info', help='Show entry counts per engine')
+    prune = subparsers.add_parser('prune', help='Delete entries older than some number of days')
+    prune.add_argument('--older-than-days', type=float, required=True, help='Age cutoff in days')
+    prune.add_argument('--engine', help='Only prune entries from this engine')
+    args = parser.parse_args()
+
+    cache = SentimentCache(args.dir, max_age_seconds=None)
+    if args.command == 'prune':
+        removed = cache.prune(args.older_than_days * 86400, args.engine)
+        print(f"✅ Removed {removed} entries")
+    stats = cache.stats()
+    print(f"🗄️  {args.dir}")
+    print(f"   {stats['entries']} entries")
+    for engine, count in sorted(stats['engines'].items()):
+        print(f"   {engine:<36} {count}")
+    cache.close()
+
+
+if __name__ == '__main__':
+    main()
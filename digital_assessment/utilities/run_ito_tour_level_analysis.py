@@ -5,9 +5,9 @@ Reads from 'ITOs' sheet, writes to 'ITO Tour Analysis'
 """
 
 import json
-import time
 from datetime import datetime
-from ito_content_scraper import ITOContentScraper
+from tiered_fetcher import TieredFetcher
+from crawl_scheduler import CrawlScheduler
 from ito_ai_analyzer import ITOAnalyzer
 from google.oauth2.service_account import Credentials
 from googleapiclient.discovery import build
@@ -16,6 +16,8 @@ from googleapiclient.discovery import build
 SPREADSHEET_ID = '1yxzgYWme1xW9uMX3jSz6t9BFI-tdV14UVmPiDjW_XCM'
 SHEET_NAME = 'ITO Tour Analysis'
 SOURCE_SHEET = 'ITOs'
+# Tours already written to the sheet, so an interrupted run can pick up where it stopped
+RESUME_JOURNAL = 'ito_tour_analysis_progress.jsonl'
 
 
 def get_sheets_service():
@@ -238,7 +240,8 @@ def main():
     
     # Initialize
     service = get_sheets_service()
-    scraper = ITOContentScraper()
+    # Static HTTP first, headless browser only for pages that need it
+    scraper = TieredFetcher()
     analyzer = ITOAnalyzer()
     
     # Ask for source
@@ -295,21 +298,33 @@ def main():
     # Setup headers
     setup_sheet_headers(service)
     
+    # Different operators' sites are scraped concurrently; each site gets one
+    # request at a time with a gap between them (replaces the fixed 2s sleep)
+    scheduler = CrawlScheduler(scraper, journal_path=RESUME_JOURNAL)
+    jobs = [{'key': f"{tour['url']}|{tour['page_type']}|{tour.get('destination_country', '')}",
+             'url': tour['url'], 'page_type': 'tour_page', 'tour': tour, 'index': i}
+            for i, tour in enumerate(itos, 1)]
+    
+    done = len(jobs) - len(scheduler.pending(jobs))
+    if done:
+        resume = input(f"\n↩️  {done} of these tours were written in an interrupted run. "
+                       f"Skip them? (y/n): ").strip().lower()
+        if resume != 'y':
+            scheduler.reset()
+    
     # Track blocked
     blocked_tours = []
     successful = 0
     
-    # Process each tour
-    for i, tour in enumerate(itos, 1):
+    def process_tour(job, content):
+        """Analyze and write one scraped tour (called one at a time, in completion order)"""
+        nonlocal successful
+        tour = job['tour']
         print(f"\n{'='*80}")
-        print(f"[{i}/{len(itos)}] {tour['operator']} ({tour['country']})")
+        print(f"[{job['index']}/{len(itos)}] {tour['operator']} ({tour['country']})")
         print(f"{'='*80}")
         print(f"  📄 {tour['page_type']}: {tour['url']}...")
         
-        # Scrape
-        print(f"  Scraping: {tour['url']}...")
-        content = scraper.scrape_page(tour['url'])
-        
         if not content.get('success', False):
             print(f"    🚫 BLOCKED: {content.get('error', 'Unknown error')}")
             blocked_tours.append(tour)
@@ -323,13 +338,13 @@ def main():
                 'destination_percentage': 0,
                 'packaging_type': 'Unknown'
             }, scraping_status="🚫 BLOCKED - Manual Screenshot Needed")
-            continue
+            return
         
         word_count = len(content['full_text'].split())
         
         if word_count < 50:
             print(f"    ⚠️  Insufficient content ({word_count} words)")
-            continue
+            return
         
         print(f"    ✅ Extracted {word_count} words")
         
@@ -345,8 +360,24 @@ def main():
         # Write to sheet
         write_tour_analysis(service, tour, analysis)
         successful += 1
-        
-        time.sleep(2)  # Rate limiting
+    
+    try:
+        scheduler.run_sync(jobs, on_result=process_tour)
+    finally:
+        # One browser served every tour; shut it down
+        scraper.close()
+    scraper.print_summary()
+    scraper.blocker.print_summary()
+    scheduler.print_summary()
+    analyzer.print_summary()
+    
+    # Keep the journal while any tour failed to process, so the next run
+    # retries just those; once everything was written, start fresh
+    still_pending = len(scheduler.pending(jobs))
+    if still_pending:
+        print(f"\n↩️  {still_pending} tour(s) not written; rerun to retry them ({RESUME_JOURNAL} kept)")
+    else:
+        scheduler.reset()
     
     # Summary
     print(f"\n\n{'='*80}")
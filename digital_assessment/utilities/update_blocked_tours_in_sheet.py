@@ -123,34 +123,41 @@ def main():
     analyzer = ITOAnalyzer()
     updates_made = 0
     
+    # Match each blocked row to its manually captured text
+    matched = []
     for blocked_row in blocked_rows:
-        print(f"\n{'='*80}")
-        print(f"Processing: {blocked_row['operator']} - {blocked_row['destination']}")
-        print(f"  Sheet Row: {blocked_row['row_number']}")
-        print(f"  URL: {blocked_row['url'][:80]}...")
-        
-        # Find matching tour text
         matching_tour = None
         for tour in tours:
             if url_matches(blocked_row['url'], tour['url']):
                 matching_tour = tour
                 break
-        
         if not matching_tour:
-            print(f"  ⚠️  No matching text found")
+            print(f"  ⚠️  No matching text for {blocked_row['operator']} ({blocked_row['url'][:60]}...)")
             continue
-        
+        matched.append((blocked_row, matching_tour, identify_destination(matching_tour['url'])))
+    
+    # Analyze all matched texts in one batch
+    print(f"\n🧪 Analyzing {len(matched)} matched texts...")
+    analyses = analyzer.analyze_many([
+        {
+            'name': f"{blocked_row['operator']} - {blocked_row['page_type']}",
+            'text': matching_tour['text'],
+            'destination_country': destination,
+        }
+        for blocked_row, matching_tour, destination in matched
+    ])
+    
+    for (blocked_row, matching_tour, destination), analysis in zip(matched, analyses):
+        print(f"\n{'='*80}")
+        print(f"Processing: {blocked_row['operator']} - {blocked_row['destination']}")
+        print(f"  Sheet Row: {blocked_row['row_number']}")
+        print(f"  URL: {blocked_row['url'][:80]}...")
         print(f"  ✓ Found matching text ({len(matching_tour['text'])} chars)")
+        if 'error' in analysis:
+            print(f"  ❌ Skipped, analysis failed: {analysis['error']}")
+            continue
         
-        # Analyze
         try:
-            destination = identify_destination(matching_tour['url'])
-            analysis = analyzer.analyze_content(
-                f"{blocked_row['operator']} - {blocked_row['page_type']}",
-                matching_tour['text'],
-                destination_country=destination
-            )
-            
             # Prepare row data
             themes = analysis.get('themes', [])
             theme1 = themes[0] if len(themes) > 0 else ''